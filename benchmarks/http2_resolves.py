@@ -0,0 +1,87 @@
+"""
+Compares HTTP/1.1 and HTTP/2 for many concurrent async resolves against the
+resolver. Reports latency percentiles and the peak number of open connections.
+
+    pip install spotify-confidence-sdk[http2]
+    CONFIDENCE_CLIENT_SECRET=... python benchmarks/http2_resolves.py \\
+        --flag my-flag.color --concurrency 1000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from typing import Dict, List
+
+from confidence.confidence import Confidence
+from confidence.session import PoolConfig
+
+
+def percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+async def watch_connections(confidence: Confidence, peak: List[int]) -> None:
+    pool = confidence.async_client._transport._pool  # type: ignore[attr-defined]
+    while True:
+        peak[0] = max(peak[0], len(pool.connections))
+        await asyncio.sleep(0.005)
+
+
+async def run(
+    client_secret: str, flag: str, pool_config: PoolConfig, concurrency: int
+) -> Dict[str, float]:
+    confidence = Confidence(
+        client_secret, pool_config=pool_config, disable_telemetry=True
+    )
+    # warm up so that connection setup is not part of the first measurement
+    await confidence.resolve_string_details_async(flag, "")
+
+    async def timed_resolve() -> float:
+        child = confidence.with_context({"targeting_key": str(uuid.uuid4())})
+        start_time = time.perf_counter()
+        await child.resolve_string_details_async(flag, "")
+        return (time.perf_counter() - start_time) * 1000
+
+    peak = [0]
+    watcher = asyncio.ensure_future(watch_connections(confidence, peak))
+    start_time = time.perf_counter()
+    latencies = await asyncio.gather(*(timed_resolve() for _ in range(concurrency)))
+    wall_ms = (time.perf_counter() - start_time) * 1000
+    watcher.cancel()
+    await confidence.async_client.aclose()
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "wall_ms": wall_ms,
+        "peak_connections": peak[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--client-secret", default=os.getenv("CONFIDENCE_CLIENT_SECRET")
+    )
+    parser.add_argument("--flag", required=True)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    args = parser.parse_args()
+    if not args.client_secret:
+        parser.error("--client-secret or CONFIDENCE_CLIENT_SECRET is required")
+
+    modes = {"http/1.1": PoolConfig(), "http/2": PoolConfig.multiplexed()}
+    print(f"{'mode':<10}{'p50 ms':>10}{'p99 ms':>10}{'wall ms':>10}{'conns':>8}")
+    for name, pool_config in modes.items():
+        result = asyncio.run(
+            run(args.client_secret, args.flag, pool_config, args.concurrency)
+        )
+        print(
+            f"{name:<10}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+            f"{result['wall_ms']:>10.1f}{result['peak_connections']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
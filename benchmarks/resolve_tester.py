@@ -0,0 +1,99 @@
+"""
+Measures the CPU time per evaluation spent on the Resolve tester debug payload,
+for a large evaluation context. Resolves are answered in process by an
+InMemoryTransport, so the cost of the SDK itself is measured. The "eager" mode
+is the previous implementation, which encoded the payload on every evaluation
+before checking the log level.
+
+    python benchmarks/resolve_tester.py --context-keys 500
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import time
+from typing import Dict
+
+from confidence.confidence import Confidence, FieldType
+from confidence.transport import InMemoryTransport
+
+FLAGS = {
+    "benchmark-flag": {
+        "variant": "flags/benchmark-flag/variants/on",
+        "value": {"color": "green"},
+    }
+}
+
+
+class _EagerConfidence(Confidence):
+    def _logResolveTester(self, flag_id: str, context: Dict[str, FieldType]) -> None:
+        json_payload = json.dumps(
+            {
+                "flag": f"flags/{flag_id}",
+                "context": context,
+                "clientKey": self._client_secret,
+            }
+        )
+        base64_payload = base64.b64encode(json_payload.encode("utf-8")).decode("utf-8")
+        self.logger.debug(
+            f"Check your flag evaluation for '{flag_id}' by copy-pasting the payload to the Resolve tester: {base64_payload}"  # noqa: E501
+        )
+
+
+def large_context(keys: int) -> Dict[str, FieldType]:
+    return {
+        f"attribute-{i}": {"id": f"value-{i}", "tags": ["a", "b", "c"], "score": i}
+        for i in range(keys)
+    }
+
+
+def logger_for(mode: str) -> logging.Logger:
+    logger = logging.getLogger(f"confidence_benchmark_{mode}")
+    logger.propagate = False
+    logger.handlers.clear()
+    if mode in ("eager", "info"):
+        logger.setLevel(logging.INFO)
+    else:
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+    return logger
+
+
+def measure(mode: str, context: Dict[str, FieldType], evaluations: int) -> float:
+    """@return: CPU microseconds per evaluation"""
+    cls = _EagerConfidence if mode == "eager" else Confidence
+    confidence = cls(
+        "benchmark-secret",
+        logger=logger_for(mode),
+        disable_telemetry=True,
+        transport=InMemoryTransport(FLAGS),
+        resolve_tester_sampling=100 if mode == "debug-sampled" else 1,
+    ).with_context(context)
+    start_time = time.process_time()
+    for _ in range(evaluations):
+        confidence.resolve_string_details("benchmark-flag.color", "red")
+    return (time.process_time() - start_time) * 1e6 / evaluations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--context-keys", type=int, default=500)
+    parser.add_argument("--evaluations", type=int, default=2000)
+    args = parser.parse_args()
+
+    context = large_context(args.context_keys)
+    results = {
+        mode: measure(mode, context, args.evaluations)
+        for mode in ["eager", "info", "debug-sampled", "debug"]
+    }
+    print(f"{'mode':<15}{'cpu us/eval':>12}")
+    for mode, cpu_us in results.items():
+        print(f"{mode:<15}{cpu_us:>12.1f}")
+    saved = results["eager"] - results["info"]
+    print(f"\nsaved per evaluation with DEBUG disabled: {saved:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Measures evaluation throughput and latency against a local FakeResolver, for
+sync and async resolves, the OpenFeature provider and track(), at several
+concurrency levels. Results are written as JSON, and a previous result file
+can be passed with --baseline to print the change of every measurement.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from openfeature.evaluation_context import EvaluationContext
+
+from confidence import __version__
+from confidence.confidence import Confidence
+from confidence.openfeature_provider import ConfidenceOpenFeatureProvider
+from confidence.testing import FakeResolver, LatencyDistribution
+
+FLAGS = {
+    "benchmark-flag": {
+        "variant": "flags/benchmark-flag/variants/on",
+        "value": {"color": "green", "enabled": True, "size": 3},
+    }
+}
+SCENARIOS = ["sync", "async", "provider", "track"]
+CONCURRENCY = [1, 16, 256]
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def summarize(
+    scenario: str, concurrency: int, latencies: List[float], errors: int, wall: float
+) -> Dict[str, Any]:
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "operations": len(latencies),
+        "errors": errors,
+        "ops_per_sec": round(len(latencies) / wall, 1) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def run_threads(
+    operation: Callable[[int], bool], concurrency: int, operations: int
+) -> Dict[str, Any]:
+    """Run operation from concurrency threads, operations times in total."""
+    per_worker = max(1, operations // concurrency)
+
+    def worker(worker_id: int) -> List[Optional[float]]:
+        latencies: List[Optional[float]] = []
+        for _ in range(per_worker):
+            start_time = time.perf_counter()
+            ok = operation(worker_id)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            latencies.append(elapsed_ms if ok else None)
+        return latencies
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    wall = time.perf_counter() - start_time
+    samples = [latency for result in results for latency in result]
+    return collect(samples, wall)
+
+
+async def run_tasks(
+    operation: Callable[[int], Any], concurrency: int, operations: int
+) -> Dict[str, Any]:
+    """Async version of run_threads, with concurrency tasks on one loop."""
+    per_worker = max(1, operations // concurrency)
+
+    async def worker(worker_id: int) -> List[Optional[float]]:
+        latencies: List[Optional[float]] = []
+        for _ in range(per_worker):
+            start_time = time.perf_counter()
+            ok = await operation(worker_id)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            latencies.append(elapsed_ms if ok else None)
+        return latencies
+
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - start_time
+    samples = [latency for result in results for latency in result]
+    return collect(samples, wall)
+
+
+def collect(samples: List[Optional[float]], wall: float) -> Dict[str, Any]:
+    latencies = [sample for sample in samples if sample is not None]
+    return {
+        "latencies": latencies,
+        "errors": len(samples) - len(latencies),
+        "wall": wall,
+    }
+
+
+def make_confidence(server: FakeResolver) -> Confidence:
+    logger = logging.getLogger("confidence_benchmark")
+    # measure the SDK as it runs in production, without debug logging
+    logger.setLevel(logging.WARNING)
+    return Confidence(
+        "benchmark-secret",
+        custom_resolve_base_url=server.base_url,
+        custom_events_base_url=server.base_url,
+        disable_telemetry=True,
+        logger=logger,
+    )
+
+
+def bench_scenario(
+    scenario: str, server: FakeResolver, concurrency: int, operations: int
+) -> Dict[str, Any]:
+    confidence = make_confidence(server)
+    contexts = [
+        confidence.with_context({"targeting_key": str(uuid.uuid4())})
+        for _ in range(concurrency)
+    ]
+
+    if scenario == "sync":
+
+        def resolve(worker_id: int) -> bool:
+            details = contexts[worker_id].resolve_string_details(
+                "benchmark-flag.color", "default"
+            )
+            return details.error_code is None
+
+        measured = run_threads(resolve, concurrency, operations)
+    elif scenario == "async":
+
+        async def resolve_async(worker_id: int) -> bool:
+            details = await contexts[worker_id].resolve_string_details_async(
+                "benchmark-flag.color", "default"
+            )
+            return details.error_code is None
+
+        measured = asyncio.run(run_tasks(resolve_async, concurrency, operations))
+    elif scenario == "provider":
+        provider = ConfidenceOpenFeatureProvider(confidence)
+        evaluation_contexts = [
+            EvaluationContext(targeting_key=str(uuid.uuid4()))
+            for _ in range(concurrency)
+        ]
+
+        def resolve_provider(worker_id: int) -> bool:
+            details = provider.resolve_string_details(
+                "benchmark-flag.color", "default", evaluation_contexts[worker_id]
+            )
+            return details.error_code is None
+
+        measured = run_threads(resolve_provider, concurrency, operations)
+    elif scenario == "track":
+        received_before = server.events_received
+
+        def track(worker_id: int) -> bool:
+            contexts[worker_id].track("benchmark-event", {"worker": worker_id})
+            return True
+
+        measured = run_threads(track, concurrency, operations)
+        # track() does not report failures, count events that never arrived
+        delivered = server.events_received - received_before
+        measured["errors"] = len(measured["latencies"]) - delivered
+    else:
+        raise ValueError(f"Unknown scenario {scenario}")
+
+    return summarize(
+        scenario,
+        concurrency,
+        measured["latencies"],
+        measured["errors"],
+        measured["wall"],
+    )
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {
+            (result["scenario"], result["concurrency"]): result
+            for result in json.load(file)["results"]
+        }
+    print(f"\nChange against {baseline_path}:")
+    for result in results:
+        before = baseline.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+        changes = []
+        for key in ["ops_per_sec", "p50_ms", "p99_ms"]:
+            if before[key]:
+                change = (result[key] - before[key]) / before[key] * 100
+                changes.append(f"{key} {change:+.1f}%")
+        print(
+            f"{result['scenario']:<10}{result['concurrency']:>5}  " + ", ".join(changes)
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=CONCURRENCY)
+    parser.add_argument(
+        "--operations", type=int, default=2000, help="per scenario and concurrency"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=1.0, help="latency of the fake resolver"
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="a previous result file to compare with")
+    args = parser.parse_args()
+
+    results = []
+    with FakeResolver(
+        FLAGS, latency=LatencyDistribution.fixed(args.latency_ms)
+    ) as server:
+        print(
+            f"{'scenario':<10}{'conc':>5}{'ops/s':>10}"
+            f"{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+        )
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                result = bench_scenario(scenario, server, concurrency, args.operations)
+                results.append(result)
+                print(
+                    f"{scenario:<10}{concurrency:>5}{result['ops_per_sec']:>10.1f}"
+                    f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                    f"{result['errors']:>8}"
+                )
+
+    report = {
+        "meta": {
+            "sdk_version": __version__,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": datetime.now(timezone.utc).isoformat(),
+            "operations": args.operations,
+            "latency_ms": args.latency_ms,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
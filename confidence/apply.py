@@ -0,0 +1,113 @@
+import atexit
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_APPLY_BATCH_SIZE = 100
+DEFAULT_APPLY_FLUSH_INTERVAL_MS = 1000
+DEFAULT_MAX_PENDING_APPLIES = 10000
+DEFAULT_MAX_TRACKED_APPLIES = 100000
+
+# (flag resource name, apply time)
+AppliedFlag = Tuple[str, str]
+ApplySender = Callable[[str, List[AppliedFlag]], None]
+
+
+class FlagApplier:
+    """
+    Collects flag applies (exposures) off the resolve path and sends them in
+    batches to flags:apply, grouped by resolve token. A batch is sent when
+    max_batch_size applies are pending or every flush_interval_ms. Identical
+    (resolve token, flag) pairs are only applied once.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = DEFAULT_APPLY_BATCH_SIZE,
+        flush_interval_ms: float = DEFAULT_APPLY_FLUSH_INTERVAL_MS,
+        max_pending: int = DEFAULT_MAX_PENDING_APPLIES,
+        max_tracked: int = DEFAULT_MAX_TRACKED_APPLIES,
+    ):
+        self.max_batch_size = max_batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.max_pending = max_pending
+        self.max_tracked = max_tracked
+        self.dropped = 0
+        self._send: Optional[ApplySender] = None
+        self._pending: List[Tuple[str, AppliedFlag]] = []
+        self._applied: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def bind(self, send: ApplySender) -> None:
+        """
+        Set the function used to send a batch of applies for one resolve token.
+        Only the first binding is kept, so instances derived with with_context can
+        share the applier of their parent.
+        """
+        with self._condition:
+            if self._send is None:
+                self._send = send
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, resolve_token: str, flag: str) -> None:
+        if not resolve_token:
+            return
+        key = (resolve_token, flag)
+        apply_time = datetime.utcnow().isoformat() + "Z"
+        with self._condition:
+            if key in self._applied or self._closed:
+                return
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._applied[key] = None
+            if len(self._applied) > self.max_tracked:
+                self._applied.popitem(last=False)
+            self._pending.append((resolve_token, (flag, apply_time)))
+            self._ensure_started()
+            if len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+
+    def flush(self) -> None:
+        with self._condition:
+            pending, self._pending = self._pending, []
+            send = self._send
+        if not pending or send is None:
+            return
+        by_token: Dict[str, List[AppliedFlag]] = {}
+        for resolve_token, applied_flag in pending:
+            by_token.setdefault(resolve_token, []).append(applied_flag)
+        for resolve_token, applied_flags in by_token.items():
+            send(resolve_token, applied_flags)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="confidence-apply", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self.max_batch_size:
+                    self._condition.wait(self.flush_interval_ms / 1000.0)
+                if self._closed:
+                    return
+            self.flush()
@@ -0,0 +1,200 @@
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from confidence.errors import FlagNotFoundError
+from confidence.names import FlagName
+from confidence.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+    from confidence.confidence import FieldType, ResolveResult
+else:
+    asyncio = lazy_import("asyncio")
+
+DEFAULT_BATCH_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH_SIZE = 50
+
+Results = Dict[str, "ResolveResult"]
+Fetch = Callable[[List[FlagName], Dict[str, "FieldType"]], Results]
+FetchAsync = Callable[[List[FlagName], Dict[str, "FieldType"]], Awaitable[Results]]
+
+
+class _Batch(object):
+    def __init__(self, context: Dict[str, "FieldType"]):
+        self.context = context
+        self.flags: Dict[str, FlagName] = {}
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results: Optional[Results] = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncBatch(object):
+    def __init__(
+        self, context: Dict[str, "FieldType"], future: "asyncio.Future[Results]"
+    ):
+        self.context = context
+        self.flags: Dict[str, FlagName] = {}
+        self.future = future
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class ResolveBatcher:
+    """
+    Holds resolves that share an evaluation context for a short window, or until
+    max_batch_size distinct flags are waiting, and sends them as one request.
+    Every caller receives the results of the whole batch. When the batch fails
+    because a flag is not found, each caller resolves its own flags again on its
+    own, so that one caller's unknown flag does not fail the others.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = DEFAULT_BATCH_WINDOW_MS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.batches_sent = 0
+        self.resolves_batched = 0
+        self.resolves_split = 0
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, _Batch] = {}
+        self._pending_async: Dict[
+            Tuple[asyncio.AbstractEventLoop, Hashable], _AsyncBatch
+        ] = {}
+        self._tasks: Set["asyncio.Task[Results]"] = set()
+
+    def submit(
+        self,
+        key: Hashable,
+        flag_names: List[FlagName],
+        context: Dict[str, "FieldType"],
+        fetch: Fetch,
+    ) -> Results:
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if batch is None:
+                batch = _Batch(context)
+                self._pending[key] = batch
+            self._add_flags(batch.flags, flag_names)
+            if len(batch.flags) >= self.max_batch_size:
+                del self._pending[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window_ms / 1000.0)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+                self.batches_sent += 1
+            try:
+                batch.results = fetch(list(batch.flags.values()), batch.context)
+            except BaseException as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            if self._should_split(batch.error, batch.flags, flag_names):
+                return fetch(flag_names, context)
+            raise batch.error
+        return batch.results or {}
+
+    async def submit_async(
+        self,
+        key: Hashable,
+        flag_names: List[FlagName],
+        context: Dict[str, "FieldType"],
+        fetch: FetchAsync,
+    ) -> Results:
+        loop = asyncio.get_running_loop()
+        batch_key = (loop, key)
+        batch = self._pending_async.get(batch_key)
+        if batch is None:
+            batch = _AsyncBatch(context, loop.create_future())
+            self._pending_async[batch_key] = batch
+            batch.timer = loop.call_later(
+                self.window_ms / 1000.0, self._flush_async, batch_key, batch, fetch
+            )
+        self._add_flags(batch.flags, flag_names)
+        if len(batch.flags) >= self.max_batch_size:
+            if batch.timer is not None:
+                batch.timer.cancel()
+            self._flush_async(batch_key, batch, fetch)
+        try:
+            return await asyncio.shield(batch.future)
+        except FlagNotFoundError as e:
+            if self._should_split(e, batch.flags, flag_names):
+                return await fetch(flag_names, context)
+            raise
+
+    def _should_split(
+        self,
+        error: BaseException,
+        batch_flags: Dict[str, FlagName],
+        flag_names: List[FlagName],
+    ) -> bool:
+        """
+        Whether a caller should resolve its own flags after the batch failed,
+        which is when a flag was not found and the batch held other flags too.
+        """
+        if not isinstance(error, FlagNotFoundError):
+            return False
+        if batch_flags.keys() <= {flag_name.flag for flag_name in flag_names}:
+            return False
+        with self._lock:
+            self.resolves_split += 1
+        return True
+
+    def _add_flags(
+        self, batch_flags: Dict[str, FlagName], flag_names: List[FlagName]
+    ) -> None:
+        self.resolves_batched += 1
+        for flag_name in flag_names:
+            batch_flags.setdefault(flag_name.flag, flag_name)
+
+    def _flush_async(
+        self,
+        batch_key: Tuple["asyncio.AbstractEventLoop", Hashable],
+        batch: _AsyncBatch,
+        fetch: FetchAsync,
+    ) -> None:
+        if self._pending_async.get(batch_key) is batch:
+            del self._pending_async[batch_key]
+        self.batches_sent += 1
+
+        async def run() -> Results:
+            return await fetch(list(batch.flags.values()), batch.context)
+
+        task = asyncio.ensure_future(run())
+        # keep a reference to the task so that it is not garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._complete_async(batch, t))
+
+    def _complete_async(self, batch: _AsyncBatch, task: "asyncio.Task[Any]") -> None:
+        self._tasks.discard(task)
+        if batch.future.done():
+            return
+        if task.cancelled():
+            batch.future.cancel()
+            return
+        error = task.exception()
+        if error is not None:
+            batch.future.set_exception(error)
+        else:
+            batch.future.set_result(task.result())
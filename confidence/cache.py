@@ -0,0 +1,179 @@
+import dataclasses
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from confidence.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+    from confidence.confidence import ResolveResult
+else:
+    asyncio = lazy_import("asyncio")
+
+DEFAULT_CACHE_TTL_SECONDS = 60.0
+DEFAULT_CACHE_MAX_ENTRIES = 10000
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_REFRESH_WORKERS = 2
+
+
+def context_fingerprint(context: Mapping[str, Any]) -> str:
+    """
+    A stable digest of an evaluation context, independent of key order.
+    """
+    canonical = json.dumps(
+        context, sort_keys=True, separators=(",", ":"), default=str
+    ).encode("utf-8")
+    return hashlib.sha256(canonical).hexdigest()
+
+
+@dataclasses.dataclass
+class _CacheEntry(object):
+    result: "ResolveResult"
+    stored_at: float
+    size: int
+
+
+class ResolveCache:
+    """
+    An in-process LRU cache of resolved flags keyed by flag name and evaluation
+    context fingerprint. Entries expire after ttl_seconds, and the least recently
+    used entries are evicted when max_entries or max_bytes is exceeded.
+
+    With max_staleness_seconds, expired entries are kept as last known good values
+    for that much longer. When stale_while_revalidate is set they are served right
+    away while a background refresh runs, otherwise they are only served when a
+    fresh resolve fails.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        max_staleness_seconds: float = 0.0,
+        stale_while_revalidate: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_staleness_seconds = max_staleness_seconds
+        self.stale_while_revalidate = stale_while_revalidate
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def get(self, flag: str, fingerprint: str) -> Optional["ResolveResult"]:
+        result, stale = self.lookup(flag, fingerprint)
+        return None if stale else result
+
+    def lookup(
+        self, flag: str, fingerprint: str
+    ) -> Tuple[Optional["ResolveResult"], bool]:
+        """
+        Look up an entry, returning it together with whether it is past its TTL.
+        """
+        key = (flag, fingerprint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            age = self._clock() - entry.stored_at
+            if age > self.ttl_seconds + self.max_staleness_seconds:
+                self._remove(key)
+                return None, False
+            self._entries.move_to_end(key)
+            return entry.result, age > self.ttl_seconds
+
+    def put(self, flag: str, fingerprint: str, result: "ResolveResult") -> None:
+        key = (flag, fingerprint)
+        size = self._estimate_size(key, result)
+        if size > self.max_bytes:
+            return
+        cached = dataclasses.replace(result, cached=True)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(cached, self._clock(), size)
+            self._size_bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self._size_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def begin_refresh(self, flags: List[str], fingerprint: str) -> List[str]:
+        """
+        Claim the given flags for a background refresh, returning the flags that
+        are not already being refreshed.
+        """
+        with self._lock:
+            claimed = [f for f in flags if (f, fingerprint) not in self._refreshing]
+            self._refreshing.update((f, fingerprint) for f in claimed)
+            return claimed
+
+    def end_refresh(self, flags: List[str], fingerprint: str) -> None:
+        with self._lock:
+            self._refreshing.difference_update((f, fingerprint) for f in flags)
+
+    def run_in_background(self, refresh: Callable[[], None]) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=DEFAULT_REFRESH_WORKERS,
+                    thread_name_prefix="confidence-cache-refresh",
+                )
+            executor = self._executor
+        executor.submit(refresh)
+
+    def run_in_background_async(self, refresh: Coroutine[Any, Any, None]) -> None:
+        # keep a reference to the task so that it is not garbage collected
+        task = asyncio.get_running_loop().create_task(refresh)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self._size_bytes -= entry.size
+
+    @staticmethod
+    def _estimate_size(key: Tuple[str, str], result: "ResolveResult") -> int:
+        value_size = len(json.dumps(result.value, default=str))
+        return (
+            len(key[0])
+            + len(key[1])
+            + value_size
+            + len(result.variant or "")
+            + len(result.token)
+        )
@@ -0,0 +1,215 @@
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from confidence.errors import CircuitOpenError, ConfidenceError, TimeoutError
+from confidence.retry import is_retryable
+
+DEFAULT_ERROR_RATE_THRESHOLD = 0.5
+DEFAULT_TIMEOUT_RATE_THRESHOLD = 0.2
+DEFAULT_MINIMUM_REQUESTS = 20
+DEFAULT_WINDOW_SECONDS = 10
+DEFAULT_OPEN_SECONDS = 5.0
+DEFAULT_HALF_OPEN_MAX_CALLS = 1
+
+T = TypeVar("T")
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class _Circuit(object):
+    def __init__(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.trial_calls = 0
+        self.trial_successes = 0
+        # one [second, requests, errors, timeouts] bucket per second of the window
+        self.buckets: Deque[List[int]] = deque()
+
+
+class CircuitBreaker:
+    """
+    Fails resolves fast while an endpoint is unhealthy. Each endpoint has its own
+    circuit. A closed circuit opens when, over the last window_seconds and at
+    least minimum_requests calls, the share of failed calls reaches
+    error_rate_threshold or the share of timed out calls reaches
+    timeout_rate_threshold. Calls to an open circuit raise CircuitOpenError
+    without reaching the endpoint. After open_seconds the circuit is half-open
+    and lets half_open_max_calls trial calls through: the circuit closes if they
+    all succeed and opens again as soon as one fails. Only transient errors
+    count as failures, a 404 or a bad request does not.
+    """
+
+    def __init__(
+        self,
+        error_rate_threshold: float = DEFAULT_ERROR_RATE_THRESHOLD,
+        timeout_rate_threshold: float = DEFAULT_TIMEOUT_RATE_THRESHOLD,
+        minimum_requests: int = DEFAULT_MINIMUM_REQUESTS,
+        window_seconds: int = DEFAULT_WINDOW_SECONDS,
+        open_seconds: float = DEFAULT_OPEN_SECONDS,
+        half_open_max_calls: int = DEFAULT_HALF_OPEN_MAX_CALLS,
+        logger: logging.Logger = logging.getLogger("confidence_logger"),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.error_rate_threshold = error_rate_threshold
+        self.timeout_rate_threshold = timeout_rate_threshold
+        self.minimum_requests = minimum_requests
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.logger = logger
+        self.rejected = 0
+        self.opened = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def state(self, endpoint: str) -> CircuitState:
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None:
+                return CircuitState.CLOSED
+            self._expire_open(endpoint, circuit)
+            return circuit.state
+
+    def metrics(self) -> Dict[str, Dict[str, object]]:
+        """The state and windowed counts of every endpoint that was called."""
+        with self._lock:
+            metrics: Dict[str, Dict[str, object]] = {}
+            for endpoint, circuit in self._circuits.items():
+                self._expire_open(endpoint, circuit)
+                self._trim(circuit)
+                metrics[endpoint] = {
+                    "state": circuit.state.value,
+                    "requests": sum(bucket[1] for bucket in circuit.buckets),
+                    "errors": sum(bucket[2] for bucket in circuit.buckets),
+                    "timeouts": sum(bucket[3] for bucket in circuit.buckets),
+                }
+            return metrics
+
+    def call(self, endpoint: str, fn: Callable[[], T]) -> T:
+        self._before_call(endpoint)
+        try:
+            result = fn()
+        except ConfidenceError as e:
+            self._after_call(endpoint, e)
+            raise
+        except BaseException:
+            self._release_trial(endpoint)
+            raise
+        self._after_call(endpoint, None)
+        return result
+
+    async def call_async(self, endpoint: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self._before_call(endpoint)
+        try:
+            result = await fn()
+        except ConfidenceError as e:
+            self._after_call(endpoint, e)
+            raise
+        except BaseException:
+            # e.g. cancelled, give the trial slot back without counting the call
+            self._release_trial(endpoint)
+            raise
+        self._after_call(endpoint, None)
+        return result
+
+    def _before_call(self, endpoint: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(endpoint, _Circuit())
+            self._expire_open(endpoint, circuit)
+            if circuit.state is CircuitState.CLOSED:
+                return
+            if (
+                circuit.state is CircuitState.HALF_OPEN
+                and circuit.trial_calls < self.half_open_max_calls
+            ):
+                circuit.trial_calls += 1
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"Circuit for {endpoint} is open")
+
+    def _after_call(self, endpoint: str, error: Optional[ConfidenceError]) -> None:
+        failed = error is not None and is_retryable(error)
+        timed_out = isinstance(error, TimeoutError)
+        with self._lock:
+            circuit = self._circuits[endpoint]
+            if circuit.state is CircuitState.HALF_OPEN:
+                if failed:
+                    self._open(endpoint, circuit)
+                    return
+                circuit.trial_successes += 1
+                if circuit.trial_successes >= self.half_open_max_calls:
+                    self._transition(endpoint, circuit, CircuitState.CLOSED)
+                    circuit.buckets.clear()
+                return
+            if circuit.state is not CircuitState.CLOSED:
+                return
+            bucket = self._bucket(circuit)
+            bucket[1] += 1
+            bucket[2] += int(failed)
+            bucket[3] += int(timed_out)
+            if failed and self._should_open(circuit):
+                self._open(endpoint, circuit)
+
+    def _release_trial(self, endpoint: str) -> None:
+        with self._lock:
+            circuit = self._circuits[endpoint]
+            if circuit.state is CircuitState.HALF_OPEN and circuit.trial_calls > 0:
+                circuit.trial_calls -= 1
+
+    def _should_open(self, circuit: _Circuit) -> bool:
+        self._trim(circuit)
+        requests = sum(bucket[1] for bucket in circuit.buckets)
+        if requests < self.minimum_requests:
+            return False
+        errors = sum(bucket[2] for bucket in circuit.buckets)
+        timeouts = sum(bucket[3] for bucket in circuit.buckets)
+        return (
+            errors / requests >= self.error_rate_threshold
+            or timeouts / requests >= self.timeout_rate_threshold
+        )
+
+    def _bucket(self, circuit: _Circuit) -> List[int]:
+        second = int(self._clock())
+        if not circuit.buckets or circuit.buckets[-1][0] != second:
+            circuit.buckets.append([second, 0, 0, 0])
+        self._trim(circuit)
+        return circuit.buckets[-1]
+
+    def _trim(self, circuit: _Circuit) -> None:
+        oldest = int(self._clock()) - self.window_seconds
+        while circuit.buckets and circuit.buckets[0][0] <= oldest:
+            circuit.buckets.popleft()
+
+    def _expire_open(self, endpoint: str, circuit: _Circuit) -> None:
+        if (
+            circuit.state is CircuitState.OPEN
+            and self._clock() - circuit.opened_at >= self.open_seconds
+        ):
+            circuit.trial_calls = 0
+            circuit.trial_successes = 0
+            self._transition(endpoint, circuit, CircuitState.HALF_OPEN)
+
+    def _open(self, endpoint: str, circuit: _Circuit) -> None:
+        circuit.opened_at = self._clock()
+        self.opened += 1
+        self._transition(endpoint, circuit, CircuitState.OPEN)
+
+    def _transition(
+        self, endpoint: str, circuit: _Circuit, state: CircuitState
+    ) -> None:
+        level = logging.WARNING if state is CircuitState.OPEN else logging.INFO
+        self.logger.log(
+            level,
+            f"Circuit for {endpoint} changed from {circuit.state.value}"
+            + f" to {state.value}",
+        )
+        circuit.state = state
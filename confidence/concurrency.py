@@ -0,0 +1,75 @@
+import contextlib
+import time
+import weakref
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from confidence.errors import GeneralError, TimeoutError
+from confidence.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+else:
+    asyncio = lazy_import("asyncio")
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the number of concurrent async resolves. Callers above the cap wait in
+    FIFO order, and are rejected when max_queued callers are already waiting.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: Optional[int] = None):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    @contextlib.asynccontextmanager
+    async def acquire(
+        self, timeout: Optional[float] = None
+    ) -> AsyncIterator[Optional[float]]:
+        """
+        Wait for a slot for at most timeout seconds.
+        @return: the seconds left of the timeout after waiting, None without one
+        """
+        start_time = time.monotonic()
+        semaphore = self._semaphore()
+        if semaphore.locked():
+            if self.max_queued is not None and self.queued >= self.max_queued:
+                self.rejected += 1
+                raise GeneralError("Too many queued resolve requests")
+            self.queued += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise TimeoutError("Timed out waiting for a resolve slot")
+            finally:
+                self.queued -= 1
+        else:
+            await semaphore.acquire()
+        remaining = None
+        if timeout is not None:
+            remaining = timeout - (time.monotonic() - start_time)
+            if remaining <= 0:
+                semaphore.release()
+                self.rejected += 1
+                raise TimeoutError("Timed out waiting for a resolve slot")
+        self.in_flight += 1
+        try:
+            yield remaining
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+
+    def _semaphore(self) -> "asyncio.Semaphore":
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphores[loop] = semaphore
+        return semaphore
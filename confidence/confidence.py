@@ -1,37 +1,72 @@
-import asyncio
 import base64
 import dataclasses
 from datetime import datetime
 from enum import Enum
+import itertools
 import json
 import logging
+from types import MappingProxyType
 from typing import (
+    TYPE_CHECKING,
     Any,
     Dict,
     List,
+    Mapping,
     Optional,
+    Set,
+    Tuple,
     Type,
     Union,
     get_args,
     get_origin,
 )
 
-import requests
-import httpx
 from typing_extensions import TypeGuard
 import time
 
 from confidence import __version__
 from confidence.errors import (
+    CircuitOpenError,
     FlagNotFoundError,
     GeneralError,
     ParseError,
     TypeMismatchError,
     TimeoutError,
 )
+from .apply import AppliedFlag, FlagApplier
+from .batching import ResolveBatcher
+from .circuit import CircuitBreaker
+from .endpoints import EndpointSelector
+from .events import Event, EventPublisher
+from .hedging import HedgePolicy
+from .log_limiter import LogLimiter
+from .retry import RetryPolicy, is_transient
+from .cache import ResolveCache, context_fingerprint
 from .flag_types import FlagResolutionDetails, Reason, ErrorCode
 from .names import FlagName, VariantName
+from .concurrency import ConcurrencyLimiter
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .session import HttpSession, PoolConfig
+from .transport import (
+    AsyncTransport,
+    HttpStatusError,
+    HttpxTransport,
+    RequestsTransport,
+    Transport,
+    TransportError,
+    TransportRequest,
+    TransportResponse,
+    TransportTimeout,
+)
 from .telemetry import Telemetry, ProtoTraceId, ProtoStatus
+from .lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+    import httpx
+else:
+    asyncio = lazy_import("asyncio")
+    httpx = lazy_import("httpx")
 
 EU_RESOLVE_API_ENDPOINT = "https://resolver.eu.confidence.dev"
 US_RESOLVE_API_ENDPOINT = "https://resolver.us.confidence.dev"
@@ -40,6 +75,9 @@ GLOBAL_RESOLVE_API_ENDPOINT = "https://resolver.confidence.dev"
 # Default timeout in milliseconds (10 seconds)
 DEFAULT_TIMEOUT_MS = 10000
 
+EVENTS_BASE_URL = "https://events.confidence.dev"
+EVENTS_HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+
 Primitive = Union[str, int, float, bool, None]
 FieldType = Union[Primitive, List[Primitive], List["Object"], "Object"]
 Object = Dict[str, FieldType]
@@ -74,6 +112,35 @@ class ResolveResult(object):
     value: Optional[Object]
     variant: Optional[str]
     token: str
+    cached: bool = dataclasses.field(default=False, compare=False)
+
+
+@dataclasses.dataclass
+class FlagRequest(object):
+    flag_key: str
+    value_type: Type[FieldType]
+    default_value: FieldType
+
+
+class _ResolveTesterPayload(object):
+    """The base64 encoded Resolve tester payload, built when formatted."""
+
+    __slots__ = ("flag_id", "context", "client_secret")
+
+    def __init__(self, flag_id: str, context: Dict[str, FieldType], client_secret: str):
+        self.flag_id = flag_id
+        self.context = context
+        self.client_secret = client_secret
+
+    def __str__(self) -> str:
+        json_payload = json.dumps(
+            {
+                "flag": f"flags/{self.flag_id}",
+                "context": self.context,
+                "clientKey": self.client_secret,
+            }
+        )
+        return base64.b64encode(json_payload.encode("utf-8")).decode("utf-8")
 
 
 class Confidence:
@@ -81,15 +148,13 @@ class Confidence:
         self.context[key] = value
 
     def with_context(self, context: Dict[str, FieldType]) -> "Confidence":
-        new_confidence = Confidence(
-            self._client_secret,
-            self._region,
-            self._apply_on_resolve,
-            self._custom_resolve_base_url,
-            timeout_ms=self._timeout_ms,
-            logger=self.logger,
-            async_client=self.async_client,
-        )
+        """
+        A view of this instance with context merged over its own. The view
+        shares the transports, caches, policies and configuration of this
+        instance and is cheap to create, without running the constructor.
+        """
+        new_confidence = object.__new__(type(self))
+        new_confidence.__dict__.update(self.__dict__)
         new_confidence.context = {**self.context, **context}
         return new_confidence
 
@@ -101,8 +166,28 @@ class Confidence:
         custom_resolve_base_url: Optional[str] = None,
         timeout_ms: Optional[int] = DEFAULT_TIMEOUT_MS,
         logger: logging.Logger = logging.getLogger("confidence_logger"),
-        async_client: Optional[httpx.AsyncClient] = None,
+        async_client: Optional["httpx.AsyncClient"] = None,
         disable_telemetry: bool = False,
+        pool_config: Optional[PoolConfig] = None,
+        http_session: Optional[HttpSession] = None,
+        resolve_cache: Optional[ResolveCache] = None,
+        single_flight: Optional[SingleFlight[Dict[str, ResolveResult]]] = None,
+        async_single_flight: Optional[
+            AsyncSingleFlight[Dict[str, ResolveResult]]
+        ] = None,
+        resolve_limiter: Optional[ConcurrencyLimiter] = None,
+        resolve_batcher: Optional[ResolveBatcher] = None,
+        flag_applier: Optional[FlagApplier] = None,
+        event_publisher: Optional[EventPublisher] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        endpoint_selector: Optional[EndpointSelector] = None,
+        transport: Optional[Transport] = None,
+        async_transport: Optional[AsyncTransport] = None,
+        custom_events_base_url: Optional[str] = None,
+        resolve_tester_sampling: int = 1,
+        log_limiter: Optional[LogLimiter] = None,
     ):
         self.context: Dict[str, FieldType] = {}
         self._client_secret = client_secret
@@ -111,12 +196,64 @@ class Confidence:
         self._apply_on_resolve = apply_on_resolve
         self._timeout_ms = timeout_ms
         self.logger = logger
-        self.async_client = (
-            async_client if async_client is not None else httpx.AsyncClient()
+        self._httpx_transport = HttpxTransport(async_client, pool_config, logger)
+        self._http_session = (
+            http_session if http_session is not None else HttpSession(pool_config)
+        )
+        self._transport: Transport = (
+            transport
+            if transport is not None
+            else RequestsTransport(self._http_session)
+        )
+        self._async_transport: AsyncTransport = (
+            async_transport if async_transport is not None else self._httpx_transport
         )
         self._setup_logger(logger)
         self._custom_resolve_base_url = custom_resolve_base_url
+        self._custom_events_base_url = custom_events_base_url
+        # log the Resolve tester payload for one in this many evaluations, 0 for
+        # none
+        self._resolve_tester_sampling = resolve_tester_sampling
+        self._evaluations = itertools.count()
+        self._log_limiter = log_limiter
         self._telemetry = Telemetry(__version__, disabled=disable_telemetry)
+        self._resolve_cache = resolve_cache
+        self._single_flight = single_flight
+        self._async_single_flight = async_single_flight
+        self._resolve_limiter = resolve_limiter
+        self._resolve_batcher = resolve_batcher
+        self._flag_applier = flag_applier
+        # with a flag applier, flags are applied when evaluated instead of resolved
+        self._apply_in_resolve = apply_on_resolve and flag_applier is None
+        if flag_applier is not None:
+            flag_applier.bind(self._send_apply)
+        # snapshots resolve every flag, so they always apply through an applier
+        self._snapshot_applier = flag_applier
+        if flag_applier is None and apply_on_resolve:
+            self._snapshot_applier = FlagApplier()
+            self._snapshot_applier.bind(self._send_apply)
+        self._event_publisher = event_publisher
+        if event_publisher is not None:
+            event_publisher.bind(self._publish_events)
+        self._event_tasks: Set["asyncio.Task[None]"] = set()
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
+        self._hedge_policy = hedge_policy
+        self._endpoint_selector = endpoint_selector
+        if endpoint_selector is not None:
+            endpoint_selector.bind(self._probe_endpoint)
+
+    @property
+    def async_client(self) -> "httpx.AsyncClient":
+        """The client of the default async transport, created on first use."""
+        return self._httpx_transport.client
+
+    @async_client.setter
+    def async_client(self, client: "httpx.AsyncClient") -> None:
+        httpx_transport = HttpxTransport(client)
+        if self._async_transport is self._httpx_transport:
+            self._async_transport = httpx_transport
+        self._httpx_transport = httpx_transport
 
     def _get_resolve_headers(self) -> Dict[str, str]:
         headers = {
@@ -178,14 +315,82 @@ class Confidence:
     ) -> FlagResolutionDetails[Union[Object, List[Primitive]]]:
         return await self._evaluate_async(flag_key, Object, default_value, self.context)
 
+    def resolve_many(
+        self, flags: List[FlagRequest]
+    ) -> Dict[str, FlagResolutionDetails[Any]]:
+        """
+        Resolve several flags in a single request to the resolver. When one of
+        the flags is not found the resolver fails the whole request, the flags
+        are then resolved one request each so that only the unknown flags return
+        FLAG_NOT_FOUND.
+        @param flags: the flag keys to resolve with their expected value types and
+        default values
+        @return: the resolution details keyed by flag key, empty without flags
+        """
+        return self._evaluate_many(flags, self.context)
+
+    async def resolve_many_async(
+        self, flags: List[FlagRequest]
+    ) -> Dict[str, FlagResolutionDetails[Any]]:
+        """
+        Resolve several flags in a single request to the resolver. When one of
+        the flags is not found the resolver fails the whole request, the flags
+        are then resolved one request each so that only the unknown flags return
+        FLAG_NOT_FOUND.
+        @param flags: the flag keys to resolve with their expected value types and
+        default values
+        @return: the resolution details keyed by flag key, empty without flags
+        """
+        return await self._evaluate_many_async(flags, self.context)
+
+    def snapshot(self) -> "FlagSnapshot":
+        """
+        Resolve every flag available to the client for the current context in a
+        single request. Reads from the returned snapshot are served locally, and
+        only the flags that are read are applied. When the resolve fails, reads
+        return their default values with the error.
+        """
+        snapshot_confidence = self._snapshot_confidence()
+        context = snapshot_confidence.context
+        try:
+            results = snapshot_confidence._resolve_flags([], context)
+        except Exception as e:
+            return FlagSnapshot(snapshot_confidence, context, {}, error=e)
+        return FlagSnapshot(snapshot_confidence, context, results)
+
+    async def snapshot_async(self) -> "FlagSnapshot":
+        """
+        Resolve every flag available to the client for the current context in a
+        single request. Reads from the returned snapshot are served locally, and
+        only the flags that are read are applied. When the resolve fails, reads
+        return their default values with the error.
+        """
+        snapshot_confidence = self._snapshot_confidence()
+        context = snapshot_confidence.context
+        try:
+            results = await snapshot_confidence._resolve_flags_async([], context)
+        except Exception as e:
+            return FlagSnapshot(snapshot_confidence, context, {}, error=e)
+        return FlagSnapshot(snapshot_confidence, context, results)
+
     #
     # --- internals
     #
 
+    def _snapshot_confidence(self) -> "Confidence":
+        """
+        A view that resolves without applying, the flags of a snapshot are
+        applied through a FlagApplier when they are read.
+        """
+        snapshot_confidence = self.with_context({})
+        snapshot_confidence._apply_in_resolve = False
+        snapshot_confidence._flag_applier = self._snapshot_applier
+        return snapshot_confidence
+
     def _setup_logger(self, logger: logging.Logger) -> None:
         if logger is not None:
-            if logger.level == logging.NOTSET:
-                logger.setLevel(logging.DEBUG)
+            # a logger without a level keeps following its parents, so DEBUG
+            # output, and the work to build it, is only enabled on request
             formatter = logging.Formatter(
                 "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
             )
@@ -195,16 +400,17 @@ class Confidence:
                 logger.addHandler(ch)
 
     def _logResolveTester(self, flag_id: str, context: Dict[str, FieldType]) -> None:
-        json_payload = json.dumps(
-            {
-                "flag": f"flags/{flag_id}",
-                "context": context,
-                "clientKey": self._client_secret,
-            }
-        )
-        base64_payload = base64.b64encode(json_payload.encode("utf-8")).decode("utf-8")
+        sampling = self._resolve_tester_sampling
+        if sampling <= 0 or not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if sampling > 1 and next(self._evaluations) % sampling != 0:
+            return
+        # the payload is encoded when the record is formatted, only if a handler
+        # emits it
         self.logger.debug(
-            f"Check your flag evaluation for '{flag_id}' by copy-pasting the payload to the Resolve tester: {base64_payload}"  # noqa: E501
+            "Check your flag evaluation for '%s' by copy-pasting the payload to the Resolve tester: %s",  # noqa: E501
+            flag_id,
+            _ResolveTesterPayload(flag_id, context, self._client_secret),
         )
 
     def _handle_evaluation_result(
@@ -218,6 +424,8 @@ class Confidence:
         context: Dict[str, FieldType],
     ) -> FlagResolutionDetails[Any]:
         self._logResolveTester(flag_id, context)
+        if self._flag_applier is not None and self._apply_on_resolve:
+            self._flag_applier.add(result.token, str(FlagName(flag_id)))
 
         if result.variant is None or len(str(result.value)) == 0:
             return FlagResolutionDetails(
@@ -238,7 +446,7 @@ class Confidence:
         return FlagResolutionDetails(
             value=value,
             variant=variant_name.variant,
-            reason=Reason.TARGETING_MATCH,
+            reason=Reason.CACHED if result.cached else Reason.TARGETING_MATCH,
             flag_metadata={"flag_key": flag_key},
         )
 
@@ -249,11 +457,7 @@ class Confidence:
         default_value: FieldType,
         context: Dict[str, FieldType],
     ) -> FlagResolutionDetails[Any]:
-        if "." in flag_key:
-            flag_id, value_path = flag_key.split(".", 1)
-        else:
-            flag_id = flag_key
-            value_path = None
+        flag_id, value_path = self._split_flag_key(flag_key)
         try:
             result = self._resolve(FlagName(flag_id), context)
             return self._handle_evaluation_result(
@@ -265,35 +469,9 @@ class Confidence:
                 value_path,
                 context,
             )
-        except FlagNotFoundError:
-            self.logger.info(f"Flag {flag_key} not found")
-            return FlagResolutionDetails(
-                value=default_value,
-                reason=Reason.DEFAULT,
-                error_code=ErrorCode.FLAG_NOT_FOUND,
-                error_message=f"Flag {flag_key} not found",
-                flag_metadata={"flag_key": flag_key},
-            )
-        except TimeoutError as e:
-            self.logger.warning(
-                f"Request timed out after {self._timeout_ms} ms"
-                f" when resolving flag {flag_key}"
-            )
-            return FlagResolutionDetails(
-                value=default_value,
-                reason=Reason.DEFAULT,
-                error_code=ErrorCode.TIMEOUT,
-                error_message=str(e),
-                flag_metadata={"flag_key": flag_key},
-            )
         except Exception as e:
-            self.logger.error(f"Error resolving flag {flag_key}: {str(e)}")
-            return FlagResolutionDetails(
-                value=default_value,
-                reason=Reason.ERROR,
-                error_code=ErrorCode.GENERAL,
-                error_message=str(e),
-                flag_metadata={"flag_key": flag_key},
+            return self._handle_evaluation_error(
+                e, flag_key, default_value, Reason.ERROR
             )
 
     async def _evaluate_async(
@@ -303,11 +481,7 @@ class Confidence:
         default_value: FieldType,
         context: Dict[str, FieldType],
     ) -> FlagResolutionDetails[Any]:
-        if "." in flag_key:
-            flag_id, value_path = flag_key.split(".", 1)
-        else:
-            flag_id = flag_key
-            value_path = None
+        flag_id, value_path = self._split_flag_key(flag_key)
         try:
             result = await self._resolve_async(FlagName(flag_id), context)
             return self._handle_evaluation_result(
@@ -319,8 +493,130 @@ class Confidence:
                 value_path,
                 context,
             )
-        except FlagNotFoundError:
-            self.logger.info(f"Flag {flag_key} not found")
+        except Exception as e:
+            return self._handle_evaluation_error(
+                e, flag_key, default_value, Reason.DEFAULT
+            )
+
+    def _evaluate_many(
+        self,
+        flags: List[FlagRequest],
+        context: Dict[str, FieldType],
+    ) -> Dict[str, FlagResolutionDetails[Any]]:
+        if not flags:
+            # an empty list of flags would resolve, and apply, every flag
+            return {}
+        flag_names = self._unique_flag_names(flags)
+        try:
+            try:
+                results = self._resolve_flags(flag_names, context)
+            except FlagNotFoundError:
+                if len(flag_names) < 2:
+                    raise
+                results = self._resolve_each(flag_names, context)
+        except Exception as e:
+            return {
+                flag.flag_key: self._handle_evaluation_error(
+                    e, flag.flag_key, flag.default_value, Reason.ERROR
+                )
+                for flag in flags
+            }
+        return self._handle_evaluation_results(results, flags, context, Reason.ERROR)
+
+    async def _evaluate_many_async(
+        self,
+        flags: List[FlagRequest],
+        context: Dict[str, FieldType],
+    ) -> Dict[str, FlagResolutionDetails[Any]]:
+        if not flags:
+            # an empty list of flags would resolve, and apply, every flag
+            return {}
+        flag_names = self._unique_flag_names(flags)
+        try:
+            try:
+                results = await self._resolve_flags_async(flag_names, context)
+            except FlagNotFoundError:
+                if len(flag_names) < 2:
+                    raise
+                results = await self._resolve_each_async(flag_names, context)
+        except Exception as e:
+            return {
+                flag.flag_key: self._handle_evaluation_error(
+                    e, flag.flag_key, flag.default_value, Reason.DEFAULT
+                )
+                for flag in flags
+            }
+        return self._handle_evaluation_results(results, flags, context, Reason.DEFAULT)
+
+    def _resolve_each(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        """
+        Resolve flags one at a time, after resolving them together failed because
+        one of them was not found. Flags that are not found are left out.
+        """
+        results: Dict[str, ResolveResult] = {}
+        for flag_name in flag_names:
+            try:
+                results.update(self._resolve_flags([flag_name], context))
+            except FlagNotFoundError:
+                pass
+        return results
+
+    async def _resolve_each_async(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        """Async version of _resolve_each."""
+        results: Dict[str, ResolveResult] = {}
+        for flag_name in flag_names:
+            try:
+                results.update(await self._resolve_flags_async([flag_name], context))
+            except FlagNotFoundError:
+                pass
+        return results
+
+    def _handle_evaluation_results(
+        self,
+        results: Mapping[str, ResolveResult],
+        flags: List[FlagRequest],
+        context: Dict[str, FieldType],
+        error_reason: Reason,
+    ) -> Dict[str, FlagResolutionDetails[Any]]:
+        details: Dict[str, FlagResolutionDetails[Any]] = {}
+        for flag in flags:
+            flag_id, value_path = self._split_flag_key(flag.flag_key)
+            try:
+                if flag_id not in results:
+                    raise FlagNotFoundError()
+                details[flag.flag_key] = self._handle_evaluation_result(
+                    results[flag_id],
+                    flag_id,
+                    flag.flag_key,
+                    flag.value_type,
+                    flag.default_value,
+                    value_path,
+                    context,
+                )
+            except Exception as e:
+                details[flag.flag_key] = self._handle_evaluation_error(
+                    e, flag.flag_key, flag.default_value, error_reason
+                )
+        return details
+
+    def _handle_evaluation_error(
+        self,
+        error: Exception,
+        flag_key: str,
+        default_value: FieldType,
+        error_reason: Reason,
+    ) -> FlagResolutionDetails[Any]:
+        if isinstance(error, FlagNotFoundError):
+            self._log_error(
+                logging.INFO,
+                flag_key,
+                ErrorCode.FLAG_NOT_FOUND.value,
+                f"Flag {flag_key} not found",
+            )
             return FlagResolutionDetails(
                 value=default_value,
                 reason=Reason.DEFAULT,
@@ -328,207 +624,781 @@ class Confidence:
                 error_message=f"Flag {flag_key} not found",
                 flag_metadata={"flag_key": flag_key},
             )
-        except TimeoutError as e:
-            self.logger.warning(
+        if isinstance(error, TimeoutError):
+            self._log_error(
+                logging.WARNING,
+                flag_key,
+                ErrorCode.TIMEOUT.value,
                 f"Request timed out after {self._timeout_ms} ms"
-                f" when resolving flag {flag_key}"
+                f" when resolving flag {flag_key}",
             )
             return FlagResolutionDetails(
                 value=default_value,
                 reason=Reason.DEFAULT,
                 error_code=ErrorCode.TIMEOUT,
-                error_message=str(e),
+                error_message=str(error),
                 flag_metadata={"flag_key": flag_key},
             )
-        except Exception as e:
-            self.logger.error(f"Error resolving flag {flag_key}: {str(e)}")
+        if isinstance(error, CircuitOpenError):
+            self.logger.debug(f"Not resolving flag {flag_key}: {error.error_message}")
             return FlagResolutionDetails(
                 value=default_value,
-                reason=Reason.DEFAULT,
-                error_code=ErrorCode.GENERAL,
-                error_message=str(e),
+                reason=Reason.CIRCUIT_OPEN,
+                error_code=ErrorCode.CIRCUIT_OPEN,
+                error_message=error.error_message,
                 flag_metadata={"flag_key": flag_key},
             )
+        self._log_error(
+            logging.ERROR,
+            flag_key,
+            ErrorCode.GENERAL.value,
+            f"Error resolving flag {flag_key}: {str(error)}",
+        )
+        return FlagResolutionDetails(
+            value=default_value,
+            reason=error_reason,
+            error_code=ErrorCode.GENERAL,
+            error_message=str(error),
+            flag_metadata={"flag_key": flag_key},
+        )
+
+    @staticmethod
+    def _split_flag_key(flag_key: str) -> Tuple[str, Optional[str]]:
+        if "." in flag_key:
+            flag_id, value_path = flag_key.split(".", 1)
+            return flag_id, value_path
+        return flag_key, None
+
+    @staticmethod
+    def _unique_flag_names(flags: List[FlagRequest]) -> List[FlagName]:
+        flag_ids = dict.fromkeys(
+            Confidence._split_flag_key(flag.flag_key)[0] for flag in flags
+        )
+        return [FlagName(flag_id) for flag_id in flag_ids]
 
     # type-arg: ignore
     def track(self, event_name: str, data: Dict[str, FieldType]) -> None:
+        if self._event_publisher is not None:
+            self._queue_event(self._event_publisher, event_name, data)
+            return
         self._send_event_internal(event_name, data)
 
     def track_async(self, event_name: str, data: Dict[str, FieldType]) -> None:
-        asyncio.create_task(self._send_event(event_name, data))
+        if self._event_publisher is not None:
+            self._queue_event(self._event_publisher, event_name, data)
+            return
+        task = asyncio.create_task(self._send_event(event_name, data))
+        # keep a reference to the task so that it is not garbage collected
+        self._event_tasks.add(task)
+        task.add_done_callback(self._event_tasks.discard)
+
+    async def flush(self) -> None:
+        """
+        Wait until the events tracked so far have been sent, including the events
+        queued on the event publisher.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = [task for task in self._event_tasks if task.get_loop() is loop]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._event_publisher is not None:
+            await loop.run_in_executor(None, self._event_publisher.flush)
+
+    def _queue_event(
+        self, publisher: EventPublisher, event_name: str, data: Dict[str, FieldType]
+    ) -> None:
+        if not publisher.add(self._build_event(event_name, data)):
+            self.logger.warning(f"Event queue full, dropping event {event_name}")
 
     async def _send_event(self, event_name: str, data: Dict[str, FieldType]) -> None:
-        self._send_event_internal(event_name, data)
+        await self._publish_events_async([self._build_event(event_name, data)])
 
     def _send_event_internal(self, event_name: str, data: Dict[str, FieldType]) -> None:
+        self._publish_events([self._build_event(event_name, data)])
+
+    def _build_event(self, event_name: str, data: Dict[str, FieldType]) -> Event:
+        return {
+            "eventDefinition": f"eventDefinitions/{event_name}",
+            "payload": {"context": {**self.context}, **data},
+            "eventTime": datetime.utcnow().isoformat() + "Z",
+        }
+
+    def _build_publish_request(self, events: List[Event]) -> TransportRequest:
+        request_body = {
+            "clientSecret": self._client_secret,
+            "sendTime": datetime.utcnow().isoformat() + "Z",
+            "events": events,
+            "sdk": {"id": "SDK_ID_PYTHON_CONFIDENCE", "version": __version__},
+        }
+        events_base_url = self._custom_events_base_url or EVENTS_BASE_URL
+        return TransportRequest(
+            f"{events_base_url}/v1/events:publish",
+            request_body,
+            EVENTS_HEADERS,
+            self._timeout_sec(),
+        )
+
+    def _handle_publish_response(
+        self, response: TransportResponse, events: List[Event]
+    ) -> bool:
+        if response.status_code != 200:
+            self.logger.warning(
+                f"Track {self._describe_events(events)} failed with status code"
+                + f" {response.status_code} and reason: {response.reason}"
+            )
+            return False
+        json_errors = (response.body or {}).get("errors")
+        if json_errors:
+            self.logger.warning("events emitted with errors:")
+            for error in json_errors:
+                self.logger.warning(error)
+        return True
+
+    def _publish_events(self, events: List[Event]) -> bool:
+        try:
+            response = self._transport.send(self._build_publish_request(events))
+            return self._handle_publish_response(response, events)
+        except TransportError as e:
+            self.logger.warning(
+                f"Failed to track {self._describe_events(events)}: {str(e)}"
+            )
+        return False
+
+    async def _publish_events_async(self, events: List[Event]) -> bool:
+        try:
+            response = await self._async_transport.send_async(
+                self._build_publish_request(events)
+            )
+            return self._handle_publish_response(response, events)
+        except TransportError as e:
+            self.logger.warning(
+                f"Failed to track {self._describe_events(events)}: {str(e)}"
+            )
+        return False
+
+    @staticmethod
+    def _describe_events(events: List[Event]) -> str:
+        if len(events) == 1:
+            event_name = events[0]["eventDefinition"].split("/", 1)[1]
+            return f"event {event_name}"
+        return f"{len(events)} events"
+
+    def _build_resolve_request(
+        self,
+        flag_names: List[FlagName],
+        context: Dict[str, FieldType],
+        base_url: str,
+        timeout_sec: Optional[float],
+    ) -> TransportRequest:
+        request_body = {
+            "clientSecret": self._client_secret,
+            "evaluationContext": context,
+            "apply": self._apply_in_resolve,
+            "flags": [str(flag_name) for flag_name in flag_names],
+            "sdk": {"id": "SDK_ID_PYTHON_CONFIDENCE", "version": __version__},
+        }
+        return TransportRequest(
+            f"{base_url}/v1/flags:resolve",
+            request_body,
+            self._get_resolve_headers(),
+            timeout_sec,
+        )
+
+    def _timeout_sec(self) -> Optional[float]:
+        return None if self._timeout_ms is None else self._timeout_ms / 1000.0
+
+    def _resolve_base_url(self) -> str:
+        if self._endpoint_selector is not None:
+            return self._endpoint_selector.select()
+        if self._custom_resolve_base_url is not None:
+            return self._custom_resolve_base_url
+        return self._api_endpoint
+
+    @staticmethod
+    def _describe_flags(flag_names: List[FlagName]) -> str:
+        if len(flag_names) == 0:
+            return "all flags"
+        if len(flag_names) == 1:
+            return f"flag {flag_names[0]}"
+        return "flags " + ", ".join(str(flag_name) for flag_name in flag_names)
+
+    def _send_apply(self, resolve_token: str, applied_flags: List[AppliedFlag]) -> None:
         current_time = datetime.utcnow().isoformat() + "Z"
         request_body = {
             "clientSecret": self._client_secret,
+            "resolveToken": resolve_token,
             "sendTime": current_time,
-            "events": [
-                {
-                    "eventDefinition": f"eventDefinitions/{event_name}",
-                    "payload": {"context": {**self.context}, **data},
-                    "eventTime": current_time,
-                }
+            "flags": [
+                {"flag": flag, "applyTime": apply_time}
+                for flag, apply_time in applied_flags
             ],
             "sdk": {"id": "SDK_ID_PYTHON_CONFIDENCE", "version": __version__},
         }
-
-        event_url = "https://events.confidence.dev/v1/events:publish"
+        apply_url = f"{self._resolve_base_url()}/v1/flags:apply"
         headers = {"Content-Type": "application/json", "Accept": "application/json"}
-        timeout_sec = None if self._timeout_ms is None else self._timeout_ms / 1000.0
         try:
-            response = requests.post(
-                event_url, json=request_body, headers=headers, timeout=timeout_sec
-            )
-            if response.status_code == 200:
-                json = response.json()
-                json_errors = json.get("errors")
-                if json_errors:
-                    self.logger.warning("events emitted with errors:")
-                    for error in json_errors:
-                        self.logger.warning(error)
-            else:
+            response = self._transport.send(
+                TransportRequest(apply_url, request_body, headers, self._timeout_sec())
+            )
+            if response.status_code != 200:
                 self.logger.warning(
-                    f"Track event {event_name} failed with status code"
+                    f"Applying {len(applied_flags)} flags failed with status code"
                     + f" {response.status_code} and reason: {response.reason}"
                 )
-        except requests.exceptions.RequestException as e:
-            self.logger.warning(f"Failed to track event {event_name}: {str(e)}")
+        except TransportError as e:
+            self.logger.warning(f"Failed to apply {len(applied_flags)} flags: {str(e)}")
 
     def _handle_resolve_response(
-        self, response: requests.Response, flag_name: FlagName
-    ) -> ResolveResult:
+        self,
+        response: TransportResponse,
+        flag_names: List[FlagName],
+    ) -> Dict[str, ResolveResult]:
         if response.status_code == 404:
-            self.logger.error(f"Flag {flag_name} not found")
+            description = self._describe_flags(flag_names)
+            self._log_error(
+                logging.ERROR,
+                description,
+                ErrorCode.FLAG_NOT_FOUND.value,
+                f"{description} not found",
+            )
             raise FlagNotFoundError()
 
-        response.raise_for_status()
+        if response.status_code >= 400:
+            raise HttpStatusError(response)
 
-        response_body = response.json()
+        response_body = response.body
+        if not isinstance(response_body, dict):
+            raise TransportError("Resolve response is not a JSON object")
 
         resolved_flags = response_body["resolvedFlags"]
         token = response_body["resolveToken"]
 
-        if len(resolved_flags) == 0:
-            raise FlagNotFoundError()
-
-        resolved_flag = resolved_flags[0]
-        variant = resolved_flag.get("variant")
-        return ResolveResult(
-            resolved_flag.get("value"), None if variant == "" else variant, token
-        )
+        results: Dict[str, ResolveResult] = {}
+        for index, resolved_flag in enumerate(resolved_flags):
+            if resolved_flag.get("flag"):
+                flag_id = FlagName.parse(resolved_flag["flag"]).flag
+            elif index < len(flag_names):
+                # older resolvers may omit the flag name, match by position
+                flag_id = flag_names[index].flag
+            else:
+                continue
+            variant = resolved_flag.get("variant")
+            results[flag_id] = ResolveResult(
+                resolved_flag.get("value"), None if variant == "" else variant, token
+            )
+        return results
 
     def _resolve(
         self, flag_name: FlagName, context: Dict[str, FieldType]
     ) -> ResolveResult:
-        start_time = time.perf_counter()
-        request_body = {
-            "clientSecret": self._client_secret,
-            "evaluationContext": context,
-            "apply": self._apply_on_resolve,
-            "flags": [str(flag_name)],
-            "sdk": {"id": "SDK_ID_PYTHON_CONFIDENCE", "version": __version__},
-        }
-        base_url = self._api_endpoint
-        if self._custom_resolve_base_url is not None:
-            base_url = self._custom_resolve_base_url
-
-        resolve_url = f"{base_url}/v1/flags:resolve"
-        timeout_sec = None if self._timeout_ms is None else self._timeout_ms / 1000.0
+        results = self._resolve_flags([flag_name], context)
+        if flag_name.flag not in results:
+            raise FlagNotFoundError()
+        return results[flag_name.flag]
 
+    async def _resolve_async(
+        self, flag_name: FlagName, context: Dict[str, FieldType]
+    ) -> ResolveResult:
+        results = await self._resolve_flags_async([flag_name], context)
+        if flag_name.flag not in results:
+            raise FlagNotFoundError()
+        return results[flag_name.flag]
+
+    def _resolve_flags(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        cache = self._resolve_cache
+        if cache is None:
+            return self._fetch_flags(flag_names, context)
+        fingerprint = self._cache_fingerprint(context)
+        results, missing, stale = self._lookup_cached(cache, flag_names, fingerprint)
+        if stale and cache.stale_while_revalidate:
+            self._refresh_in_background(cache, list(stale), context, fingerprint)
+        if flag_names and not missing:
+            return results
         try:
-            response = requests.post(
-                resolve_url,
-                json=request_body,
-                headers=self._get_resolve_headers(),
-                timeout=timeout_sec,
+            fetched = self._fetch_flags(missing, context)
+        except (TimeoutError, GeneralError, CircuitOpenError):
+            last_known_good = self._last_known_good(results, missing, stale)
+            if last_known_good is None:
+                raise
+            return last_known_good
+        self._store_cached(cache, fetched, fingerprint)
+        return {**results, **fetched}
+
+    async def _resolve_flags_async(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        cache = self._resolve_cache
+        if cache is None:
+            return await self._fetch_flags_async(flag_names, context)
+        fingerprint = self._cache_fingerprint(context)
+        results, missing, stale = self._lookup_cached(cache, flag_names, fingerprint)
+        if stale and cache.stale_while_revalidate:
+            self._refresh_in_background_async(cache, list(stale), context, fingerprint)
+        if flag_names and not missing:
+            return results
+        try:
+            fetched = await self._fetch_flags_async(missing, context)
+        except (TimeoutError, GeneralError, CircuitOpenError):
+            last_known_good = self._last_known_good(results, missing, stale)
+            if last_known_good is None:
+                raise
+            return last_known_good
+        self._store_cached(cache, fetched, fingerprint)
+        return {**results, **fetched}
+
+    def _cache_fingerprint(self, context: Dict[str, FieldType]) -> str:
+        """
+        The fingerprint that cache entries are stored under. A cache can be shared
+        by clients with other client secrets or apply settings, which must not be
+        served each other's resolves.
+        """
+        return context_fingerprint(
+            {
+                "clientSecret": self._client_secret,
+                "apply": self._apply_in_resolve,
+                "evaluationContext": context,
+            }
+        )
+
+    def _lookup_cached(
+        self, cache: ResolveCache, flag_names: List[FlagName], fingerprint: str
+    ) -> Tuple[Dict[str, ResolveResult], List[FlagName], Dict[str, ResolveResult]]:
+        """
+        Split the flags into cache hits, flags that must be fetched and stale
+        entries. Stale entries count as hits when the cache serves them while
+        revalidating, otherwise they are fetched and kept as a fallback.
+        """
+        results: Dict[str, ResolveResult] = {}
+        missing: List[FlagName] = []
+        stale: Dict[str, ResolveResult] = {}
+        for flag_name in flag_names:
+            cached, is_stale = cache.lookup(flag_name.flag, fingerprint)
+            if cached is None:
+                missing.append(flag_name)
+                continue
+            if is_stale:
+                stale[flag_name.flag] = cached
+                if not cache.stale_while_revalidate:
+                    missing.append(flag_name)
+                    continue
+                self._telemetry.add_trace(
+                    ProtoTraceId.PROTO_TRACE_ID_STALE_FLAG,
+                    0,
+                    ProtoStatus.PROTO_STATUS_CACHED,
+                )
+            results[flag_name.flag] = cached
+            self._telemetry.add_trace(
+                ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY,
+                0,
+                ProtoStatus.PROTO_STATUS_CACHED,
+            )
+        return results, missing, stale
+
+    def _last_known_good(
+        self,
+        results: Dict[str, ResolveResult],
+        missing: List[FlagName],
+        stale: Dict[str, ResolveResult],
+    ) -> Optional[Dict[str, ResolveResult]]:
+        if not missing or any(flag_name.flag not in stale for flag_name in missing):
+            return None
+        description = self._describe_flags(missing)
+        self._log_error(
+            logging.WARNING,
+            description,
+            "LAST_KNOWN_GOOD",
+            f"Serving last known good values for {description}",
+        )
+        for flag_name in missing:
+            self._telemetry.add_trace(
+                ProtoTraceId.PROTO_TRACE_ID_STALE_FLAG,
+                0,
+                ProtoStatus.PROTO_STATUS_CACHED,
+            )
+        return {**results, **{f.flag: stale[f.flag] for f in missing}}
+
+    def _refresh_in_background(
+        self,
+        cache: ResolveCache,
+        flags: List[str],
+        context: Dict[str, FieldType],
+        fingerprint: str,
+    ) -> None:
+        claimed = cache.begin_refresh(flags, fingerprint)
+        if not claimed:
+            return
+        flag_names = [FlagName(flag) for flag in claimed]
+        context = {**context}
+
+        def refresh() -> None:
+            try:
+                fetched = self._fetch_flags(flag_names, context)
+                self._store_cached(cache, fetched, fingerprint)
+            except Exception as e:
+                self.logger.warning(
+                    f"Background refresh of {self._describe_flags(flag_names)}"
+                    f" failed, serving stale values: {str(e)}"
+                )
+            finally:
+                cache.end_refresh(claimed, fingerprint)
+
+        cache.run_in_background(refresh)
+
+    def _refresh_in_background_async(
+        self,
+        cache: ResolveCache,
+        flags: List[str],
+        context: Dict[str, FieldType],
+        fingerprint: str,
+    ) -> None:
+        claimed = cache.begin_refresh(flags, fingerprint)
+        if not claimed:
+            return
+        flag_names = [FlagName(flag) for flag in claimed]
+        context = {**context}
+
+        async def refresh() -> None:
+            try:
+                fetched = await self._fetch_flags_async(flag_names, context)
+                self._store_cached(cache, fetched, fingerprint)
+            except Exception as e:
+                self.logger.warning(
+                    f"Background refresh of {self._describe_flags(flag_names)}"
+                    f" failed, serving stale values: {str(e)}"
+                )
+            finally:
+                cache.end_refresh(claimed, fingerprint)
+
+        cache.run_in_background_async(refresh())
+
+    @staticmethod
+    def _store_cached(
+        cache: ResolveCache, results: Dict[str, ResolveResult], fingerprint: str
+    ) -> None:
+        for flag_id, result in results.items():
+            cache.put(flag_id, fingerprint, result)
+
+    def _fetch_flags(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        batcher = self._resolve_batcher
+        if batcher is None or not flag_names:
+            return self._coalesced_fetch(flag_names, context)
+        return batcher.submit(
+            self._batch_key(context), flag_names, context, self._coalesced_fetch
+        )
+
+    async def _fetch_flags_async(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        batcher = self._resolve_batcher
+        if batcher is None or not flag_names:
+            return await self._coalesced_fetch_async(flag_names, context)
+        return await batcher.submit_async(
+            self._batch_key(context),
+            flag_names,
+            context,
+            self._coalesced_fetch_async,
+        )
+
+    def _batch_key(self, context: Dict[str, FieldType]) -> Tuple[str, bool]:
+        return context_fingerprint(context), self._apply_in_resolve
+
+    def _coalesced_fetch(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        single_flight = self._single_flight
+        if single_flight is None:
+            return self._post_resolve(flag_names, context)
+        # only the leader's request is traced, the followers did not send one
+        results, _ = single_flight.do(
+            self._in_flight_key(flag_names, context),
+            lambda: self._post_resolve(flag_names, context),
+        )
+        return results
+
+    def _in_flight_key(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Tuple[Tuple[str, ...], str, bool]:
+        return (
+            tuple(str(flag_name) for flag_name in flag_names),
+            context_fingerprint(context),
+            self._apply_in_resolve,
+        )
+
+    def _post_resolve(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        timeout_sec = self._timeout_sec()
+        retry_policy = self._retry_policy
+        if retry_policy is None:
+            return self._post_resolve_attempt(flag_names, context, timeout_sec)
+        return retry_policy.call(
+            lambda attempt_timeout: self._post_resolve_attempt(
+                flag_names, context, attempt_timeout
+            ),
+            timeout_sec,
+        )
+
+    def _post_resolve_attempt(
+        self,
+        flag_names: List[FlagName],
+        context: Dict[str, FieldType],
+        timeout_sec: Optional[float],
+    ) -> Dict[str, ResolveResult]:
+        hedge_policy = self._hedge_policy
+        if hedge_policy is None:
+            return self._guarded_send_resolve(
+                self._resolve_base_url(), flag_names, context, timeout_sec
             )
+        return hedge_policy.call(
+            lambda base_url: self._guarded_send_resolve(
+                base_url, flag_names, context, timeout_sec
+            ),
+            self._resolve_base_url(),
+        )
+
+    def _guarded_send_resolve(
+        self,
+        base_url: str,
+        flag_names: List[FlagName],
+        context: Dict[str, FieldType],
+        timeout_sec: Optional[float],
+    ) -> Dict[str, ResolveResult]:
+        circuit_breaker = self._circuit_breaker
+        if circuit_breaker is None:
+            return self._send_resolve(base_url, flag_names, context, timeout_sec)
+        return circuit_breaker.call(
+            base_url,
+            lambda: self._send_resolve(base_url, flag_names, context, timeout_sec),
+        )
+
+    def _send_resolve(
+        self,
+        base_url: str,
+        flag_names: List[FlagName],
+        context: Dict[str, FieldType],
+        timeout_sec: Optional[float],
+    ) -> Dict[str, ResolveResult]:
+        start_time = time.perf_counter()
+        request = self._build_resolve_request(
+            flag_names, context, base_url, timeout_sec
+        )
+
+        try:
+            response = self._transport.send(request)
 
-            result = self._handle_resolve_response(response, flag_name)
+            results = self._handle_resolve_response(response, flag_names)
             duration_ms = int((time.perf_counter() - start_time) * 1000)
             self._telemetry.add_trace(
                 ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY,
                 duration_ms,
                 ProtoStatus.PROTO_STATUS_SUCCESS,
             )
-            return result
-        except requests.exceptions.Timeout:
+            self._record_endpoint(base_url, duration_ms, True)
+            return results
+        except TransportTimeout as e:
             duration_ms = int((time.perf_counter() - start_time) * 1000)
             self._telemetry.add_trace(
                 ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY,
                 duration_ms,
                 ProtoStatus.PROTO_STATUS_TIMEOUT,
             )
-            self.logger.warning(
-                f"Request timed out after {timeout_sec}s"
-                f" when resolving flag {flag_name}"
+            self._record_endpoint(base_url, duration_ms, False)
+            description = self._describe_flags(flag_names)
+            self._log_error(
+                logging.WARNING,
+                description,
+                ErrorCode.TIMEOUT.value,
+                f"Request timed out after {timeout_sec}s when resolving {description}",
             )
-            raise TimeoutError()
-        except requests.exceptions.RequestException as e:
+            raise TimeoutError() from e
+        except (TransportError, HttpStatusError) as e:
             duration_ms = int((time.perf_counter() - start_time) * 1000)
             self._telemetry.add_trace(
                 ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY,
                 duration_ms,
                 ProtoStatus.PROTO_STATUS_ERROR,
             )
-            self.logger.warning(f"Error resolving flag {flag_name}: {str(e)}")
-            raise GeneralError(str(e))
+            self._record_endpoint(base_url, duration_ms, not is_transient(e))
+            description = self._describe_flags(flag_names)
+            self._log_error(
+                logging.WARNING,
+                description,
+                ErrorCode.GENERAL.value,
+                f"Error resolving {description}: {str(e)}",
+            )
+            raise GeneralError(str(e)) from e
+
+    def _log_error(self, level: int, flag: str, kind: str, message: str) -> None:
+        """
+        Log an error of an evaluation or resolve, through the log limiter when
+        there is one, so that repeats of the same (flag, kind) are summarized.
+        """
+        if self._log_limiter is None:
+            self.logger.log(level, message)
+        else:
+            self._log_limiter.log(self.logger, level, (flag, kind), message)
 
-    async def _resolve_async(
-        self, flag_name: FlagName, context: Dict[str, FieldType]
-    ) -> ResolveResult:
-        start_time = time.perf_counter()
-        request_body = {
-            "clientSecret": self._client_secret,
-            "evaluationContext": context,
-            "apply": self._apply_on_resolve,
-            "flags": [str(flag_name)],
-            "sdk": {"id": "SDK_ID_PYTHON_CONFIDENCE", "version": __version__},
-        }
-        base_url = self._api_endpoint
-        if self._custom_resolve_base_url is not None:
-            base_url = self._custom_resolve_base_url
+    def _record_endpoint(self, base_url: str, duration_ms: int, success: bool) -> None:
+        if self._endpoint_selector is not None:
+            self._endpoint_selector.record(base_url, duration_ms, success)
 
-        resolve_url = f"{base_url}/v1/flags:resolve"
-        timeout_sec = None if self._timeout_ms is None else self._timeout_ms / 1000.0
-        try:
-            response = await self.async_client.post(
-                resolve_url,
-                json=request_body,
-                headers=self._get_resolve_headers(),
-                timeout=timeout_sec,
+    def _probe_endpoint(self, base_url: str) -> None:
+        # an empty request is rejected before any flag is resolved, so the probe
+        # measures the round trip without adding load on the resolver. Telemetry
+        # is left for the resolves, the rejected probe would drop its traces
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        response = self._transport.send(
+            TransportRequest(
+                f"{base_url}/v1/flags:resolve", {}, headers, self._timeout_sec()
+            )
+        )
+        if response.status_code >= 500:
+            raise GeneralError(f"Probe of {base_url} failed: {response.status_code}")
+
+    async def _coalesced_fetch_async(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        single_flight = self._async_single_flight
+        if single_flight is None:
+            return await self._post_resolve_async(flag_names, context)
+        # only the leader's request is traced, the followers did not send one
+        results, _ = await single_flight.do(
+            self._in_flight_key(flag_names, context),
+            lambda: self._post_resolve_async(flag_names, context),
+        )
+        return results
+
+    async def _post_resolve_async(
+        self, flag_names: List[FlagName], context: Dict[str, FieldType]
+    ) -> Dict[str, ResolveResult]:
+        timeout_sec = self._timeout_sec()
+        retry_policy = self._retry_policy
+        if retry_policy is None:
+            return await self._post_resolve_attempt_async(
+                flag_names, context, timeout_sec
+            )
+        return await retry_policy.call_async(
+            lambda attempt_timeout: self._post_resolve_attempt_async(
+                flag_names, context, attempt_timeout
+            ),
+            timeout_sec,
+        )
+
+    async def _post_resolve_attempt_async(
+        self,
+        flag_names: List[FlagName],
+        context: Dict[str, FieldType],
+        timeout_sec: Optional[float],
+    ) -> Dict[str, ResolveResult]:
+        hedge_policy = self._hedge_policy
+        if hedge_policy is None:
+            return await self._limited_send_resolve_async(
+                self._resolve_base_url(), flag_names, context, timeout_sec
+            )
+        return await hedge_policy.call_async(
+            lambda base_url: self._limited_send_resolve_async(
+                base_url, flag_names, context, timeout_sec
+            ),
+            self._resolve_base_url(),
+        )
+
+    async def _limited_send_resolve_async(
+        self,
+        base_url: str,
+        flag_names: List[FlagName],
+        context: Dict[str, FieldType],
+        timeout_sec: Optional[float],
+    ) -> Dict[str, ResolveResult]:
+        # the slot is taken outside the circuit breaker, a caller that times out
+        # waiting for a local slot says nothing about the health of the endpoint
+        limiter = self._resolve_limiter
+        if limiter is None:
+            return await self._guarded_send_resolve_async(
+                base_url, flag_names, context, timeout_sec
+            )
+        # the request gets what is left of the timeout after waiting for a slot
+        async with limiter.acquire(timeout_sec) as remaining_sec:
+            return await self._guarded_send_resolve_async(
+                base_url, flag_names, context, remaining_sec
             )
-            result = self._handle_resolve_response(response, flag_name)
+
+    async def _guarded_send_resolve_async(
+        self,
+        base_url: str,
+        flag_names: List[FlagName],
+        context: Dict[str, FieldType],
+        timeout_sec: Optional[float],
+    ) -> Dict[str, ResolveResult]:
+        circuit_breaker = self._circuit_breaker
+        if circuit_breaker is None:
+            return await self._send_resolve_async(
+                base_url, flag_names, context, timeout_sec
+            )
+        return await circuit_breaker.call_async(
+            base_url,
+            lambda: self._send_resolve_async(
+                base_url, flag_names, context, timeout_sec
+            ),
+        )
+
+    async def _send_resolve_async(
+        self,
+        base_url: str,
+        flag_names: List[FlagName],
+        context: Dict[str, FieldType],
+        timeout_sec: Optional[float],
+    ) -> Dict[str, ResolveResult]:
+        start_time = time.perf_counter()
+        request = self._build_resolve_request(
+            flag_names, context, base_url, timeout_sec
+        )
+        try:
+            response = await self._async_transport.send_async(request)
+            results = self._handle_resolve_response(response, flag_names)
             duration_ms = int((time.perf_counter() - start_time) * 1000)
             self._telemetry.add_trace(
                 ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY,
                 duration_ms,
                 ProtoStatus.PROTO_STATUS_SUCCESS,
             )
-            return result
-        except httpx.TimeoutException:
+            self._record_endpoint(base_url, duration_ms, True)
+            return results
+        except TransportTimeout as e:
             duration_ms = int((time.perf_counter() - start_time) * 1000)
             self._telemetry.add_trace(
                 ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY,
                 duration_ms,
                 ProtoStatus.PROTO_STATUS_TIMEOUT,
             )
-            self.logger.warning(
-                f"Request timed out after {timeout_sec}s"
-                f" when resolving flag {flag_name}"
+            self._record_endpoint(base_url, duration_ms, False)
+            description = self._describe_flags(flag_names)
+            self._log_error(
+                logging.WARNING,
+                description,
+                ErrorCode.TIMEOUT.value,
+                f"Request timed out after {timeout_sec}s when resolving {description}",
             )
-            raise TimeoutError()
-        except httpx.HTTPError as e:
+            raise TimeoutError() from e
+        except (TransportError, HttpStatusError) as e:
             duration_ms = int((time.perf_counter() - start_time) * 1000)
             self._telemetry.add_trace(
                 ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY,
                 duration_ms,
                 ProtoStatus.PROTO_STATUS_ERROR,
             )
-            self.logger.warning(f"Error resolving flag {flag_name}: {str(e)}")
-            raise GeneralError(str(e))
+            self._record_endpoint(base_url, duration_ms, not is_transient(e))
+            description = self._describe_flags(flag_names)
+            self._log_error(
+                logging.WARNING,
+                description,
+                ErrorCode.GENERAL.value,
+                f"Error resolving {description}: {str(e)}",
+            )
+            raise GeneralError(str(e)) from e
 
     @staticmethod
     def _select(
@@ -581,3 +1451,77 @@ class Confidence:
             return isinstance(value, dict)
 
         return False
+
+
+class FlagSnapshot:
+    """
+    An immutable set of flags resolved for a fixed evaluation context. Typed reads
+    are evaluated locally and never reach the network.
+    """
+
+    def __init__(
+        self,
+        confidence: Confidence,
+        context: Dict[str, FieldType],
+        results: Dict[str, ResolveResult],
+        error: Optional[Exception] = None,
+    ):
+        self._confidence = confidence
+        self._context = context
+        self._results = MappingProxyType(dict(results))
+        self._error = error
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """The error of the resolve, reads then return their default values."""
+        return self._error
+
+    @property
+    def context(self) -> Mapping[str, FieldType]:
+        return MappingProxyType(self._context)
+
+    @property
+    def flags(self) -> List[str]:
+        return list(self._results.keys())
+
+    def resolve_boolean_details(
+        self, flag_key: str, default_value: bool
+    ) -> FlagResolutionDetails[bool]:
+        return self._evaluate(flag_key, bool, default_value)
+
+    def resolve_float_details(
+        self, flag_key: str, default_value: float
+    ) -> FlagResolutionDetails[float]:
+        return self._evaluate(flag_key, float, default_value)
+
+    def resolve_integer_details(
+        self, flag_key: str, default_value: int
+    ) -> FlagResolutionDetails[int]:
+        return self._evaluate(flag_key, int, default_value)
+
+    def resolve_string_details(
+        self, flag_key: str, default_value: str
+    ) -> FlagResolutionDetails[str]:
+        return self._evaluate(flag_key, str, default_value)
+
+    def resolve_object_details(
+        self, flag_key: str, default_value: Union[Object, List[Primitive]]
+    ) -> FlagResolutionDetails[Union[Object, List[Primitive]]]:
+        return self._evaluate(flag_key, Object, default_value)
+
+    def _evaluate(
+        self,
+        flag_key: str,
+        value_type: Type[FieldType],
+        default_value: FieldType,
+    ) -> FlagResolutionDetails[Any]:
+        if self._error is not None:
+            return self._confidence._handle_evaluation_error(
+                self._error, flag_key, default_value, Reason.ERROR
+            )
+        return self._confidence._handle_evaluation_results(
+            self._results,
+            [FlagRequest(flag_key, value_type, default_value)],
+            self._context,
+            Reason.ERROR,
+        )[flag_key]
@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    from confidence.confidence import Region
+
+DEFAULT_PROBE_INTERVAL_SECONDS = 60.0
+DEFAULT_LATENCY_SMOOTHING = 0.2
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_SWITCH_MARGIN = 0.2
+
+# sends a probe to the given base url, raises if the endpoint is unhealthy
+EndpointProbe = Callable[[str], None]
+
+
+class _EndpointStats(object):
+    def __init__(self) -> None:
+        self.latency_ms: Optional[float] = None
+        self.consecutive_failures = 0
+
+
+class EndpointSelector:
+    """
+    Routes resolves to the fastest healthy endpoint among candidates. Each
+    endpoint is probed when the selector is bound and then every
+    probe_interval_seconds, and every live resolve also updates the smoothed
+    latency of its endpoint. An endpoint is unhealthy after failure_threshold
+    consecutive failures and is skipped until a probe or resolve succeeds again.
+    To avoid flapping, traffic only moves to a faster endpoint when it is at
+    least switch_margin faster than the current one.
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[Union["Region", str]],
+        probe_interval_seconds: float = DEFAULT_PROBE_INTERVAL_SECONDS,
+        latency_smoothing: float = DEFAULT_LATENCY_SMOOTHING,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        switch_margin: float = DEFAULT_SWITCH_MARGIN,
+        logger: logging.Logger = logging.getLogger("confidence_logger"),
+    ):
+        if not candidates:
+            raise ValueError("EndpointSelector needs at least one candidate")
+        self.candidates: List[str] = [
+            candidate if isinstance(candidate, str) else candidate.value
+            for candidate in candidates
+        ]
+        self.probe_interval_seconds = probe_interval_seconds
+        self.latency_smoothing = latency_smoothing
+        self.failure_threshold = failure_threshold
+        self.switch_margin = switch_margin
+        self.logger = logger
+        self.failovers = 0
+        self._stats: Dict[str, _EndpointStats] = {
+            candidate: _EndpointStats() for candidate in self.candidates
+        }
+        self._selected = self.candidates[0]
+        self._lock = threading.Lock()
+        self._probe: Optional[EndpointProbe] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def bind(self, probe: EndpointProbe) -> None:
+        """
+        Set the function used to probe an endpoint and start probing in the
+        background. Only the first binding is kept, so instances derived with
+        with_context share the selector of their parent.
+        """
+        with self._lock:
+            if self._probe is not None:
+                return
+            self._probe = probe
+            self._thread = threading.Thread(
+                target=self._run, name="confidence-endpoints", daemon=True
+            )
+            self._thread.start()
+
+    def select(self) -> str:
+        return self._selected
+
+    def latencies(self) -> Dict[str, Optional[float]]:
+        """The smoothed latency in milliseconds of every candidate."""
+        with self._lock:
+            return {
+                endpoint: stats.latency_ms for endpoint, stats in self._stats.items()
+            }
+
+    def is_healthy(self, endpoint: str) -> bool:
+        return self._stats[endpoint].consecutive_failures < self.failure_threshold
+
+    def record(self, endpoint: str, latency_ms: float, success: bool) -> None:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            return
+        with self._lock:
+            if success:
+                stats.consecutive_failures = 0
+                if stats.latency_ms is None:
+                    stats.latency_ms = latency_ms
+                else:
+                    stats.latency_ms += self.latency_smoothing * (
+                        latency_ms - stats.latency_ms
+                    )
+            else:
+                stats.consecutive_failures += 1
+            self._reselect()
+
+    def probe_all(self) -> None:
+        probe = self._probe
+        if probe is None:
+            return
+        for endpoint in self.candidates:
+            start_time = time.perf_counter()
+            try:
+                probe(endpoint)
+            except Exception as e:
+                self.logger.debug(f"Probe of {endpoint} failed: {e}")
+                self.record(endpoint, 0, success=False)
+                continue
+            self.record(endpoint, (time.perf_counter() - start_time) * 1000, True)
+
+    def close(self) -> None:
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _reselect(self) -> None:
+        current = self._selected
+        latencies = {
+            endpoint: stats.latency_ms
+            for endpoint, stats in self._stats.items()
+            if self.is_healthy(endpoint) and stats.latency_ms is not None
+        }
+        if not latencies:
+            return
+        fastest = min(latencies, key=latencies.__getitem__)
+        if fastest == current:
+            return
+        current_latency = latencies.get(current)
+        if current_latency is not None and latencies[fastest] > current_latency * (
+            1 - self.switch_margin
+        ):
+            return
+        if not self.is_healthy(current):
+            self.failovers += 1
+        self.logger.info(f"Routing resolves to {fastest} instead of {current}")
+        self._selected = fastest
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self.probe_all()
+            self._stopped.wait(self.probe_interval_seconds)
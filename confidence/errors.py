@@ -11,6 +11,7 @@ class ErrorCode(Enum):
     INVALID_CONTEXT = "INVALID_CONTEXT"
     GENERAL = "GENERAL"
     TIMEOUT = "TIMEOUT"
+    CIRCUIT_OPEN = "CIRCUIT_OPEN"
 
 
 class ConfidenceError(Exception):
@@ -140,3 +141,19 @@ class InvalidContextError(ConfidenceError):
         raised
         """
         super().__init__(ErrorCode.INVALID_CONTEXT, error_message)
+
+
+class CircuitOpenError(ConfidenceError):
+    """
+    This exception should be raised when a request is not sent because the
+    circuit breaker for the endpoint is open.
+    """
+
+    def __init__(self, error_message: typing.Optional[str] = None):
+        """
+        Constructor for the CircuitOpenError. The error code for this type of
+        exception is ErrorCode.CIRCUIT_OPEN.
+        @param error_message: an optional string message representing why the
+        error has been raised
+        """
+        super().__init__(ErrorCode.CIRCUIT_OPEN, error_message)
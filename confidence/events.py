@@ -0,0 +1,259 @@
+import atexit
+import json
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from confidence.journal import EventJournal
+
+DEFAULT_EVENT_BATCH_SIZE = 100
+DEFAULT_EVENT_FLUSH_INTERVAL_MS = 1000
+DEFAULT_MAX_BATCH_BYTES = 512 * 1024
+DEFAULT_MAX_QUEUED_EVENTS = 10000
+
+Event = Dict[str, Any]
+# sends one events:publish request, returns whether the events were accepted
+EventSender = Callable[[List[Event]], bool]
+# (journal id, event)
+_Batch = List[Tuple[Optional[str], Event]]
+
+
+class EventPublisher:
+    """
+    Queues tracked events in memory and publishes them from a background thread,
+    many events per events:publish request. A batch is sent once max_batch_size
+    events or max_batch_bytes of payload are waiting, or when the oldest queued
+    event is flush_interval_ms old. Events are dropped when max_queued events are
+    already waiting.
+
+    With a journal every event is also written to disk before it is queued. When
+    the in-memory queue is full or a publish fails, events are only kept on disk
+    and read back once the queue has drained, so nothing is dropped until the
+    journal reaches its size cap. Events left in the journal by a previous process
+    are published on startup.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = DEFAULT_EVENT_BATCH_SIZE,
+        flush_interval_ms: float = DEFAULT_EVENT_FLUSH_INTERVAL_MS,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        max_queued: int = DEFAULT_MAX_QUEUED_EVENTS,
+        journal: Optional[EventJournal] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_batch_size = max_batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.max_batch_bytes = max_batch_bytes
+        self.max_queued = max_queued
+        self.journal = journal
+        self.dropped = 0
+        self.spilled = 0
+        self.events_sent = 0
+        self.events_failed = 0
+        self.batches_sent = 0
+        self._clock = clock
+        self._send: Optional[EventSender] = None
+        # (journal id, event, encoded size, enqueue time)
+        self._queue: List[Tuple[Optional[str], Event, int, float]] = []
+        self._queued_bytes = 0
+        self._in_flight: Set[str] = set()
+        # events that add is writing to the journal, queued by add itself
+        self._appending: Set[str] = set()
+        # events waiting in the journal that are not in the in-memory queue
+        self._spilling = journal is not None and journal.pending > 0
+        self._retry_at = clock()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def bind(self, send: EventSender) -> None:
+        """
+        Set the function used to publish a batch of events. Only the first binding
+        is kept, so instances derived with with_context share the publisher of
+        their parent.
+        """
+        with self._condition:
+            if self._send is None:
+                self._send = send
+            if self._spilling:
+                self._ensure_started()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._queued_bytes
+
+    def add(self, event: Event) -> bool:
+        """
+        Queue an event for publishing.
+        @return: False if the event was dropped
+        """
+        size = len(json.dumps(event, separators=(",", ":"), default=str))
+        journal = self.journal
+        if journal is None:
+            with self._condition:
+                if self._closed or len(self._queue) >= self.max_queued:
+                    self.dropped += 1
+                    return False
+                self._enqueue(None, event, size)
+            return True
+        event_id = uuid.uuid4().hex
+        with self._condition:
+            if self._closed:
+                self.dropped += 1
+                return False
+            self._appending.add(event_id)
+        # written without holding the lock, so that tracking threads and the
+        # flusher do not wait for each other's disk writes
+        try:
+            journal.append(event, event_id)
+        except BaseException:
+            with self._condition:
+                self._appending.discard(event_id)
+            raise
+        with self._condition:
+            self._appending.discard(event_id)
+            if len(self._queue) >= self.max_queued or self._spilling:
+                self.spilled += 1
+                self._ensure_started()
+                if not self._spilling:
+                    self._spilling = True
+                    # the flusher reloads from the journal once the queue drains
+                    self._condition.notify()
+                return True
+            self._enqueue(event_id, event, size)
+        return True
+
+    def flush(self) -> None:
+        """
+        Publish every queued event, blocking until the requests are done. Stops at
+        the first failed publish.
+        """
+        while True:
+            with self._condition:
+                if not self._queue and self._spilling:
+                    self._reload()
+                batch = self._take_batch()
+                send = self._send
+            if not batch or not self._publish(send, batch):
+                return
+
+    def close(self) -> None:
+        atexit.unregister(self.close)
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        if self.journal is not None:
+            self.journal.close()
+
+    def _publish(self, send: Optional[EventSender], batch: _Batch) -> bool:
+        accepted = send is not None and send([event for _, event in batch])
+        event_ids = [event_id for event_id, _ in batch if event_id is not None]
+        if accepted and self.journal is not None:
+            self.journal.ack(event_ids)
+        with self._condition:
+            self._in_flight.difference_update(event_ids)
+            self.batches_sent += 1
+            if accepted:
+                self.events_sent += len(batch)
+                return True
+            self.events_failed += len(batch)
+            if self.journal is not None:
+                # the failed and queued events are on disk, retry them later
+                self._queue = []
+                self._queued_bytes = 0
+                self._spilling = True
+                self._retry_at = self._clock() + self.flush_interval_ms / 1000.0
+        return False
+
+    def _enqueue(self, event_id: Optional[str], event: Event, size: int) -> None:
+        self._queue.append((event_id, event, size, self._clock()))
+        self._queued_bytes += size
+        self._ensure_started()
+        # wake the flusher to start the age timer or to send a full batch
+        if len(self._queue) == 1 or self._batch_ready():
+            self._condition.notify()
+
+    def _reload(self) -> None:
+        if self.journal is None:
+            return
+        skipped = self._in_flight | self._appending
+        pending = [
+            (event_id, event)
+            for event_id, event in self.journal.read_pending(
+                self.max_queued + len(skipped)
+            )
+            if event_id not in skipped
+        ][: self.max_queued]
+        self._spilling = len(pending) >= self.max_queued
+        # replayed events are due right away
+        enqueue_time = self._clock() - self.flush_interval_ms / 1000.0
+        for event_id, event in pending:
+            size = len(json.dumps(event, separators=(",", ":"), default=str))
+            self._queue.append((event_id, event, size, enqueue_time))
+            self._queued_bytes += size
+
+    def _batch_ready(self) -> bool:
+        return (
+            len(self._queue) >= self.max_batch_size
+            or self._queued_bytes >= self.max_batch_bytes
+        )
+
+    def _next_flush_in(self) -> Optional[float]:
+        if not self._queue:
+            if self._spilling:
+                return max(0.0, self._retry_at - self._clock())
+            return None
+        if self._batch_ready():
+            return 0
+        oldest = self._queue[0][3]
+        return max(0.0, oldest + self.flush_interval_ms / 1000.0 - self._clock())
+
+    def _take_batch(self) -> _Batch:
+        count = 0
+        size = 0
+        for _, _, event_size, _ in self._queue:
+            if count >= self.max_batch_size or (
+                count > 0 and size + event_size > self.max_batch_bytes
+            ):
+                break
+            count += 1
+            size += event_size
+        batch = [(event_id, event) for event_id, event, _, _ in self._queue[:count]]
+        del self._queue[:count]
+        self._queued_bytes -= size
+        self._in_flight.update(event_id for event_id, _ in batch if event_id)
+        return batch
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="confidence-events", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                wait = self._next_flush_in()
+                while not self._closed and wait != 0:
+                    self._condition.wait(wait)
+                    wait = self._next_flush_in()
+                if self._closed:
+                    return
+                if not self._queue:
+                    self._reload()
+                    continue
+                batch = self._take_batch()
+                send = self._send
+            self._publish(send, batch)
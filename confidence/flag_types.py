@@ -38,6 +38,7 @@ class Reason(StrEnum):
     TARGETING_MATCH = "TARGETING_MATCH"
     UNKNOWN = "UNKNOWN"
     TIMEOUT = "TIMEOUT"
+    CIRCUIT_OPEN = "CIRCUIT_OPEN"
 
 
 FlagMetadata = typing.Mapping[str, typing.Any]
@@ -0,0 +1,237 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from queue import Empty, SimpleQueue
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from confidence.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+    from confidence.confidence import Region
+else:
+    asyncio = lazy_import("asyncio")
+
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_INITIAL_HEDGE_DELAY_MS = 100.0
+DEFAULT_MIN_HEDGE_DELAY_MS = 5.0
+DEFAULT_LATENCY_SAMPLES = 1000
+# the delay is taken from the primary latencies once this many were recorded
+MIN_LATENCY_SAMPLES = 20
+# recompute the percentile after this many new samples instead of on every call
+DELAY_REFRESH_SAMPLES = 50
+DEFAULT_HEDGE_WORKERS = 8
+IDLE_WORKER_TIMEOUT_SEC = 60.0
+
+T = TypeVar("T")
+R = TypeVar("R")
+_Task = Tuple["Future[Any]", Callable[[], Any]]
+
+
+class _ThreadPool(object):
+    """
+    Runs every task at once, on an idle worker thread or on a new one. Workers
+    that stay idle for IDLE_WORKER_TIMEOUT_SEC exit.
+    """
+
+    def __init__(self, thread_name: str) -> None:
+        self._thread_name = thread_name
+        self._tasks: "SimpleQueue[_Task]" = SimpleQueue()
+        self._idle = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[], R]) -> "Future[R]":
+        future: "Future[R]" = Future()
+        with self._lock:
+            start_worker = self._idle == 0
+            if not start_worker:
+                self._idle -= 1
+        self._tasks.put((future, fn))
+        if start_worker:
+            threading.Thread(
+                target=self._work, name=self._thread_name, daemon=True
+            ).start()
+        return future
+
+    def _work(self) -> None:
+        while True:
+            try:
+                future, fn = self._tasks.get(timeout=IDLE_WORKER_TIMEOUT_SEC)
+            except Empty:
+                with self._lock:
+                    # a task was handed to this worker just as it timed out
+                    if self._idle == 0:
+                        continue
+                    self._idle -= 1
+                    return
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn()
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            del future, fn
+            with self._lock:
+                self._idle += 1
+
+
+class HedgePolicy:
+    """
+    Sends a second, identical resolve to a secondary endpoint when the primary
+    endpoint has not answered within the given percentile of its recent
+    latencies, and uses whichever response arrives first. A fixed delay_ms can
+    be set instead of the percentile. On the async path the slower request is
+    cancelled. On the sync path the primary requests run in worker threads that
+    are started as needed, so they never wait for each other, and the hedged
+    requests in at most max_workers worker threads. The slower request is left
+    to finish in its thread.
+    """
+
+    def __init__(
+        self,
+        secondary: Union["Region", str],
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        delay_ms: Optional[float] = None,
+        initial_delay_ms: float = DEFAULT_INITIAL_HEDGE_DELAY_MS,
+        min_delay_ms: float = DEFAULT_MIN_HEDGE_DELAY_MS,
+        latency_samples: int = DEFAULT_LATENCY_SAMPLES,
+        max_workers: int = DEFAULT_HEDGE_WORKERS,
+    ):
+        self.secondary = secondary if isinstance(secondary, str) else secondary.value
+        self.percentile = percentile
+        self.delay_ms = delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.max_workers = max_workers
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+        self._samples_since_refresh = 0
+        self._from_samples = False
+        self._current_delay_ms = initial_delay_ms
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._primaries = _ThreadPool("confidence-hedge-primary")
+
+    def hedge_delay_ms(self) -> float:
+        if self.delay_ms is not None:
+            return self.delay_ms
+        return self._current_delay_ms
+
+    def record_latency(self, latency_ms: float) -> None:
+        with self._lock:
+            self._latencies.append(latency_ms)
+            self._samples_since_refresh += 1
+            if len(self._latencies) < MIN_LATENCY_SAMPLES:
+                return
+            if self._from_samples and (
+                self._samples_since_refresh < DELAY_REFRESH_SAMPLES
+            ):
+                return
+            self._samples_since_refresh = 0
+            self._from_samples = True
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+        self._current_delay_ms = max(self.min_delay_ms, latencies[index])
+
+    def call(self, send: Callable[[str], T], primary: str) -> T:
+        """
+        Send to the primary endpoint, and to the secondary one if the primary is
+        slow, from worker threads.
+        @param send: sends the resolve to the given base url
+        """
+        first = self._primaries.submit(lambda: self._timed(send, primary))
+        futures: List["Future[T]"] = [first]
+        try:
+            done, _ = wait(futures, timeout=self.hedge_delay_ms() / 1000.0)
+            if done:
+                return first.result()
+            with self._lock:
+                self.hedged += 1
+            second = self._get_executor().submit(send, self.secondary)
+            futures.append(second)
+            pending = set(futures)
+            errors: List[BaseException] = []
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    if error is None:
+                        if future is second:
+                            self._count_win()
+                        return future.result()
+                    errors.append(error)
+            raise errors[0]
+        finally:
+            for future in futures:
+                # only stops a hedged request that is still waiting for a worker
+                future.cancel()
+
+    async def call_async(self, send: Callable[[str], Awaitable[T]], primary: str) -> T:
+        """Async version of call, cancels the request that loses."""
+        first = asyncio.ensure_future(self._timed_async(send, primary))
+        tasks: Set["asyncio.Future[T]"] = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay_ms() / 1000.0)
+            if done:
+                return first.result()
+            self.hedged += 1
+            second = asyncio.ensure_future(send(self.secondary))
+            tasks.add(second)
+            pending = set(tasks)
+            errors: List[BaseException] = []
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is second:
+                            self._count_win()
+                        return task.result()
+                    errors.append(error)
+            raise errors[0]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _count_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def _timed(self, send: Callable[[str], T], endpoint: str) -> T:
+        start_time = time.perf_counter()
+        result = send(endpoint)
+        self.record_latency((time.perf_counter() - start_time) * 1000)
+        return result
+
+    async def _timed_async(
+        self, send: Callable[[str], Awaitable[T]], endpoint: str
+    ) -> T:
+        start_time = time.perf_counter()
+        result = await send(endpoint)
+        self.record_latency((time.perf_counter() - start_time) * 1000)
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="confidence-hedge"
+                )
+            return self._executor
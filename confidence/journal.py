@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, TextIO, Tuple
+
+DEFAULT_MAX_SEGMENT_BYTES = 1024 * 1024
+DEFAULT_MAX_JOURNAL_BYTES = 64 * 1024 * 1024
+DEFAULT_FSYNC_INTERVAL_MS = 1000
+SEGMENT_SUFFIX = ".log"
+
+Event = Dict[str, Any]
+
+
+class FsyncPolicy(Enum):
+    ALWAYS = "always"  # fsync after every append, safest and slowest
+    INTERVAL = "interval"  # fsync at most every fsync_interval_ms
+    NEVER = "never"  # leave flushing to disk to the operating system
+
+
+class _Segment(object):
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.unacked: Set[str] = set()
+        # only the segment that is currently written to is kept open
+        self.file: Optional[TextIO] = None
+
+
+class EventJournal:
+    """
+    Append-only on-disk journal of tracked events, split into segment files in
+    directory. Every event gets a unique id. Acknowledged ids are appended to the
+    segment that holds the event, and a segment is deleted once all of its events
+    are acknowledged. Events that were not acknowledged before a restart are
+    replayed, each id at most once. When the journal grows beyond max_total_bytes
+    the oldest segment is deleted and its events are counted as dropped.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+        max_total_bytes: int = DEFAULT_MAX_JOURNAL_BYTES,
+        fsync: FsyncPolicy = FsyncPolicy.INTERVAL,
+        fsync_interval_ms: float = DEFAULT_FSYNC_INTERVAL_MS,
+        logger: logging.Logger = logging.getLogger("confidence_logger"),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_total_bytes = max_total_bytes
+        self.fsync = fsync
+        self.fsync_interval_ms = fsync_interval_ms
+        self.logger = logger
+        self.dropped = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._segment_of: Dict[str, _Segment] = {}
+        self._last_fsync = clock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+        self._next_sequence = self._sequence_after_existing()
+
+    @property
+    def pending(self) -> int:
+        """Number of events that were written but not acknowledged."""
+        return len(self._segment_of)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(segment.size for segment in self._segments)
+
+    def append(self, event: Event, event_id: Optional[str] = None) -> str:
+        """
+        Write an event to the journal.
+        @param event_id: the id to write the event with, a new one by default
+        @return: the id of the event, used to acknowledge it
+        """
+        if event_id is None:
+            event_id = uuid.uuid4().hex
+        line = self._encode({"id": event_id, "event": event})
+        with self._lock:
+            segment = self._writable_segment(len(line))
+            self._append(segment, line)
+            segment.unacked.add(event_id)
+            self._segment_of[event_id] = segment
+            self._enforce_size_cap()
+        return event_id
+
+    def ack(self, event_ids: Iterable[str]) -> None:
+        """Mark events as delivered so that they are never replayed."""
+        by_segment: Dict[str, Tuple[_Segment, List[str]]] = {}
+        with self._lock:
+            for event_id in event_ids:
+                segment = self._segment_of.pop(event_id, None)
+                if segment is None:
+                    continue
+                segment.unacked.discard(event_id)
+                by_segment.setdefault(segment.path, (segment, []))[1].append(event_id)
+            for segment, acked in by_segment.values():
+                if not segment.unacked and segment is not self._current_segment():
+                    self._delete(segment)
+                else:
+                    self._append(segment, self._encode({"ack": acked}))
+
+    def read_pending(self, limit: Optional[int] = None) -> List[Tuple[str, Event]]:
+        """
+        Read unacknowledged events from disk, oldest first.
+        @param limit: the maximum number of events to return
+        """
+        events: List[Tuple[str, Event]] = []
+        seen: Set[str] = set()
+        with self._lock:
+            current = self._current_segment()
+            if current is not None and current.file is not None:
+                current.file.flush()
+            for segment in list(self._segments):
+                for record in self._read_records(segment.path):
+                    event_id = record.get("id")
+                    if event_id in segment.unacked and event_id not in seen:
+                        seen.add(event_id)
+                        events.append((event_id, record["event"]))
+                        if limit is not None and len(events) >= limit:
+                            return events
+        return events
+
+    def close(self) -> None:
+        with self._lock:
+            current = self._current_segment()
+            if current is not None:
+                self._close_segment(current)
+
+    def _load(self) -> None:
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            segment = _Segment(path, os.path.getsize(path))
+            acked: Set[str] = set()
+            for record in self._read_records(path):
+                if "ack" in record:
+                    acked.update(record["ack"])
+                elif "id" in record and record["id"] not in self._segment_of:
+                    segment.unacked.add(record["id"])
+                    self._segment_of[record["id"]] = segment
+            for event_id in acked & segment.unacked:
+                segment.unacked.discard(event_id)
+                del self._segment_of[event_id]
+            if segment.unacked:
+                self._segments.append(segment)
+            else:
+                os.remove(path)
+
+    def _sequence_after_existing(self) -> int:
+        if not self._segments:
+            return 0
+        last = os.path.basename(self._segments[-1].path)
+        return int(last[: -len(SEGMENT_SUFFIX)]) + 1
+
+    def _read_records(self, path: str) -> List[Dict[str, Any]]:
+        records = []
+        try:
+            with open(path, "r", encoding="utf-8") as segment_file:
+                for line in segment_file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # a torn write at the end of a segment after a crash
+                        self.logger.warning(f"Skipping corrupt record in {path}")
+        except OSError as e:
+            self.logger.warning(f"Failed to read event journal segment {path}: {e}")
+        return records
+
+    def _current_segment(self) -> Optional[_Segment]:
+        if self._segments and self._segments[-1].file is not None:
+            return self._segments[-1]
+        return None
+
+    def _writable_segment(self, size: int) -> _Segment:
+        segment = self._current_segment()
+        if segment is not None:
+            if segment.size + size <= self.max_segment_bytes:
+                return segment
+            self._close_segment(segment)
+            if not segment.unacked:
+                self._delete(segment)
+        path = os.path.join(
+            self.directory, f"{self._next_sequence:020d}{SEGMENT_SUFFIX}"
+        )
+        self._next_sequence += 1
+        segment = _Segment(path, 0)
+        segment.file = open(path, "a", encoding="utf-8")
+        self._segments.append(segment)
+        return segment
+
+    def _close_segment(self, segment: _Segment) -> None:
+        if segment.file is not None:
+            self._sync(segment.file, force=True)
+            segment.file.close()
+            segment.file = None
+
+    def _append(self, segment: _Segment, line: str) -> None:
+        if segment.file is not None:
+            segment.file.write(line)
+            self._sync(segment.file)
+        else:
+            with open(segment.path, "a", encoding="utf-8") as segment_file:
+                segment_file.write(line)
+                self._sync(segment_file)
+        segment.size += len(line)
+
+    def _sync(self, segment_file: TextIO, force: bool = False) -> None:
+        segment_file.flush()
+        if self.fsync is FsyncPolicy.NEVER:
+            return
+        now = self._clock()
+        if (
+            force
+            or self.fsync is FsyncPolicy.ALWAYS
+            or (now - self._last_fsync) * 1000 >= self.fsync_interval_ms
+        ):
+            os.fsync(segment_file.fileno())
+            self._last_fsync = now
+
+    def _enforce_size_cap(self) -> None:
+        while len(self._segments) > 1 and self.size_bytes > self.max_total_bytes:
+            oldest = self._segments[0]
+            self.dropped += len(oldest.unacked)
+            self.logger.warning(
+                f"Event journal is over {self.max_total_bytes} bytes,"
+                + f" dropping {len(oldest.unacked)} events"
+            )
+            self._delete(oldest)
+
+    def _delete(self, segment: _Segment) -> None:
+        for event_id in segment.unacked:
+            self._segment_of.pop(event_id, None)
+        segment.unacked.clear()
+        self._segments.remove(segment)
+        try:
+            os.remove(segment.path)
+        except OSError as e:
+            self.logger.warning(f"Failed to remove {segment.path}: {e}")
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> str:
+        return json.dumps(record, separators=(",", ":"), default=str) + "\n"
@@ -0,0 +1,43 @@
+import importlib
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+from typing import Any
+
+# serializes the first load of lazy modules, the import itself holds the
+# per-module import lock
+_LOAD_LOCK = threading.Lock()
+
+
+class _LazyModule(ModuleType):
+    """
+    Stands in for a module until one of its attributes is first used. The
+    module is then imported normally, which is safe when several threads use it
+    at once, unlike importlib.util.LazyLoader before Python 3.12.
+    """
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self.__dict__.get("_lazy_module")
+        if module is None:
+            with _LOAD_LOCK:
+                module = importlib.import_module(self.__name__)
+                self.__dict__["_lazy_module"] = module
+        # looked up on the module every time, so that patches of its attributes
+        # are seen
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module without executing it. The module is executed when one of
+    its attributes is first used, so dependencies that are only needed on some
+    code paths do not slow down importing the SDK. Modules that are already
+    imported are returned as they are.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
@@ -0,0 +1,130 @@
+import atexit
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_SUMMARY_INTERVAL_SECONDS = 10.0
+DEFAULT_MAX_LINES_PER_SECOND = 10
+
+# (flag, error code)
+LogKey = Tuple[str, str]
+
+
+class _Suppressed(object):
+    def __init__(self, logger: logging.Logger, level: int, message: str) -> None:
+        self.logger = logger
+        self.level = level
+        self.message = message
+        self.count = 0
+
+
+class LogLimiter:
+    """
+    Keeps error logging from becoming the bottleneck during an outage. The first
+    error for each (flag, error code) in every summary_interval_seconds is
+    logged as is, and repeats are counted instead. When the interval ends, one
+    summary line per key reports how many errors were suppressed, with the last
+    message. On top of that, at most max_lines_per_second lines are written
+    over all keys; lines over the cap are counted in the summaries too.
+    """
+
+    def __init__(
+        self,
+        summary_interval_seconds: float = DEFAULT_SUMMARY_INTERVAL_SECONDS,
+        max_lines_per_second: int = DEFAULT_MAX_LINES_PER_SECOND,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.summary_interval_seconds = summary_interval_seconds
+        self.max_lines_per_second = max_lines_per_second
+        self.suppressed = 0
+        self._clock = clock
+        self._window: Dict[LogKey, _Suppressed] = {}
+        self._window_start = clock()
+        self._second = int(self._window_start)
+        self._lines = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def log(
+        self, logger: logging.Logger, level: int, key: LogKey, message: str
+    ) -> None:
+        if not logger.isEnabledFor(level):
+            return
+        self._flush_if_due()
+        with self._condition:
+            entry = self._window.get(key)
+            if entry is None:
+                entry = self._window[key] = _Suppressed(logger, level, message)
+                write = self._take_line()
+            else:
+                entry.message = message
+                write = False
+            if not write:
+                entry.count += 1
+                self.suppressed += 1
+                self._ensure_started()
+        if write:
+            logger.log(level, message)
+
+    def flush(self) -> None:
+        """Write the summaries of the current interval and start a new one."""
+        self._write_summaries(force=True)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+    def _flush_if_due(self) -> None:
+        self._write_summaries(force=False)
+
+    def _write_summaries(self, force: bool) -> None:
+        with self._condition:
+            now = self._clock()
+            if not force and now - self._window_start < self.summary_interval_seconds:
+                return
+            window, self._window = self._window, {}
+            self._window_start = now
+        for (flag, error_code), entry in window.items():
+            if entry.count == 0:
+                continue
+            entry.logger.log(
+                entry.level,
+                f"{entry.count} {error_code} errors for {flag} were not logged in"
+                f" the last {self.summary_interval_seconds:g}s, last: {entry.message}",
+            )
+
+    def _take_line(self) -> bool:
+        second = int(self._clock())
+        if second != self._second:
+            self._second = second
+            self._lines = 0
+        if self._lines >= self.max_lines_per_second:
+            return False
+        self._lines += 1
+        return True
+
+    def _ensure_started(self) -> None:
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(
+                target=self._run, name="confidence-log-limiter", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        # writes the summary of the last interval of an outage, when no more
+        # errors arrive to trigger it
+        while True:
+            with self._condition:
+                if not self._closed:
+                    self._condition.wait(self.summary_interval_seconds)
+                if self._closed:
+                    return
+            self._flush_if_due()
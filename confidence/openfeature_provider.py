@@ -6,6 +6,7 @@ from typing import (
     List,
     Optional,
     Type,
+    TypeVar,
     Union,
     get_args,
 )
@@ -21,6 +22,7 @@ from openfeature.provider.provider import AbstractProvider
 from typing_extensions import TypeGuard
 
 import confidence.confidence
+import confidence.flag_types
 from confidence.errors import ErrorCode
 
 EU_RESOLVE_API_ENDPOINT = "https://resolver.eu.confidence.dev/v1"
@@ -32,6 +34,8 @@ Primitive = Union[str, int, float, bool, None]
 FieldType = Union[Primitive, List[Primitive], List["Object"], "Object"]
 Object = Dict[str, FieldType]
 
+T = TypeVar("T")
+
 
 def is_primitive(field_type: Type[Any]) -> TypeGuard[Type[Primitive]]:
     return field_type in get_args(Primitive)
@@ -87,10 +91,25 @@ def _to_openfeature_error_code(
         return openfeature.exception.ErrorCode.PARSE_ERROR
     if error_code is ErrorCode.TIMEOUT:
         return openfeature.exception.ErrorCode.GENERAL
+    if error_code is ErrorCode.CIRCUIT_OPEN:
+        return openfeature.exception.ErrorCode.GENERAL
     if error_code is ErrorCode.NOT_READY:
         return openfeature.exception.ErrorCode.PROVIDER_NOT_READY
 
 
+def _to_openfeature_details(
+    details: confidence.flag_types.FlagResolutionDetails[T],
+) -> FlagResolutionDetails[T]:
+    return FlagResolutionDetails(
+        value=details.value,
+        variant=details.variant,
+        reason=details.reason,
+        error_code=_to_openfeature_error_code(details.error_code),
+        error_message=details.error_message,
+        flag_metadata=details.flag_metadata,
+    )
+
+
 class ConfidenceOpenFeatureProvider(AbstractProvider):  # type: ignore[misc]
     def __init__(self, confidence_sdk: confidence.confidence.Confidence):
         self.confidence_sdk = confidence_sdk
@@ -111,16 +130,20 @@ class ConfidenceOpenFeatureProvider(AbstractProvider):  # type: ignore[misc]
         default_value: bool,
         evaluation_context: Optional[EvaluationContext] = None,
     ) -> FlagResolutionDetails[bool]:
-        details = self._confidence_with_context(
-            evaluation_context
-        ).resolve_boolean_details(flag_key, default_value)
-        return FlagResolutionDetails[bool](
-            value=details.value,
-            variant=details.variant,
-            reason=details.reason,
-            error_code=_to_openfeature_error_code(details.error_code),
-            error_message=details.error_message,
-            flag_metadata=details.flag_metadata,
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            confidence_sdk.resolve_boolean_details(flag_key, default_value)
+        )
+
+    async def resolve_boolean_details_async(
+        self,
+        flag_key: str,
+        default_value: bool,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[bool]:
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            await confidence_sdk.resolve_boolean_details_async(flag_key, default_value)
         )
 
     def resolve_float_details(
@@ -129,16 +152,20 @@ class ConfidenceOpenFeatureProvider(AbstractProvider):  # type: ignore[misc]
         default_value: float,
         evaluation_context: Optional[EvaluationContext] = None,
     ) -> FlagResolutionDetails[float]:
-        details = self._confidence_with_context(
-            evaluation_context
-        ).resolve_float_details(flag_key, default_value)
-        return FlagResolutionDetails[float](
-            value=details.value,
-            variant=details.variant,
-            reason=details.reason,
-            error_code=_to_openfeature_error_code(details.error_code),
-            error_message=details.error_message,
-            flag_metadata=details.flag_metadata,
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            confidence_sdk.resolve_float_details(flag_key, default_value)
+        )
+
+    async def resolve_float_details_async(
+        self,
+        flag_key: str,
+        default_value: float,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[float]:
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            await confidence_sdk.resolve_float_details_async(flag_key, default_value)
         )
 
     def resolve_integer_details(
@@ -147,16 +174,20 @@ class ConfidenceOpenFeatureProvider(AbstractProvider):  # type: ignore[misc]
         default_value: int,
         evaluation_context: Optional[EvaluationContext] = None,
     ) -> FlagResolutionDetails[int]:
-        details = self._confidence_with_context(
-            evaluation_context
-        ).resolve_integer_details(flag_key, default_value)
-        return FlagResolutionDetails[int](
-            value=details.value,
-            variant=details.variant,
-            reason=details.reason,
-            error_code=_to_openfeature_error_code(details.error_code),
-            error_message=details.error_message,
-            flag_metadata=details.flag_metadata,
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            confidence_sdk.resolve_integer_details(flag_key, default_value)
+        )
+
+    async def resolve_integer_details_async(
+        self,
+        flag_key: str,
+        default_value: int,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[int]:
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            await confidence_sdk.resolve_integer_details_async(flag_key, default_value)
         )
 
     def resolve_string_details(
@@ -165,16 +196,20 @@ class ConfidenceOpenFeatureProvider(AbstractProvider):  # type: ignore[misc]
         default_value: str,
         evaluation_context: Optional[EvaluationContext] = None,
     ) -> FlagResolutionDetails[str]:
-        details = self._confidence_with_context(
-            evaluation_context
-        ).resolve_string_details(flag_key, default_value)
-        return FlagResolutionDetails[str](
-            value=details.value,
-            variant=details.variant,
-            reason=details.reason,
-            error_code=_to_openfeature_error_code(details.error_code),
-            error_message=details.error_message,
-            flag_metadata=details.flag_metadata,
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            confidence_sdk.resolve_string_details(flag_key, default_value)
+        )
+
+    async def resolve_string_details_async(
+        self,
+        flag_key: str,
+        default_value: str,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[str]:
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            await confidence_sdk.resolve_string_details_async(flag_key, default_value)
         )
 
     def resolve_object_details(
@@ -183,26 +218,33 @@ class ConfidenceOpenFeatureProvider(AbstractProvider):  # type: ignore[misc]
         default_value: Union[Object, List[Primitive]],
         evaluation_context: Optional[EvaluationContext] = None,
     ) -> FlagResolutionDetails[Union[Object, List[Primitive]]]:
-        details = self._confidence_with_context(
-            evaluation_context
-        ).resolve_object_details(flag_key, default_value)
-        return FlagResolutionDetails[Union[Object, List[Primitive]]](
-            value=details.value,
-            variant=details.variant,
-            reason=details.reason,
-            error_code=_to_openfeature_error_code(details.error_code),
-            error_message=details.error_message,
-            flag_metadata=details.flag_metadata,
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            confidence_sdk.resolve_object_details(flag_key, default_value)
+        )
+
+    async def resolve_object_details_async(
+        self,
+        flag_key: str,
+        default_value: Union[Object, List[Primitive]],
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[Union[Object, List[Primitive]]]:
+        confidence_sdk = self._confidence_with_context(evaluation_context)
+        return _to_openfeature_details(
+            await confidence_sdk.resolve_object_details_async(flag_key, default_value)
         )
 
     def _confidence_with_context(
         self, evaluation_context: Optional[EvaluationContext]
     ) -> confidence.confidence.Confidence:
+        if evaluation_context is None:
+            return self.confidence_sdk
         eval_context: Dict[str, FieldType] = {}
-        if evaluation_context:
-            if evaluation_context.targeting_key:
-                eval_context["targeting_key"] = evaluation_context.targeting_key
-            # add other fields to eval_context from evaluationContext
-            for key, value in evaluation_context.attributes.items():
-                eval_context[key] = value
+        if evaluation_context.targeting_key:
+            eval_context["targeting_key"] = evaluation_context.targeting_key
+        # add other fields to eval_context from evaluationContext
+        eval_context.update(evaluation_context.attributes)
+        if not eval_context:
+            # nothing to merge, evaluate with the context of the sdk
+            return self.confidence_sdk
         return self.confidence_sdk.with_context(eval_context)
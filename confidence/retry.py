@@ -0,0 +1,177 @@
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, TypeVar
+
+from confidence.errors import ConfidenceError, TimeoutError
+from confidence.transport import TransportError
+from confidence.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+else:
+    asyncio = lazy_import("asyncio")
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_INITIAL_BACKOFF_MS = 50
+DEFAULT_MAX_BACKOFF_MS = 1000
+DEFAULT_BACKOFF_MULTIPLIER = 2.0
+DEFAULT_RETRY_BUDGET_PERCENT = 10.0
+DEFAULT_RETRY_BUDGET_MAX_TOKENS = 10
+RETRYABLE_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+T = TypeVar("T")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether a failed resolve is worth retrying: timeouts, connection errors and
+    responses with a transient status code.
+    """
+    if isinstance(error, TimeoutError):
+        return True
+    return error.__cause__ is not None and is_transient(error.__cause__)
+
+
+def is_transient(transport_error: BaseException) -> bool:
+    """
+    Whether a transport error is a failure to get a response or a 429/5xx
+    response.
+    """
+    if isinstance(transport_error, TransportError):
+        return True
+    response = getattr(transport_error, "response", None)
+    return getattr(response, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+class RetryBudget:
+    """
+    Limits retries to a percentage of requests, for every policy that shares the
+    budget. Each request adds percent / 100 of a token and each retry spends a
+    whole token. At most max_tokens are saved up, which allows short bursts of
+    retries.
+    """
+
+    def __init__(
+        self,
+        percent: float = DEFAULT_RETRY_BUDGET_PERCENT,
+        max_tokens: int = DEFAULT_RETRY_BUDGET_MAX_TOKENS,
+    ):
+        self.percent = percent
+        self.max_tokens = max_tokens
+        self.exhausted = 0
+        self._tokens = float(max_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.percent / 100.0)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+
+# shared by every RetryPolicy created without a budget of its own
+PROCESS_RETRY_BUDGET = RetryBudget()
+
+
+class RetryPolicy:
+    """
+    Retries idempotent resolves that failed with a transient error, waiting a
+    capped exponential backoff with full jitter between attempts. All attempts
+    share one deadline, the timeout of the call, and a retry is only made when
+    the budget allows it.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        initial_backoff_ms: float = DEFAULT_INITIAL_BACKOFF_MS,
+        max_backoff_ms: float = DEFAULT_MAX_BACKOFF_MS,
+        backoff_multiplier: float = DEFAULT_BACKOFF_MULTIPLIER,
+        budget: Optional[RetryBudget] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.initial_backoff_ms = initial_backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.backoff_multiplier = backoff_multiplier
+        self.budget = budget if budget is not None else PROCESS_RETRY_BUDGET
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def backoff_ms(self, retry: int) -> float:
+        cap = min(
+            self.max_backoff_ms,
+            self.initial_backoff_ms * self.backoff_multiplier**retry,
+        )
+        return random.uniform(0, cap)
+
+    def call(
+        self,
+        attempt: Callable[[Optional[float]], T],
+        timeout_sec: Optional[float],
+    ) -> T:
+        """
+        Run attempt, retrying it when it fails with a retryable error.
+        @param attempt: called with the time left until the deadline in seconds
+        @param timeout_sec: the deadline for all attempts, None for no deadline
+        """
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        self.budget.deposit()
+        retry = 0
+        while True:
+            try:
+                return attempt(self._remaining(deadline))
+            except ConfidenceError as e:
+                delay = self._next_delay(e, retry, deadline)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            retry += 1
+
+    async def call_async(
+        self,
+        attempt: Callable[[Optional[float]], Awaitable[T]],
+        timeout_sec: Optional[float],
+    ) -> T:
+        """Async version of call."""
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        self.budget.deposit()
+        retry = 0
+        while True:
+            try:
+                return await attempt(self._remaining(deadline))
+            except ConfidenceError as e:
+                delay = self._next_delay(e, retry, deadline)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            retry += 1
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    def _next_delay(
+        self, error: ConfidenceError, retry: int, deadline: Optional[float]
+    ) -> Optional[float]:
+        """
+        @return: seconds to wait before the next attempt, or None to give up
+        """
+        if retry + 1 >= self.max_attempts or not is_retryable(error):
+            return None
+        delay = self.backoff_ms(retry) / 1000.0
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        if not self.budget.try_spend():
+            return None
+        with self._lock:
+            self.retries += 1
+        return delay
@@ -0,0 +1,155 @@
+import dataclasses
+import logging
+import threading
+import time
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from confidence.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+else:
+    httpx = lazy_import("httpx")
+    requests = lazy_import("requests")
+
+
+# Number of distinct hosts (resolver, events, custom endpoints) to keep pools for
+DEFAULT_POOL_CONNECTIONS = 4
+
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+@dataclasses.dataclass(frozen=True)
+class PoolConfig:
+    """
+    Connection pool settings shared by the resolve and event paths.
+
+    max_connections: upper bound on open connections of the async client.
+    max_connections_per_host: connections kept per host by the sync session.
+    max_keepalive_connections: idle connections kept alive by the async client.
+    keepalive_expiry: seconds an idle pooled connection is kept before it is
+    dropped, None keeps idle connections forever.
+    http2: multiplex async requests over HTTP/2 connections, needs the h2
+    package (the http2 extra).
+    """
+
+    max_connections: int = 100
+    max_connections_per_host: int = 10
+    max_keepalive_connections: int = 20
+    keepalive_expiry: Optional[float] = 5.0
+    http2: bool = False
+
+    @classmethod
+    def multiplexed(cls) -> "PoolConfig":
+        """
+        Settings for HTTP/2: every connection carries many concurrent resolves,
+        so a few connections are enough and they are kept open for longer.
+        """
+        return cls(
+            max_connections=10,
+            max_keepalive_connections=10,
+            keepalive_expiry=60.0,
+            http2=True,
+        )
+
+
+class HttpSession:
+    """
+    A pooled, keep-alive HTTP session used for all synchronous requests made by
+    a Confidence instance and the instances derived from it with with_context.
+    After keepalive_expiry seconds without requests, the next request starts a
+    new requests.Session with fresh pools. The idle one is closed once the
+    requests still using it are done.
+    """
+
+    def __init__(self, config: Optional[PoolConfig] = None):
+        self.config = config if config is not None else PoolConfig()
+        self._requests_session: Optional["requests.Session"] = None
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        # number of requests in flight per session, a replaced session is closed
+        # when its last request is done
+        self._in_flight: Dict["requests.Session", int] = {}
+
+    @property
+    def _session(self) -> "requests.Session":
+        # created on first use, so that apps that only resolve with asyncio never
+        # import requests
+        if self._requests_session is None:
+            with self._lock:
+                if self._requests_session is None:
+                    self._requests_session = self._build_session()
+        return self._requests_session
+
+    def _build_session(self) -> "requests.Session":
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize=self.config.max_connections_per_host,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def post(self, url: str, **kwargs: Any) -> "requests.Response":
+        session = self._acquire()
+        try:
+            return session.post(url, **kwargs)
+        finally:
+            self._release(session)
+
+    def close(self) -> None:
+        if self._requests_session is not None:
+            self._requests_session.close()
+
+    def _acquire(self) -> "requests.Session":
+        expiry = self.config.keepalive_expiry
+        idle_session = None
+        with self._lock:
+            now = time.monotonic()
+            idle = now - self._last_used
+            self._last_used = now
+            session = self._requests_session
+            if session is None or (expiry is not None and idle > expiry):
+                # other threads may still be reading responses from the pools of
+                # the idle session, it is closed after their requests
+                if session is not None and session not in self._in_flight:
+                    idle_session = session
+                session = self._requests_session = self._build_session()
+            self._in_flight[session] = self._in_flight.get(session, 0) + 1
+        if idle_session is not None:
+            idle_session.close()
+        return session
+
+    def _release(self, session: "requests.Session") -> None:
+        with self._lock:
+            in_flight = self._in_flight.pop(session) - 1
+            if in_flight > 0:
+                self._in_flight[session] = in_flight
+                return
+            if session is self._requests_session:
+                return
+        session.close()
+
+
+def build_async_client(
+    config: Optional[PoolConfig] = None,
+    logger: logging.Logger = logging.getLogger("confidence_logger"),
+) -> "httpx.AsyncClient":
+    config = config if config is not None else PoolConfig()
+    http2 = config.http2 and HTTP2_AVAILABLE
+    if config.http2 and not HTTP2_AVAILABLE:
+        logger.warning(
+            "HTTP/2 was requested but the h2 package is not installed, "
+            "falling back to HTTP/1.1. Install spotify-confidence-sdk[http2]."
+        )
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+    )
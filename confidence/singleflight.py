@@ -0,0 +1,113 @@
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from confidence.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+else:
+    asyncio = lazy_import("asyncio")
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls that share a key so that only one of them runs,
+    while the others wait for it and share its result or error.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call[T]] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Run fn unless a call with the same key is already in flight.
+        @return: the result and whether it was shared from another caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AsyncSingleFlight(Generic[T]):
+    """
+    Coalesces concurrent coroutines that share a key so that only one awaitable
+    runs, while the others await the same task. Cancelling a caller does not
+    cancel the shared work.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[
+            Tuple[asyncio.AbstractEventLoop, Hashable], "asyncio.Task[T]"
+        ] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Await fn unless a call with the same key is already in flight.
+        @return: the result and whether it was shared from another caller
+        """
+        call_key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(call_key)
+        shared = task is not None and not task.done()
+        if task is None or not shared:
+            task = asyncio.ensure_future(fn())
+            self._calls[call_key] = task
+            task.add_done_callback(lambda t: self._release(call_key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task), shared
+
+    def _release(
+        self,
+        call_key: Tuple["asyncio.AbstractEventLoop", Hashable],
+        task: "asyncio.Task[Any]",
+    ) -> None:
+        if self._calls.get(call_key) is task:
+            del self._calls[call_key]
+        if not task.cancelled():
+            # mark the exception as retrieved even if every caller went away
+            task.exception()
@@ -1,60 +1,65 @@
 import base64
-from queue import Queue
-from typing import Optional, Union, Any
-from typing_extensions import TypeAlias
+from importlib.util import find_spec
+from queue import Full, Queue
+from typing import NamedTuple, Optional
 from enum import IntEnum
 
-# Try to import protobuf components, fallback to mock types if unavailable
-try:
-    from confidence.telemetry_pb2 import (
-        ProtoMonitoring,
-        ProtoLibraryTraces,
-        ProtoPlatform,
-    )
-
-    # Define type aliases for the protobuf classes
-    ProtoTrace: TypeAlias = ProtoLibraryTraces.ProtoTrace
-    ProtoLibrary: TypeAlias = ProtoLibraryTraces.ProtoLibrary
-    ProtoTraceId: TypeAlias = ProtoLibraryTraces.ProtoTraceId
-    ProtoStatus: TypeAlias = ProtoLibraryTraces.ProtoTrace.ProtoRequestTrace.ProtoStatus
-
-    PROTOBUF_AVAILABLE = True
-except ImportError:
-    PROTOBUF_AVAILABLE = False
-
-    # Fallback enum classes that match protobuf enum values
-    class ProtoLibrary(IntEnum):
-        PROTO_LIBRARY_UNSPECIFIED = 0
-        PROTO_LIBRARY_CONFIDENCE = 1
-        PROTO_LIBRARY_OPEN_FEATURE = 2
-        PROTO_LIBRARY_REACT = 3
-
-    class ProtoTraceId(IntEnum):
-        PROTO_TRACE_ID_UNSPECIFIED = 0
-        PROTO_TRACE_ID_RESOLVE_LATENCY = 1
-        PROTO_TRACE_ID_STALE_FLAG = 2
-        PROTO_TRACE_ID_FLAG_TYPE_MISMATCH = 3
-        PROTO_TRACE_ID_WITH_CONTEXT = 4
-
-    class ProtoStatus(IntEnum):
-        PROTO_STATUS_UNSPECIFIED = 0
-        PROTO_STATUS_SUCCESS = 1
-        PROTO_STATUS_ERROR = 2
-        PROTO_STATUS_TIMEOUT = 3
-        PROTO_STATUS_CACHED = 4
-
-    class ProtoPlatform(IntEnum):
-        PROTO_PLATFORM_UNSPECIFIED = 0
-        PROTO_PLATFORM_JS_WEB = 4
-        PROTO_PLATFORM_JS_SERVER = 5
-        PROTO_PLATFORM_PYTHON = 6
-        PROTO_PLATFORM_GO = 7
-
-    # Mock trace class for type compatibility
-    class ProtoTrace:
-        def __init__(self):
-            self.id = None
-            self.request_trace = None
+
+# The protobuf module is imported on the first monitoring header, so importing
+# the SDK does not pay for protobuf. The enums mirror the values in
+# telemetry.proto.
+def _protobuf_available() -> bool:
+    try:
+        return find_spec("google.protobuf") is not None
+    except ModuleNotFoundError:
+        return False
+
+
+PROTOBUF_AVAILABLE = _protobuf_available()
+
+
+class ProtoLibrary(IntEnum):
+    PROTO_LIBRARY_UNSPECIFIED = 0
+    PROTO_LIBRARY_CONFIDENCE = 1
+    PROTO_LIBRARY_OPEN_FEATURE = 2
+    PROTO_LIBRARY_REACT = 3
+
+
+class ProtoTraceId(IntEnum):
+    PROTO_TRACE_ID_UNSPECIFIED = 0
+    PROTO_TRACE_ID_RESOLVE_LATENCY = 1
+    PROTO_TRACE_ID_STALE_FLAG = 2
+    PROTO_TRACE_ID_FLAG_TYPE_MISMATCH = 3
+    PROTO_TRACE_ID_WITH_CONTEXT = 4
+
+
+class ProtoStatus(IntEnum):
+    PROTO_STATUS_UNSPECIFIED = 0
+    PROTO_STATUS_SUCCESS = 1
+    PROTO_STATUS_ERROR = 2
+    PROTO_STATUS_TIMEOUT = 3
+    PROTO_STATUS_CACHED = 4
+
+
+class ProtoPlatform(IntEnum):
+    PROTO_PLATFORM_UNSPECIFIED = 0
+    PROTO_PLATFORM_JS_WEB = 4
+    PROTO_PLATFORM_JS_SERVER = 5
+    PROTO_PLATFORM_PYTHON = 6
+    PROTO_PLATFORM_GO = 7
+
+
+class ProtoTrace(NamedTuple):
+    """A queued trace, converted to its protobuf message when it is sent."""
+
+    id: int
+    duration_ms: int
+    status: int
+
+
+# Traces are only drained when a resolve request is sent, so the queue is bounded
+# to keep memory flat when most evaluations never reach the network.
+MAX_QUEUED_TRACES = 1000
 
 
 class Telemetry:
@@ -74,7 +79,7 @@ class Telemetry:
     def __init__(self, version: str, disabled: bool = False) -> None:
         if not self._initialized:
             self.version = version
-            self._traces_queue = Queue()
+            self._traces_queue = Queue(maxsize=MAX_QUEUED_TRACES)
             self._disabled = disabled
             self._initialized = True
 
@@ -83,13 +88,10 @@ class Telemetry:
     ) -> None:
         if self._disabled or not PROTOBUF_AVAILABLE:
             return
-        trace = ProtoTrace()
-        trace.id = trace_id
-        request_trace = ProtoTrace.ProtoRequestTrace()
-        request_trace.millisecond_duration = duration_ms
-        request_trace.status = status
-        trace.request_trace.CopyFrom(request_trace)
-        self._traces_queue.put(trace)
+        try:
+            self._traces_queue.put_nowait(ProtoTrace(trace_id, duration_ms, status))
+        except Full:
+            pass
 
     def get_monitoring_header(self) -> str:
         if self._disabled or not PROTOBUF_AVAILABLE:
@@ -101,11 +103,20 @@ class Telemetry:
             except Exception:
                 break
 
-        monitoring = ProtoMonitoring()
+        try:
+            from confidence import telemetry_pb2
+        except ImportError:
+            return ""
+
+        monitoring = telemetry_pb2.ProtoMonitoring()
         library_traces = monitoring.library_traces.add()
         library_traces.library = ProtoLibrary.PROTO_LIBRARY_CONFIDENCE
         library_traces.library_version = self.version
-        library_traces.traces.extend(current_traces)
+        for trace in current_traces:
+            proto_trace = library_traces.traces.add()
+            proto_trace.id = trace.id
+            proto_trace.request_trace.millisecond_duration = trace.duration_ms
+            proto_trace.request_trace.status = trace.status
         monitoring.platform = ProtoPlatform.PROTO_PLATFORM_PYTHON
         serialized = monitoring.SerializeToString()
         encoded = base64.b64encode(serialized).decode()
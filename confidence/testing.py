@@ -0,0 +1,186 @@
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from .transport import InMemoryTransport, TransportRequest, TransportResponse
+
+DEFAULT_ERROR_STATUS = 503
+DEFAULT_HANG_SECONDS = 30.0
+# how quickly the server notices stop()
+SHUTDOWN_POLL_SECONDS = 0.05
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connections under load tests
+    request_queue_size = 1024
+
+
+class LatencyDistribution:
+    """Response latencies in milliseconds, sampled per request."""
+
+    def __init__(self, sample: Callable[[random.Random], float]):
+        self._sample = sample
+
+    @classmethod
+    def fixed(cls, latency_ms: float) -> "LatencyDistribution":
+        return cls(lambda rng: latency_ms)
+
+    @classmethod
+    def uniform(cls, low_ms: float, high_ms: float) -> "LatencyDistribution":
+        return cls(lambda rng: rng.uniform(low_ms, high_ms))
+
+    @classmethod
+    def lognormal(cls, median_ms: float, sigma: float) -> "LatencyDistribution":
+        """A long-tailed distribution, like the latencies of a real service."""
+        return cls(lambda rng: median_ms * rng.lognormvariate(0, sigma))
+
+    def sample(self, rng: random.Random) -> float:
+        return max(0.0, self._sample(rng))
+
+
+class FakeResolver:
+    """
+    A local HTTP server that implements /v1/flags:resolve, /v1/flags:apply and
+    /v1/events:publish on top of a flag table, for load tests and for testing
+    timeouts and fallbacks without the real service.
+
+    flags maps flag names to {"variant": ..., "value": {...}}; unknown flags
+    are answered with 404. Every request waits a sample of latency, then fails
+    with error_status at error_rate, or hangs for hang_seconds (longer than any
+    client timeout) at timeout_rate. The fault settings can be changed while
+    the server runs.
+
+        with FakeResolver({"my-flag": {"value": {"enabled": True}}}) as server:
+            confidence = Confidence(
+                "secret",
+                custom_resolve_base_url=server.base_url,
+                custom_events_base_url=server.base_url,
+            )
+    """
+
+    def __init__(
+        self,
+        flags: Mapping[str, Mapping[str, Any]],
+        latency: Optional[LatencyDistribution] = None,
+        error_rate: float = 0.0,
+        error_status: int = DEFAULT_ERROR_STATUS,
+        timeout_rate: float = 0.0,
+        hang_seconds: float = DEFAULT_HANG_SECONDS,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency if latency is not None else LatencyDistribution.fixed(0)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.events_received = 0
+        self._flags = InMemoryTransport(flags)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._host = host
+        self._server = _Server((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_json(cls, path: str, **kwargs: Any) -> "FakeResolver":
+        """Load the flag table from a JSON file."""
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file), **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self._host}:{self._server.server_port}"
+
+    @property
+    def calls(self) -> Mapping[str, int]:
+        """Number of requests per path, such as "/v1/flags:resolve"."""
+        return self._flags.calls
+
+    def start(self) -> "FakeResolver":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": SHUTDOWN_POLL_SECONDS},
+            name="confidence-fake",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        # releases requests that are waiting out their latency or hanging
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeResolver":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def _answer(self, path: str, body: Dict[str, Any]) -> Optional[TransportResponse]:
+        """
+        @return: the response to send, or None when the connection should be
+        closed without one
+        """
+        with self._lock:
+            latency_ms = self.latency.sample(self._rng)
+            roll = self._rng.random()
+        if self._stopping.wait(latency_ms / 1000.0):
+            return None
+        if roll < self.error_rate:
+            return TransportResponse(
+                self.error_status, {"message": "injected error"}, "Injected Error"
+            )
+        if roll < self.error_rate + self.timeout_rate:
+            self._stopping.wait(self.hang_seconds)
+            return None
+        if path == "/v1/events:publish":
+            with self._lock:
+                self.events_received += len(body.get("events", []))
+        return self._flags.send(TransportRequest(path, body, {}))
+
+    def _handler_class(self) -> Callable[..., BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep connections open between requests, like the real service
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately, without this the client
+            # waits for a delayed ACK on every response
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._reply(400, {"message": "invalid JSON"})
+                    return
+                response = fake._answer(self.path, body)
+                if response is None:
+                    self.close_connection = True
+                    return
+                self._reply(response.status_code, response.body)
+
+            def _reply(self, status_code: int, body: Any) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # keep test and benchmark output clean
+                pass
+
+        return Handler
@@ -0,0 +1,215 @@
+import dataclasses
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Protocol, Union
+from urllib.parse import urlsplit
+
+
+from .session import HttpSession, PoolConfig, build_async_client
+from .lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+    import httpx
+    import requests
+else:
+    asyncio = lazy_import("asyncio")
+    httpx = lazy_import("httpx")
+    requests = lazy_import("requests")
+
+
+@dataclasses.dataclass(frozen=True)
+class TransportRequest:
+    """A prepared JSON POST request."""
+
+    url: str
+    body: Dict[str, Any]
+    headers: Dict[str, str]
+    timeout_sec: Optional[float] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class TransportResponse:
+    """
+    The status and decoded JSON body of a response. body is None when the
+    response has no JSON body.
+    """
+
+    status_code: int
+    body: Any = None
+    reason: str = ""
+
+
+class TransportError(Exception):
+    """The request failed before a response was received."""
+
+
+class TransportTimeout(TransportError):
+    """No response was received within the timeout of the request."""
+
+
+class HttpStatusError(Exception):
+    """The server answered with an error status."""
+
+    def __init__(self, response: TransportResponse):
+        super().__init__(f"{response.status_code} {response.reason}".strip())
+        self.response = response
+
+
+class Transport(Protocol):
+    """
+    Sends requests for the synchronous paths. Implementations raise
+    TransportTimeout or TransportError when no response is received.
+    """
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        ...
+
+
+class AsyncTransport(Protocol):
+    """Sends requests for the asyncio paths."""
+
+    async def send_async(self, request: TransportRequest) -> TransportResponse:
+        ...
+
+
+def _json_or_none(response: Union["requests.Response", "httpx.Response"]) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+class RequestsTransport:
+    """The default sync transport, sends requests with a pooled HttpSession."""
+
+    def __init__(self, session: HttpSession):
+        self.session = session
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        try:
+            response = self.session.post(
+                request.url,
+                json=request.body,
+                headers=request.headers,
+                timeout=request.timeout_sec,
+            )
+            body = _json_or_none(response)
+        except requests.exceptions.Timeout as e:
+            raise TransportTimeout(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(response.status_code, body, response.reason)
+
+
+class HttpxTransport:
+    """
+    The default async transport, sends requests with an httpx.AsyncClient. The
+    client is built from pool_config on first use, unless one is given.
+    """
+
+    def __init__(
+        self,
+        client: Optional["httpx.AsyncClient"] = None,
+        pool_config: Optional[PoolConfig] = None,
+        logger: logging.Logger = logging.getLogger("confidence_logger"),
+    ):
+        self._client = client
+        self._pool_config = pool_config
+        self._logger = logger
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = build_async_client(self._pool_config, self._logger)
+        return self._client
+
+    async def send_async(self, request: TransportRequest) -> TransportResponse:
+        try:
+            response = await self.client.post(
+                request.url,
+                json=request.body,
+                headers=request.headers,
+                timeout=request.timeout_sec,
+            )
+            body = _json_or_none(response)
+        except httpx.TimeoutException as e:
+            raise TransportTimeout(str(e)) from e
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(response.status_code, body, response.reason_phrase)
+
+
+class InMemoryTransport:
+    """
+    Answers resolves, applies and event publishes in process, from a table of
+    flag name to {"variant": ..., "value": {...}}, after latency_ms. Requesting
+    a flag that is not in the table returns 404. Useful to measure the overhead
+    of the SDK without a network, and in tests.
+    """
+
+    def __init__(
+        self,
+        flags: Mapping[str, Mapping[str, Any]],
+        latency_ms: float = 0.0,
+        resolve_token: str = "token",
+    ):
+        self.flags = dict(flags)
+        self.latency_ms = latency_ms
+        self.resolve_token = resolve_token
+        # number of requests per path, such as "/v1/flags:resolve"
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        return self._answer(request)
+
+    async def send_async(self, request: TransportRequest) -> TransportResponse:
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000.0)
+        return self._answer(request)
+
+    def _answer(self, request: TransportRequest) -> TransportResponse:
+        path = urlsplit(request.url).path
+        with self._lock:
+            self.calls[path] += 1
+        if path == "/v1/flags:resolve":
+            return self._resolve(request.body)
+        if path == "/v1/flags:apply":
+            return TransportResponse(200, {}, "OK")
+        if path == "/v1/events:publish":
+            return TransportResponse(200, {"errors": []}, "OK")
+        return TransportResponse(404, None, "Not Found")
+
+    def _resolve(self, body: Dict[str, Any]) -> TransportResponse:
+        if "clientSecret" not in body:
+            return TransportResponse(400, {"message": "missing clientSecret"})
+        requested = body.get("flags") or [f"flags/{name}" for name in self.flags]
+        resolved_flags = []
+        for flag in requested:
+            definition = self.flags.get(flag.split("/", 1)[-1])
+            if definition is None:
+                return TransportResponse(404, {"message": f"{flag} not found"})
+            resolved_flags.append(
+                {
+                    "flag": flag,
+                    "variant": definition.get("variant", ""),
+                    "value": definition.get("value", {}),
+                    "reason": "RESOLVE_REASON_MATCH",
+                }
+            )
+        # round trip through JSON so callers never share the table's objects
+        response_body = json.loads(
+            json.dumps(
+                {"resolvedFlags": resolved_flags, "resolveToken": self.resolve_token}
+            )
+        )
+        return TransportResponse(200, response_body, "OK")
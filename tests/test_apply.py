@@ -0,0 +1,127 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from confidence.apply import FlagApplier
+from confidence.cache import ResolveCache
+from confidence.confidence import Confidence
+from tests.test_confidence import MULTI_FLAG_RESOLVE, SUCCESSFUL_FLAG_RESOLVE
+
+RESOLVE_URL = "https://resolver.confidence.dev/v1/flags:resolve"
+APPLY_URL = "https://resolver.confidence.dev/v1/flags:apply"
+
+
+def _response(body):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = body
+    return response
+
+
+def _calls_to(mock_post, url):
+    return [call for call in mock_post.call_args_list if call.args[0] == url]
+
+
+class TestFlagApplier(unittest.TestCase):
+    def test_applies_are_deduplicated_and_grouped_by_token(self):
+        sent = []
+        applier = FlagApplier(flush_interval_ms=60000)
+        applier.bind(lambda token, flags: sent.append((token, flags)))
+
+        applier.add("token1", "flags/a")
+        applier.add("token1", "flags/a")
+        applier.add("token1", "flags/b")
+        applier.add("token2", "flags/a")
+        applier.add("", "flags/c")
+        applier.close()
+
+        self.assertEqual([token for token, _ in sent], ["token1", "token2"])
+        self.assertEqual([flag for flag, _ in sent[0][1]], ["flags/a", "flags/b"])
+        self.assertEqual([flag for flag, _ in sent[1][1]], ["flags/a"])
+
+    def test_full_batch_is_sent_without_waiting_for_the_interval(self):
+        sent = threading.Event()
+        applier = FlagApplier(max_batch_size=2, flush_interval_ms=60000)
+        applier.bind(lambda token, flags: sent.set())
+
+        applier.add("token1", "flags/a")
+        applier.add("token1", "flags/b")
+
+        self.assertTrue(sent.wait(5))
+        applier.close()
+
+    def test_applies_are_dropped_when_the_queue_is_full(self):
+        applier = FlagApplier(flush_interval_ms=60000, max_pending=1)
+        applier.bind(lambda token, flags: None)
+
+        applier.add("token1", "flags/a")
+        applier.add("token1", "flags/b")
+
+        self.assertEqual(applier.pending, 1)
+        self.assertEqual(applier.dropped, 1)
+        applier.close()
+
+
+class TestConfidenceApply(unittest.TestCase):
+    def test_resolves_do_not_apply_and_evaluations_are_applied_in_one_batch(self):
+        applier = FlagApplier(flush_interval_ms=60000)
+        confidence = Confidence(
+            client_secret="test", flag_applier=applier
+        ).with_context({"targeting_key": "user-1"})
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.return_value = _response(MULTI_FLAG_RESOLVE)
+            confidence.resolve_string_details("python-flag-1.string-key", "")
+            confidence.resolve_integer_details("test-flag.myinteger", 0)
+            confidence.resolve_integer_details("test-flag.myinteger", 0)
+            applier.close()
+
+        resolves = _calls_to(mock_post, RESOLVE_URL)
+        self.assertEqual(len(resolves), 3)
+        self.assertTrue(all(call.kwargs["json"]["apply"] is False for call in resolves))
+        applies = _calls_to(mock_post, APPLY_URL)
+        self.assertEqual(len(applies), 1)
+        body = applies[0].kwargs["json"]
+        self.assertEqual(body["resolveToken"], "token1")
+        self.assertEqual(body["clientSecret"], "test")
+        self.assertEqual(
+            [flag["flag"] for flag in body["flags"]],
+            ["flags/python-flag-1", "flags/test-flag"],
+        )
+
+    def test_cache_hits_are_not_applied_twice(self):
+        applier = FlagApplier(flush_interval_ms=60000)
+        confidence = Confidence(
+            client_secret="test",
+            flag_applier=applier,
+            resolve_cache=ResolveCache(),
+        ).with_context({"targeting_key": "user-1"})
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.return_value = _response(MULTI_FLAG_RESOLVE)
+            for _ in range(3):
+                confidence.resolve_string_details("python-flag-1.string-key", "")
+            applier.close()
+
+        self.assertEqual(len(_calls_to(mock_post, RESOLVE_URL)), 1)
+        applies = _calls_to(mock_post, APPLY_URL)
+        self.assertEqual(len(applies), 1)
+        self.assertEqual(len(applies[0].kwargs["json"]["flags"]), 1)
+
+    def test_nothing_is_applied_when_apply_on_resolve_is_disabled(self):
+        applier = FlagApplier(flush_interval_ms=60000)
+        confidence = Confidence(
+            client_secret="test", apply_on_resolve=False, flag_applier=applier
+        )
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.return_value = _response(SUCCESSFUL_FLAG_RESOLVE)
+            confidence.resolve_string_details("python-flag-1.string-key", "")
+            applier.close()
+
+        self.assertEqual(len(_calls_to(mock_post, APPLY_URL)), 0)
+        self.assertEqual(mock_post.call_args.kwargs["json"]["apply"], False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from requests.exceptions import Timeout as RequestsTimeout
+
+from confidence.batching import ResolveBatcher
+from confidence.confidence import Confidence
+from confidence.errors import ErrorCode
+from confidence.transport import InMemoryTransport
+from tests.test_confidence import MULTI_FLAG_RESOLVE
+
+RESOLVE_URL = "https://resolver.confidence.dev/v1/flags:resolve"
+FLAGS = {"f": {"variant": "flags/f/variants/on", "value": {"enabled": True}}}
+
+
+def _response(*args, **kwargs):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = MULTI_FLAG_RESOLVE
+    return response
+
+
+class TestResolveBatcher(unittest.IsolatedAsyncioTestCase):
+    def _confidence(self, batcher):
+        return Confidence(client_secret="test", resolve_batcher=batcher).with_context(
+            {"targeting_key": "user-1"}
+        )
+
+    def test_concurrent_resolves_share_one_request(self):
+        batcher = ResolveBatcher(window_ms=100)
+        confidence = self._confidence(batcher)
+        keys = [
+            ("python-flag-1.string-key", confidence.resolve_string_details, ""),
+            ("python-flag-1.int-key", confidence.resolve_integer_details, 0),
+            ("test-flag.myinteger", confidence.resolve_integer_details, 0),
+        ]
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = _response
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                futures = [
+                    pool.submit(resolve, flag_key, default)
+                    for flag_key, resolve, default in keys
+                ]
+                details = [future.result() for future in futures]
+
+        mock_post.assert_called_once()
+        _, kwargs = mock_post.call_args
+        self.assertEqual(
+            sorted(kwargs["json"]["flags"]), ["flags/python-flag-1", "flags/test-flag"]
+        )
+        self.assertEqual(
+            [detail.value for detail in details], ["outer-string", 42, 400]
+        )
+        self.assertEqual(batcher.batches_sent, 1)
+        self.assertEqual(batcher.resolves_batched, 3)
+
+    def test_full_batch_is_sent_before_the_window_ends(self):
+        batcher = ResolveBatcher(window_ms=10000, max_batch_size=2)
+        confidence = self._confidence(batcher)
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = _response
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [
+                    pool.submit(confidence.resolve_integer_details, flag_key, 0)
+                    for flag_key in ["python-flag-1.int-key", "test-flag.myinteger"]
+                ]
+                [future.result() for future in futures]
+
+        self.assertLess(time.perf_counter() - start, 5)
+        mock_post.assert_called_once()
+
+    def test_errors_are_fanned_out(self):
+        confidence = self._confidence(ResolveBatcher(window_ms=50))
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = RequestsTimeout("timed out")
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [
+                    pool.submit(confidence.resolve_integer_details, flag_key, -1)
+                    for flag_key in ["python-flag-1.int-key", "test-flag.myinteger"]
+                ]
+                details = [future.result() for future in futures]
+
+        mock_post.assert_called_once()
+        for detail in details:
+            self.assertEqual(detail.value, -1)
+            self.assertEqual(detail.error_code, ErrorCode.TIMEOUT)
+
+    def test_unknown_flag_does_not_fail_the_rest_of_the_batch(self):
+        batcher = ResolveBatcher(window_ms=50)
+        transport = InMemoryTransport(FLAGS)
+        confidence = Confidence(
+            client_secret="test", resolve_batcher=batcher, transport=transport
+        ).with_context({"targeting_key": "user-1"})
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(confidence.resolve_boolean_details, flag_key, False)
+                for flag_key in ["f.enabled", "typo-flag.enabled"]
+            ]
+            details = [future.result() for future in futures]
+
+        self.assertEqual(details[0].value, True)
+        self.assertIsNone(details[0].error_code)
+        self.assertEqual(details[1].error_code, ErrorCode.FLAG_NOT_FOUND)
+        self.assertEqual(batcher.resolves_split, 2)
+        # the batch, then one resolve for each caller
+        self.assertEqual(transport.calls["/v1/flags:resolve"], 3)
+
+    async def test_async_unknown_flag_does_not_fail_the_rest_of_the_batch(self):
+        batcher = ResolveBatcher(window_ms=20)
+        transport = InMemoryTransport(FLAGS)
+        confidence = Confidence(
+            client_secret="test", resolve_batcher=batcher, async_transport=transport
+        ).with_context({"targeting_key": "user-1"})
+
+        details = await asyncio.gather(
+            confidence.resolve_boolean_details_async("f.enabled", False),
+            confidence.resolve_boolean_details_async("typo-flag.enabled", False),
+        )
+
+        self.assertEqual(details[0].value, True)
+        self.assertEqual(details[1].error_code, ErrorCode.FLAG_NOT_FOUND)
+        self.assertEqual(transport.calls["/v1/flags:resolve"], 3)
+
+    async def test_async_resolves_are_batched_per_context(self):
+        batcher = ResolveBatcher(window_ms=20)
+        confidence = Confidence(client_secret="test", resolve_batcher=batcher)
+        user_1 = confidence.with_context({"targeting_key": "user-1"})
+        user_2 = confidence.with_context({"targeting_key": "user-2"})
+        mock_post = AsyncMock()
+        mock_post.return_value = httpx.Response(
+            status_code=200,
+            json=MULTI_FLAG_RESOLVE,
+            request=httpx.Request("POST", RESOLVE_URL),
+        )
+
+        with patch("httpx.AsyncClient.post", mock_post):
+            details = await asyncio.gather(
+                user_1.resolve_string_details_async("python-flag-1.string-key", ""),
+                user_1.resolve_integer_details_async("test-flag.myinteger", 0),
+                user_2.resolve_integer_details_async("python-flag-1.int-key", 0),
+                user_2.resolve_boolean_details_async("python-flag-1.enabled", False),
+            )
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(batcher.batches_sent, 2)
+        self.assertEqual(
+            [detail.value for detail in details], ["outer-string", 400, 42, True]
+        )
+
+    async def test_async_full_batch_is_sent_immediately(self):
+        batcher = ResolveBatcher(window_ms=10000, max_batch_size=2)
+        confidence = self._confidence(batcher)
+        mock_post = AsyncMock()
+        mock_post.return_value = httpx.Response(
+            status_code=200,
+            json=MULTI_FLAG_RESOLVE,
+            request=httpx.Request("POST", RESOLVE_URL),
+        )
+
+        with patch("httpx.AsyncClient.post", mock_post):
+            details = await asyncio.wait_for(
+                asyncio.gather(
+                    confidence.resolve_integer_details_async(
+                        "python-flag-1.int-key", 0
+                    ),
+                    confidence.resolve_integer_details_async("test-flag.myinteger", 0),
+                ),
+                timeout=5,
+            )
+
+        mock_post.assert_called_once()
+        self.assertEqual([detail.value for detail in details], [42, 400])
+
+
+if __name__ == "__main__":
+    unittest.main()
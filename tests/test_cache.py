@@ -0,0 +1,385 @@
+import asyncio
+import base64
+import unittest
+from unittest.mock import patch, AsyncMock
+
+import httpx
+import requests_mock
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from confidence.apply import FlagApplier
+from confidence.cache import ResolveCache, context_fingerprint
+from confidence.confidence import Confidence, FlagRequest, ResolveResult
+from confidence.errors import ErrorCode
+from confidence.flag_types import Reason
+from confidence.telemetry import PROTOBUF_AVAILABLE, Telemetry
+from tests.test_confidence import (
+    INTEGER_AS_FLOAT_FLAG_RESOLVE,
+    MULTI_FLAG_RESOLVE,
+    SUCCESSFUL_FLAG_RESOLVE,
+)
+
+if PROTOBUF_AVAILABLE:
+    from confidence.telemetry_pb2 import ProtoMonitoring, ProtoLibraryTraces
+
+RESOLVE_URL = "https://resolver.confidence.dev/v1/flags:resolve"
+APPLY_URL = "https://resolver.confidence.dev/v1/flags:apply"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _result(value="on"):
+    return ResolveResult({"key": value}, "flags/f/variants/on", "token")
+
+
+class TestResolveCache(unittest.TestCase):
+    def test_fingerprint_ignores_key_order(self):
+        self.assertEqual(
+            context_fingerprint({"a": 1, "b": {"c": 2, "d": 3}}),
+            context_fingerprint({"b": {"d": 3, "c": 2}, "a": 1}),
+        )
+        self.assertNotEqual(
+            context_fingerprint({"a": 1}), context_fingerprint({"a": 2})
+        )
+
+    def test_hit_is_marked_cached(self):
+        cache = ResolveCache()
+        cache.put("flag", "fp", _result())
+
+        hit = cache.get("flag", "fp")
+
+        self.assertTrue(hit.cached)
+        self.assertEqual(hit.value, {"key": "on"})
+        self.assertIsNone(cache.get("flag", "other-fp"))
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = ResolveCache(ttl_seconds=10, clock=clock)
+        cache.put("flag", "fp", _result())
+
+        clock.now = 10
+        self.assertIsNotNone(cache.get("flag", "fp"))
+        clock.now = 10.5
+        self.assertIsNone(cache.get("flag", "fp"))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResolveCache(max_entries=2)
+        cache.put("a", "fp", _result())
+        cache.put("b", "fp", _result())
+        cache.get("a", "fp")
+        cache.put("c", "fp", _result())
+
+        self.assertIsNotNone(cache.get("a", "fp"))
+        self.assertIsNone(cache.get("b", "fp"))
+        self.assertIsNotNone(cache.get("c", "fp"))
+
+    def test_byte_budget_is_respected(self):
+        cache = ResolveCache(max_bytes=200)
+        for i in range(10):
+            cache.put(f"flag-{i}", "fp", _result("x" * 40))
+
+        self.assertLessEqual(cache.size_bytes, 200)
+        self.assertLess(len(cache), 10)
+        self.assertIsNotNone(cache.get("flag-9", "fp"))
+
+        cache.put("too-large", "fp", _result("x" * 500))
+        self.assertIsNone(cache.get("too-large", "fp"))
+
+
+class TestConfidenceResolveCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        Telemetry._instance = None
+        Telemetry._initialized = False
+        self.confidence = Confidence(
+            client_secret="test", resolve_cache=ResolveCache()
+        ).with_context({"targeting_key": "user-1"})
+
+    def test_second_resolve_is_served_from_cache(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(RESOLVE_URL, json=SUCCESSFUL_FLAG_RESOLVE)
+
+            first = self.confidence.resolve_string_details(
+                "python-flag-1.string-key", "yellow"
+            )
+            second = self.confidence.resolve_string_details(
+                "python-flag-1.string-key", "yellow"
+            )
+
+            self.assertEqual(mock.call_count, 1)
+            self.assertEqual(first.reason, Reason.TARGETING_MATCH)
+            self.assertEqual(second.reason, Reason.CACHED)
+            self.assertEqual(second.value, "outer-string")
+            self.assertEqual(second.variant, "enabled")
+
+    def test_different_context_is_a_miss(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(RESOLVE_URL, json=SUCCESSFUL_FLAG_RESOLVE)
+
+            self.confidence.resolve_string_details("python-flag-1.string-key", "")
+            other = self.confidence.with_context({"targeting_key": "user-2"})
+            details = other.resolve_string_details("python-flag-1.string-key", "")
+
+            self.assertEqual(mock.call_count, 2)
+            self.assertEqual(details.reason, Reason.TARGETING_MATCH)
+
+    def test_resolve_many_only_fetches_missing_flags(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                RESOLVE_URL,
+                [
+                    {"json": SUCCESSFUL_FLAG_RESOLVE},
+                    {"json": INTEGER_AS_FLOAT_FLAG_RESOLVE},
+                ],
+            )
+            self.confidence.resolve_string_details("python-flag-1.string-key", "")
+            results = self.confidence.resolve_many(
+                [
+                    FlagRequest("python-flag-1.string-key", str, ""),
+                    FlagRequest("test-flag.myinteger", int, -1),
+                ]
+            )
+
+            self.assertEqual(mock.call_count, 2)
+            self.assertEqual(
+                mock.request_history[1].json()["flags"], ["flags/test-flag"]
+            )
+            self.assertEqual(results["python-flag-1.string-key"].reason, Reason.CACHED)
+            self.assertEqual(
+                results["test-flag.myinteger"].reason, Reason.TARGETING_MATCH
+            )
+
+    def test_snapshot_populates_cache(self):
+        # with a flag applier resolves never apply, so they share the snapshot's
+        # entries
+        applier = FlagApplier()
+        confidence = Confidence(
+            client_secret="test", resolve_cache=ResolveCache(), flag_applier=applier
+        ).with_context({"targeting_key": "user-1"})
+        with requests_mock.Mocker() as mock:
+            mock.post(RESOLVE_URL, json=MULTI_FLAG_RESOLVE)
+            mock.post(APPLY_URL, json={})
+
+            confidence.snapshot()
+            details = confidence.resolve_integer_details("test-flag.myinteger", -1)
+            applier.close()
+
+            self.assertEqual(
+                [request.url for request in mock.request_history],
+                [RESOLVE_URL, APPLY_URL],
+            )
+            self.assertEqual(details.reason, Reason.CACHED)
+            self.assertEqual(details.value, 400)
+
+    def test_unapplied_snapshot_is_not_served_to_resolves_that_apply(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(RESOLVE_URL, json=MULTI_FLAG_RESOLVE)
+
+            self.confidence.snapshot()
+            details = self.confidence.resolve_integer_details("test-flag.myinteger", -1)
+
+            self.assertEqual(mock.call_count, 2)
+            self.assertTrue(mock.request_history[1].json()["apply"])
+            self.assertEqual(details.reason, Reason.TARGETING_MATCH)
+
+    def test_shared_cache_is_kept_apart_per_client(self):
+        cache = ResolveCache()
+        clients = [
+            Confidence(client_secret="client-a", resolve_cache=cache),
+            Confidence(client_secret="client-b", resolve_cache=cache),
+            Confidence(
+                client_secret="client-a",
+                resolve_cache=cache,
+                apply_on_resolve=False,
+            ),
+        ]
+        with requests_mock.Mocker() as mock:
+            mock.post(RESOLVE_URL, json=SUCCESSFUL_FLAG_RESOLVE)
+
+            for client in clients + clients:
+                client.with_context({"targeting_key": "user-1"}).resolve_string_details(
+                    "python-flag-1.string-key", "yellow"
+                )
+
+            self.assertEqual(
+                [
+                    (request.json()["clientSecret"], request.json()["apply"])
+                    for request in mock.request_history
+                ],
+                [("client-a", True), ("client-b", True), ("client-a", False)],
+            )
+
+    @unittest.skipUnless(PROTOBUF_AVAILABLE, "protobuf not available")
+    def test_cache_hit_records_cached_trace(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(RESOLVE_URL, json=SUCCESSFUL_FLAG_RESOLVE)
+            self.confidence.resolve_string_details("python-flag-1.string-key", "")
+            self.confidence._telemetry.get_monitoring_header()
+
+            self.confidence.resolve_string_details("python-flag-1.string-key", "")
+
+        monitoring = ProtoMonitoring()
+        monitoring.ParseFromString(
+            base64.b64decode(self.confidence._telemetry.get_monitoring_header())
+        )
+        traces = monitoring.library_traces[0].traces
+        self.assertEqual(len(traces), 1)
+        self.assertEqual(
+            traces[0].request_trace.status,
+            ProtoLibraryTraces.ProtoTrace.ProtoRequestTrace.PROTO_STATUS_CACHED,
+        )
+
+    async def test_async_resolve_uses_cache(self):
+        mock_post = AsyncMock()
+        mock_post.return_value = httpx.Response(
+            status_code=200,
+            json=SUCCESSFUL_FLAG_RESOLVE,
+            request=httpx.Request("POST", RESOLVE_URL),
+        )
+
+        with patch("httpx.AsyncClient.post", mock_post):
+            await self.confidence.resolve_boolean_details_async(
+                "python-flag-1.enabled", False
+            )
+            details = await self.confidence.resolve_boolean_details_async(
+                "python-flag-1.enabled", False
+            )
+
+        mock_post.assert_called_once()
+        self.assertEqual(details.reason, Reason.CACHED)
+        self.assertEqual(details.value, True)
+
+
+class TestStaleWhileRevalidate(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _confidence(self, cache):
+        return Confidence(client_secret="test", resolve_cache=cache).with_context(
+            {"targeting_key": "user-1"}
+        )
+
+    def test_lookup_reports_stale_entries(self):
+        cache = ResolveCache(ttl_seconds=10, max_staleness_seconds=20, clock=self.clock)
+        cache.put("flag", "fp", _result())
+
+        self.clock.now = 15
+        result, stale = cache.lookup("flag", "fp")
+        self.assertIsNotNone(result)
+        self.assertTrue(stale)
+        self.assertIsNone(cache.get("flag", "fp"))
+
+        self.clock.now = 31
+        self.assertEqual(cache.lookup("flag", "fp"), (None, False))
+
+    def test_stale_value_is_served_while_refreshing(self):
+        cache = ResolveCache(ttl_seconds=10, max_staleness_seconds=60, clock=self.clock)
+        confidence = self._confidence(cache)
+
+        with requests_mock.Mocker() as mock:
+            mock.post(RESOLVE_URL, json=SUCCESSFUL_FLAG_RESOLVE)
+            confidence.resolve_string_details("python-flag-1.string-key", "")
+
+            self.clock.now = 20
+            details = confidence.resolve_string_details("python-flag-1.string-key", "")
+            cache._executor.shutdown(wait=True)
+
+            self.assertEqual(details.value, "outer-string")
+            self.assertEqual(details.reason, Reason.CACHED)
+            self.assertEqual(mock.call_count, 2)
+            self.assertIsNotNone(cache.get("python-flag-1", _fingerprint(confidence)))
+
+    def test_failed_refresh_keeps_serving_until_max_staleness(self):
+        cache = ResolveCache(ttl_seconds=10, max_staleness_seconds=60, clock=self.clock)
+        confidence = self._confidence(cache)
+
+        with requests_mock.Mocker() as mock:
+            mock.post(RESOLVE_URL, json=SUCCESSFUL_FLAG_RESOLVE)
+            confidence.resolve_string_details("python-flag-1.string-key", "")
+
+            mock.post(RESOLVE_URL, exc=RequestsConnectionError("down"))
+            self.clock.now = 20
+            served = confidence.resolve_string_details("python-flag-1.string-key", "")
+            cache._executor.shutdown(wait=True)
+            cache._executor = None
+
+            self.clock.now = 65
+            still_served = confidence.resolve_string_details(
+                "python-flag-1.string-key", ""
+            )
+            cache._executor.shutdown(wait=True)
+
+            self.clock.now = 75
+            expired = confidence.resolve_string_details(
+                "python-flag-1.string-key", "default"
+            )
+
+        self.assertEqual(served.value, "outer-string")
+        self.assertEqual(still_served.value, "outer-string")
+        self.assertEqual(expired.value, "default")
+        self.assertEqual(expired.error_code, ErrorCode.GENERAL)
+
+    def test_last_known_good_is_served_when_resolve_fails(self):
+        cache = ResolveCache(
+            ttl_seconds=10,
+            max_staleness_seconds=60,
+            stale_while_revalidate=False,
+            clock=self.clock,
+        )
+        confidence = self._confidence(cache)
+
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                RESOLVE_URL,
+                [
+                    {"json": SUCCESSFUL_FLAG_RESOLVE},
+                    {"exc": RequestsConnectionError("down")},
+                ],
+            )
+            confidence.resolve_string_details("python-flag-1.string-key", "")
+
+            self.clock.now = 20
+            details = confidence.resolve_string_details("python-flag-1.string-key", "")
+
+            self.assertEqual(mock.call_count, 2)
+            self.assertEqual(details.value, "outer-string")
+            self.assertEqual(details.reason, Reason.CACHED)
+
+    async def test_stale_value_is_refreshed_by_a_task(self):
+        cache = ResolveCache(ttl_seconds=10, max_staleness_seconds=60, clock=self.clock)
+        confidence = self._confidence(cache)
+        mock_post = AsyncMock()
+        mock_post.return_value = httpx.Response(
+            status_code=200,
+            json=SUCCESSFUL_FLAG_RESOLVE,
+            request=httpx.Request("POST", RESOLVE_URL),
+        )
+
+        with patch("httpx.AsyncClient.post", mock_post):
+            await confidence.resolve_string_details_async(
+                "python-flag-1.string-key", ""
+            )
+            self.clock.now = 20
+            details = await confidence.resolve_string_details_async(
+                "python-flag-1.string-key", ""
+            )
+            self.assertEqual(len(cache._tasks), 1)
+            await asyncio.gather(*cache._tasks)
+
+        self.assertEqual(details.reason, Reason.CACHED)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertIsNotNone(cache.get("python-flag-1", _fingerprint(confidence)))
+
+
+def _fingerprint(confidence):
+    return confidence._cache_fingerprint(confidence.context)
+
+
+if __name__ == "__main__":
+    unittest.main()
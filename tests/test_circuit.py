@@ -0,0 +1,214 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import requests
+
+from confidence.circuit import CircuitBreaker, CircuitState
+from confidence.concurrency import ConcurrencyLimiter
+from confidence.confidence import Confidence
+from confidence.errors import (
+    CircuitOpenError,
+    ErrorCode,
+    FlagNotFoundError,
+    GeneralError,
+    TimeoutError,
+)
+from confidence.flag_types import Reason
+from confidence.transport import TransportError
+from tests.test_confidence import SUCCESSFUL_FLAG_RESOLVE
+
+ENDPOINT = "https://resolver.confidence.dev"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail():
+    raise GeneralError("down") from TransportError("down")
+
+
+def _time_out():
+    raise TimeoutError()
+
+
+def _succeed():
+    return "ok"
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            minimum_requests=4, open_seconds=5, clock=self.clock
+        )
+
+    def _call(self, fn):
+        try:
+            return self.breaker.call(ENDPOINT, fn)
+        except (GeneralError, TimeoutError, CircuitOpenError) as e:
+            return e
+
+    def test_opens_when_the_error_rate_is_reached(self):
+        self._call(_succeed)
+        self._call(_succeed)
+        self._call(_fail)
+        self.assertEqual(self.breaker.state(ENDPOINT), CircuitState.CLOSED)
+
+        self._call(_fail)
+
+        self.assertEqual(self.breaker.state(ENDPOINT), CircuitState.OPEN)
+        self.assertIsInstance(self._call(_succeed), CircuitOpenError)
+        self.assertEqual(self.breaker.rejected, 1)
+
+    def test_opens_when_the_timeout_rate_is_reached(self):
+        for fn in [_succeed, _succeed, _succeed, _succeed, _time_out]:
+            self._call(fn)
+
+        self.assertEqual(self.breaker.state(ENDPOINT), CircuitState.OPEN)
+
+    def test_non_transient_errors_do_not_open_the_circuit(self):
+        def not_found():
+            raise FlagNotFoundError()
+
+        for _ in range(10):
+            with self.assertRaises(FlagNotFoundError):
+                self.breaker.call(ENDPOINT, not_found)
+
+        self.assertEqual(self.breaker.state(ENDPOINT), CircuitState.CLOSED)
+
+    def test_old_failures_leave_the_window(self):
+        self._call(_fail)
+        self._call(_fail)
+        self._call(_fail)
+        self.clock.now += 60
+        self._call(_fail)
+
+        self.assertEqual(self.breaker.state(ENDPOINT), CircuitState.CLOSED)
+
+    def test_half_open_trial_closes_or_reopens_the_circuit(self):
+        for _ in range(4):
+            self._call(_fail)
+        self.clock.now += 5
+        self.assertEqual(self.breaker.state(ENDPOINT), CircuitState.HALF_OPEN)
+
+        self._call(_fail)
+        self.assertEqual(self.breaker.state(ENDPOINT), CircuitState.OPEN)
+
+        self.clock.now += 5
+        self.assertEqual(self._call(_succeed), "ok")
+        self.assertEqual(self.breaker.state(ENDPOINT), CircuitState.CLOSED)
+        self.assertEqual(self.breaker.opened, 2)
+
+    def test_endpoints_have_separate_circuits(self):
+        for _ in range(4):
+            self._call(_fail)
+
+        self.assertEqual(self.breaker.call("https://other", _succeed), "ok")
+        self.assertEqual(
+            self.breaker.metrics()["https://other"],
+            {"state": "closed", "requests": 1, "errors": 0, "timeouts": 0},
+        )
+
+    def test_state_changes_are_logged(self):
+        with self.assertLogs("confidence_logger", level="WARNING") as logs:
+            for _ in range(4):
+                self._call(_fail)
+
+        self.assertIn("changed from closed to open", logs.output[-1])
+
+
+class TestConfidenceCircuitBreaker(unittest.TestCase):
+    def test_open_circuit_returns_the_default_without_a_request(self):
+        breaker = CircuitBreaker(minimum_requests=2)
+        confidence = Confidence(client_secret="test", circuit_breaker=breaker)
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = requests.ConnectionError("down")
+            for _ in range(2):
+                confidence.resolve_string_details("python-flag-1.string-key", "")
+            details = confidence.resolve_string_details(
+                "python-flag-1.string-key", "yellow"
+            )
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(details.value, "yellow")
+        self.assertEqual(details.reason, Reason.CIRCUIT_OPEN)
+        self.assertEqual(details.error_code, ErrorCode.CIRCUIT_OPEN)
+        self.assertEqual(breaker.rejected, 1)
+
+    def test_successful_resolves_keep_the_circuit_closed(self):
+        breaker = CircuitBreaker(minimum_requests=1)
+        confidence = Confidence(client_secret="test", circuit_breaker=breaker)
+        response = MagicMock(status_code=200)
+        response.json.return_value = SUCCESSFUL_FLAG_RESOLVE
+
+        with patch("requests.Session.post", return_value=response):
+            details = confidence.resolve_string_details(
+                "python-flag-1.string-key", "yellow"
+            )
+
+        self.assertEqual(details.value, "outer-string")
+        self.assertEqual(breaker.state(ENDPOINT), CircuitState.CLOSED)
+
+
+class TestConfidenceCircuitBreakerAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_open_circuit_fails_fast(self):
+        breaker = CircuitBreaker(minimum_requests=1)
+        confidence = Confidence(client_secret="test", circuit_breaker=breaker)
+        mock_post = AsyncMock(side_effect=httpx.ConnectError("down"))
+
+        with patch("httpx.AsyncClient.post", mock_post):
+            await confidence.resolve_string_details_async("python-flag-1.str", "")
+            details = await confidence.resolve_string_details_async(
+                "python-flag-1.string-key", "yellow"
+            )
+
+        mock_post.assert_called_once()
+        self.assertEqual(details.error_code, ErrorCode.CIRCUIT_OPEN)
+
+    async def test_slot_wait_timeouts_do_not_open_the_circuit(self):
+        breaker = CircuitBreaker(minimum_requests=2)
+        confidence = Confidence(
+            client_secret="test",
+            timeout_ms=300,
+            circuit_breaker=breaker,
+            resolve_limiter=ConcurrencyLimiter(max_concurrent=1),
+        )
+
+        async def post(url, *args, **kwargs):
+            await asyncio.sleep(0.2)
+            return httpx.Response(
+                status_code=200,
+                json=SUCCESSFUL_FLAG_RESOLVE,
+                request=httpx.Request("POST", url),
+            )
+
+        with patch("httpx.AsyncClient.post", AsyncMock(side_effect=post)):
+            results = await asyncio.gather(
+                *[
+                    confidence.resolve_string_details_async(
+                        "python-flag-1.string-key", "yellow"
+                    )
+                    for _ in range(5)
+                ]
+            )
+
+        error_codes = [details.error_code for details in results]
+        self.assertEqual(error_codes.count(None), 2)
+        self.assertEqual(error_codes.count(ErrorCode.TIMEOUT), 3)
+        self.assertEqual(breaker.state(ENDPOINT), CircuitState.CLOSED)
+        self.assertEqual(
+            breaker.metrics()[ENDPOINT],
+            {"state": "closed", "requests": 2, "errors": 0, "timeouts": 0},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from confidence.concurrency import ConcurrencyLimiter
+from confidence.confidence import Confidence
+from confidence.errors import ErrorCode, GeneralError, TimeoutError
+from confidence.transport import (
+    InMemoryTransport,
+    TransportRequest,
+    TransportResponse,
+    TransportTimeout,
+)
+from tests.test_confidence import SUCCESSFUL_FLAG_RESOLVE
+
+FLAGS = {"f": {"variant": "flags/f/variants/on", "value": {"s": "x"}}}
+
+
+class TimeoutRespectingTransport(InMemoryTransport):
+    async def send_async(self, request: TransportRequest) -> TransportResponse:
+        try:
+            await asyncio.wait_for(
+                asyncio.sleep(self.latency_ms / 1000.0), request.timeout_sec
+            )
+        except asyncio.TimeoutError:
+            raise TransportTimeout("timed out")
+        return self._answer(request)
+
+
+class TestConcurrencyLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_caps_concurrent_holders(self):
+        limiter = ConcurrencyLimiter(max_concurrent=2)
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            async with limiter.acquire():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[work() for _ in range(10)])
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter.queued, 0)
+
+    async def test_rejects_when_queue_is_full(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.acquire():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        waiter = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+
+        with self.assertRaises(GeneralError):
+            async with limiter.acquire():
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+        self.assertEqual(limiter.rejected, 1)
+
+    async def test_queue_wait_is_bounded_by_timeout(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.acquire():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+
+        with self.assertRaises(TimeoutError):
+            async with limiter.acquire(timeout=0.01):
+                pass
+        release.set()
+        await holder
+
+    async def test_acquire_returns_the_rest_of_the_timeout(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1)
+
+        async with limiter.acquire() as no_timeout:
+            pass
+        async with limiter.acquire(timeout=1.0) as remaining:
+            pass
+
+        self.assertIsNone(no_timeout)
+        self.assertTrue(0.9 < remaining <= 1.0)
+
+    async def test_async_resolves_respect_the_cap(self):
+        limiter = ConcurrencyLimiter(max_concurrent=3)
+        confidence = Confidence(client_secret="test", resolve_limiter=limiter)
+        peak = 0
+
+        async def slow_post(*args, **kwargs):
+            nonlocal peak
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            return httpx.Response(
+                status_code=200,
+                json=SUCCESSFUL_FLAG_RESOLVE,
+                request=httpx.Request(
+                    "POST", "https://resolver.confidence.dev/v1/flags:resolve"
+                ),
+            )
+
+        mock_post = AsyncMock(side_effect=slow_post)
+        with patch("httpx.AsyncClient.post", mock_post):
+            details = await asyncio.gather(
+                *[
+                    confidence.with_context(
+                        {"targeting_key": f"user-{i}"}
+                    ).resolve_string_details_async("python-flag-1.string-key", "")
+                    for i in range(12)
+                ]
+            )
+
+        self.assertEqual(mock_post.call_count, 12)
+        self.assertEqual(peak, 3)
+        self.assertTrue(all(detail.value == "outer-string" for detail in details))
+
+    async def test_queue_timeout_returns_default(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1)
+        confidence = Confidence(
+            client_secret="test", timeout_ms=10, resolve_limiter=limiter
+        )
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.acquire():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+
+        details = await confidence.resolve_string_details_async(
+            "python-flag-1.string-key", "yellow"
+        )
+        release.set()
+        await holder
+
+        self.assertEqual(details.value, "yellow")
+        self.assertEqual(details.error_code, ErrorCode.TIMEOUT)
+
+    async def test_slot_wait_is_taken_from_the_request_timeout(self):
+        confidence = Confidence(
+            client_secret="test",
+            timeout_ms=300,
+            resolve_limiter=ConcurrencyLimiter(max_concurrent=1),
+            async_transport=TimeoutRespectingTransport(FLAGS, latency_ms=200),
+            disable_telemetry=True,
+        )
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            confidence.resolve_string_details_async("f.s", ""),
+            confidence.with_context({"user": "b"}).resolve_string_details_async(
+                "f.s", ""
+            ),
+        )
+        elapsed = time.perf_counter() - start
+
+        # the second resolve waited 200ms for the slot, only 100ms were left
+        self.assertEqual(
+            [details.error_code for details in results], [None, ErrorCode.TIMEOUT]
+        )
+        self.assertLess(elapsed, 0.38)
+
+
+if __name__ == "__main__":
+    unittest.main()
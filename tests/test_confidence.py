@@ -7,9 +7,10 @@ from requests.exceptions import Timeout as RequestsTimeout
 
 
 import confidence.confidence
-from confidence.confidence import Confidence, DEFAULT_TIMEOUT_MS
+from confidence.confidence import Confidence, FlagRequest, DEFAULT_TIMEOUT_MS
 from confidence.errors import ErrorCode
 from confidence.flag_types import Reason
+from confidence.transport import InMemoryTransport
 
 
 class TestConfidence(unittest.IsolatedAsyncioTestCase):
@@ -338,7 +339,7 @@ class TestConfidence(unittest.IsolatedAsyncioTestCase):
                 json=SUCCESSFUL_FLAG_RESOLVE,
             )
 
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value.status_code = 200
                 mock_post.return_value.json.return_value = SUCCESSFUL_FLAG_RESOLVE
 
@@ -350,7 +351,7 @@ class TestConfidence(unittest.IsolatedAsyncioTestCase):
                     default_value="yellow",
                 )
 
-                # Verify that timeout was passed to requests.post
+                # Verify that timeout was passed to the pooled session
                 mock_post.assert_called_once()
                 _, kwargs = mock_post.call_args
                 self.assertEqual(kwargs["timeout"], 5.5)
@@ -388,7 +389,7 @@ class TestConfidence(unittest.IsolatedAsyncioTestCase):
                 json=SUCCESSFUL_FLAG_RESOLVE,
             )
 
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value.status_code = 200
                 mock_post.return_value.json.return_value = SUCCESSFUL_FLAG_RESOLVE
 
@@ -399,7 +400,7 @@ class TestConfidence(unittest.IsolatedAsyncioTestCase):
                     default_value="yellow",
                 )
 
-                # Verify that default timeout (10 seconds) was passed to requests.post
+                # Verify that default timeout (10 seconds) was passed to the pooled session
                 mock_post.assert_called_once()
                 _, kwargs = mock_post.call_args
                 self.assertEqual(kwargs["timeout"], DEFAULT_TIMEOUT_MS / 1000.0)
@@ -545,7 +546,7 @@ class TestConfidence(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(result.value, 42)
 
     def test_handle_actual_timeout(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             # Simulate a timeout by raising the Timeout exception
             mock_post.side_effect = RequestsTimeout("Connection timed out")
 
@@ -589,6 +590,153 @@ class TestConfidence(unittest.IsolatedAsyncioTestCase):
             self.assertIsNone(result.variant)
             self.assertEqual(result.error_code, ErrorCode.TIMEOUT)
 
+    def test_resolve_many_uses_single_request(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=MULTI_FLAG_RESOLVE,
+            )
+            results = self.confidence.resolve_many(
+                [
+                    FlagRequest("python-flag-1.string-key", str, "yellow"),
+                    FlagRequest("python-flag-1.int-key", int, -1),
+                    FlagRequest("test-flag.myinteger", int, -1),
+                    FlagRequest("missing-flag", bool, False),
+                ]
+            )
+
+            self.assertEqual(mock.call_count, 1)
+            self.assertEqual(
+                mock.request_history[0].json()["flags"],
+                ["flags/python-flag-1", "flags/test-flag", "flags/missing-flag"],
+            )
+            self.assertEqual(results["python-flag-1.string-key"].value, "outer-string")
+            self.assertEqual(results["python-flag-1.int-key"].value, 42)
+            self.assertEqual(results["test-flag.myinteger"].value, 400)
+            self.assertEqual(
+                results["test-flag.myinteger"].reason, Reason.TARGETING_MATCH
+            )
+            self.assertEqual(results["missing-flag"].value, False)
+            self.assertEqual(
+                results["missing-flag"].error_code, ErrorCode.FLAG_NOT_FOUND
+            )
+
+    def test_resolve_many_type_mismatch_only_affects_that_flag(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=MULTI_FLAG_RESOLVE,
+            )
+            results = self.confidence.resolve_many(
+                [
+                    FlagRequest("python-flag-1.string-key", int, -1),
+                    FlagRequest("test-flag.myinteger", int, -1),
+                ]
+            )
+
+            self.assertEqual(results["python-flag-1.string-key"].value, -1)
+            self.assertEqual(
+                results["python-flag-1.string-key"].error_code, ErrorCode.GENERAL
+            )
+            self.assertEqual(results["test-flag.myinteger"].value, 400)
+
+    def test_resolve_many_timeout_returns_defaults(self):
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = RequestsTimeout("Connection timed out")
+
+            results = self.confidence.resolve_many(
+                [
+                    FlagRequest("python-flag-1.string-key", str, "yellow"),
+                    FlagRequest("test-flag.myinteger", int, -1),
+                ]
+            )
+
+            mock_post.assert_called_once()
+            self.assertEqual(results["python-flag-1.string-key"].value, "yellow")
+            self.assertEqual(
+                results["python-flag-1.string-key"].error_code, ErrorCode.TIMEOUT
+            )
+            self.assertEqual(results["test-flag.myinteger"].value, -1)
+
+    def test_resolve_many_without_flags_sends_no_request(self):
+        with patch("requests.Session.post") as mock_post:
+            results = self.confidence.resolve_many([])
+
+        mock_post.assert_not_called()
+        self.assertEqual(results, {})
+
+    async def test_resolve_many_async_without_flags_sends_no_request(self):
+        with patch("httpx.AsyncClient.post") as mock_post:
+            results = await self.confidence.resolve_many_async([])
+
+        mock_post.assert_not_called()
+        self.assertEqual(results, {})
+
+    def test_resolve_many_with_an_unknown_flag_resolves_flags_one_by_one(self):
+        flags = {"f": {"variant": "flags/f/variants/on", "value": {"enabled": True}}}
+        transport = InMemoryTransport(flags)
+        confidence = Confidence(client_secret="test", transport=transport)
+
+        results = confidence.resolve_many(
+            [
+                FlagRequest("f.enabled", bool, False),
+                FlagRequest("typo-flag.enabled", bool, False),
+            ]
+        )
+
+        self.assertEqual(results["f.enabled"].value, True)
+        self.assertIsNone(results["f.enabled"].error_code)
+        self.assertEqual(
+            results["typo-flag.enabled"].error_code, ErrorCode.FLAG_NOT_FOUND
+        )
+        # the failed request for both, then one request per flag
+        self.assertEqual(transport.calls["/v1/flags:resolve"], 3)
+
+    async def test_resolve_many_async_with_an_unknown_flag(self):
+        flags = {"f": {"variant": "flags/f/variants/on", "value": {"enabled": True}}}
+        confidence = Confidence(
+            client_secret="test", async_transport=InMemoryTransport(flags)
+        )
+
+        results = await confidence.resolve_many_async(
+            [
+                FlagRequest("f.enabled", bool, False),
+                FlagRequest("typo-flag.enabled", bool, False),
+            ]
+        )
+
+        self.assertEqual(results["f.enabled"].value, True)
+        self.assertEqual(
+            results["typo-flag.enabled"].error_code, ErrorCode.FLAG_NOT_FOUND
+        )
+
+    async def test_resolve_many_async(self):
+        mock_response = httpx.Response(
+            status_code=200,
+            json=MULTI_FLAG_RESOLVE,
+            request=httpx.Request(
+                "POST", "https://resolver.confidence.dev/v1/flags:resolve"
+            ),
+        )
+        mock_post = AsyncMock()
+        mock_post.return_value = mock_response
+
+        with patch("httpx.AsyncClient.post", mock_post):
+            results = await self.confidence.resolve_many_async(
+                [
+                    FlagRequest("python-flag-1.enabled", bool, False),
+                    FlagRequest("test-flag.myinteger", int, -1),
+                ]
+            )
+
+            mock_post.assert_called_once()
+            _, kwargs = mock_post.call_args
+            self.assertEqual(
+                kwargs["json"]["flags"], ["flags/python-flag-1", "flags/test-flag"]
+            )
+            self.assertEqual(results["python-flag-1.enabled"].value, True)
+            self.assertEqual(results["test-flag.myinteger"].value, 400)
+
     def test_context_is_isolated_per_instance(self):
         a = Confidence(client_secret="test")
         b = Confidence(client_secret="test")
@@ -598,6 +746,28 @@ class TestConfidence(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(a.context, {"user": "alice"})
         self.assertEqual(b.context, {})
 
+    def test_with_context_does_not_run_the_constructor(self):
+        parent = Confidence(client_secret="test")
+        parent.put_context("user", "alice")
+
+        with patch.object(Confidence, "__init__") as mock_init:
+            child = parent.with_context({"targeting_key": "boop"})
+
+        mock_init.assert_not_called()
+        self.assertEqual(child.context, {"user": "alice", "targeting_key": "boop"})
+        self.assertIs(child._transport, parent._transport)
+        self.assertIs(child._async_transport, parent._async_transport)
+        self.assertIs(child._event_tasks, parent._event_tasks)
+
+    def test_with_context_leaves_the_parent_context_unchanged(self):
+        parent = Confidence(client_secret="test")
+        child = parent.with_context({"targeting_key": "boop"})
+
+        child.put_context("user", "bob")
+
+        self.assertEqual(parent.context, {})
+        self.assertEqual(child.context, {"targeting_key": "boop", "user": "bob"})
+
     if __name__ == "__main__":
         unittest.main()
 
@@ -636,6 +806,7 @@ EXPECTED_REQUEST_PAYLOAD = json.loads(
 }"""
 )
 
+
 def _make_int_flag_resolve(value):
     return {
         "resolvedFlags": [
@@ -714,3 +885,9 @@ SUCCESSFUL_FLAG_RESOLVE = json.loads(
   "resolveToken": ""
     }"""
 )
+
+MULTI_FLAG_RESOLVE = {
+    "resolvedFlags": SUCCESSFUL_FLAG_RESOLVE["resolvedFlags"]
+    + INTEGER_AS_FLOAT_FLAG_RESOLVE["resolvedFlags"],
+    "resolveToken": "token1",
+}
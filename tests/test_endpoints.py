@@ -0,0 +1,143 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from confidence.confidence import Confidence, Region
+from confidence.endpoints import EndpointSelector
+from confidence.transport import TransportResponse
+from tests.test_confidence import SUCCESSFUL_FLAG_RESOLVE
+
+EU = Region.EU.value
+US = Region.US.value
+
+
+def _resolve_response():
+    response = MagicMock(status_code=200)
+    response.json.return_value = SUCCESSFUL_FLAG_RESOLVE
+    return response
+
+
+class TestEndpointSelector(unittest.TestCase):
+    def test_first_candidate_is_used_until_measured(self):
+        selector = EndpointSelector([Region.EU, Region.US])
+
+        self.assertEqual(selector.select(), EU)
+        self.assertEqual(selector.latencies(), {EU: None, US: None})
+
+    def test_fastest_endpoint_is_selected(self):
+        selector = EndpointSelector([Region.EU, Region.US])
+        selector.record(EU, 80, True)
+        selector.record(US, 20, True)
+
+        self.assertEqual(selector.select(), US)
+        self.assertEqual(selector.failovers, 0)
+
+    def test_switch_margin_prevents_flapping(self):
+        selector = EndpointSelector([EU, US], switch_margin=0.2)
+        selector.record(EU, 50, True)
+        selector.record(US, 45, True)
+
+        self.assertEqual(selector.select(), EU)
+
+    def test_latency_is_smoothed(self):
+        selector = EndpointSelector([EU], latency_smoothing=0.5)
+        selector.record(EU, 100, True)
+        selector.record(EU, 200, True)
+
+        self.assertEqual(selector.latencies()[EU], 150)
+
+    def test_fails_over_after_consecutive_failures(self):
+        selector = EndpointSelector([EU, US], failure_threshold=2)
+        selector.record(EU, 10, True)
+        selector.record(US, 100, True)
+        self.assertEqual(selector.select(), EU)
+
+        selector.record(EU, 0, False)
+        self.assertEqual(selector.select(), EU)
+        selector.record(EU, 0, False)
+
+        self.assertFalse(selector.is_healthy(EU))
+        self.assertEqual(selector.select(), US)
+        self.assertEqual(selector.failovers, 1)
+
+    def test_probes_measure_every_candidate(self):
+        probed = []
+        probed_all = threading.Event()
+        selector = EndpointSelector([EU, US])
+
+        def probe(endpoint):
+            probed.append(endpoint)
+            if endpoint == EU:
+                raise requests.ConnectionError("down")
+            probed_all.set()
+
+        selector.bind(probe)
+        self.assertTrue(probed_all.wait(timeout=5))
+        selector.close()
+
+        self.assertEqual(probed[:2], [EU, US])
+        self.assertIsNotNone(selector.latencies()[US])
+
+    def test_needs_a_candidate(self):
+        with self.assertRaises(ValueError):
+            EndpointSelector([])
+
+
+class TestConfidenceEndpointSelection(unittest.TestCase):
+    def test_resolves_go_to_the_selected_endpoint(self):
+        selector = EndpointSelector([EU, US], probe_interval_seconds=3600)
+        session = MagicMock()
+        session.post.return_value = _resolve_response()
+        confidence = Confidence(
+            client_secret="test", http_session=session, endpoint_selector=selector
+        )
+        selector.close()
+        selector.record(EU, 0, False)
+        selector.record(EU, 0, False)
+        selector.record(EU, 0, False)
+        selector.record(US, 30, True)
+        session.post.reset_mock()
+
+        details = confidence.with_context({"user": "a"}).resolve_string_details(
+            "python-flag-1.string-key", "yellow"
+        )
+
+        self.assertEqual(details.value, "outer-string")
+        self.assertEqual(session.post.call_args.args[0], f"{US}/v1/flags:resolve")
+
+    def test_failed_resolves_count_against_the_endpoint(self):
+        selector = EndpointSelector([EU, US], failure_threshold=1)
+        session = MagicMock()
+        session.post.side_effect = requests.ConnectionError("down")
+        confidence = Confidence(
+            client_secret="test", http_session=session, endpoint_selector=selector
+        )
+        selector.close()
+        selector.record(US, 30, True)
+        selector.record(EU, 10, True)
+
+        confidence.resolve_string_details("python-flag-1.string-key", "yellow")
+
+        self.assertFalse(selector.is_healthy(EU))
+        self.assertEqual(selector.select(), US)
+
+    def test_probes_do_not_take_the_telemetry_traces(self):
+        transport = MagicMock()
+        transport.send.return_value = TransportResponse(400, {}, "Bad Request")
+        confidence = Confidence(client_secret="test", transport=transport)
+
+        with patch.object(
+            confidence._telemetry, "get_monitoring_header"
+        ) as get_monitoring_header:
+            confidence._probe_endpoint(EU)
+
+        get_monitoring_header.assert_not_called()
+        request = transport.send.call_args.args[0]
+        self.assertEqual(request.url, f"{EU}/v1/flags:resolve")
+        self.assertNotIn("X-CONFIDENCE-TELEMETRY", request.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
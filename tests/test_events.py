@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import requests
+
+from confidence.confidence import Confidence
+from confidence.events import EventPublisher
+
+EVENTS_URL = "https://events.confidence.dev/v1/events:publish"
+
+
+def _event(name, size=0):
+    return {"eventDefinition": f"eventDefinitions/{name}", "payload": {"x": "a" * size}}
+
+
+class TestEventPublisher(unittest.TestCase):
+    def _publisher(self, **kwargs):
+        batches = []
+        publisher = EventPublisher(flush_interval_ms=60000, **kwargs)
+        publisher.bind(lambda events: batches.append(events) or True)
+        return publisher, batches
+
+    def test_events_are_published_in_batches_of_max_batch_size(self):
+        publisher, batches = self._publisher(max_batch_size=2)
+        for i in range(5):
+            publisher.add(_event(f"e{i}"))
+        publisher.close()
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(publisher.events_sent, 5)
+        self.assertEqual(publisher.queue_depth, 0)
+
+    def test_full_batch_is_published_without_waiting_for_the_interval(self):
+        sent = threading.Event()
+        publisher = EventPublisher(max_batch_size=3, flush_interval_ms=60000)
+        publisher.bind(lambda events: sent.set() or True)
+
+        for i in range(3):
+            publisher.add(_event(f"e{i}"))
+
+        self.assertTrue(sent.wait(5))
+        publisher.close()
+
+    def test_old_events_are_published_after_the_flush_interval(self):
+        sent = threading.Event()
+        publisher = EventPublisher(flush_interval_ms=20)
+        publisher.bind(lambda events: sent.set() or True)
+
+        publisher.add(_event("e"))
+
+        self.assertTrue(sent.wait(5))
+        publisher.close()
+
+    def test_flusher_is_only_woken_when_there_is_work(self):
+        publisher, _ = self._publisher(max_batch_size=100)
+        publisher.add(_event("first"))
+
+        with patch.object(publisher._condition, "notify") as mock_notify:
+            for i in range(10):
+                publisher.add(_event(f"e{i}"))
+
+        mock_notify.assert_not_called()
+        publisher.close()
+
+    def test_batches_are_split_by_bytes(self):
+        publisher, batches = self._publisher(max_batch_bytes=250)
+        for i in range(3):
+            publisher.add(_event(f"e{i}", size=100))
+        publisher.close()
+
+        self.assertEqual([len(batch) for batch in batches], [1, 1, 1])
+
+    def test_events_are_dropped_when_the_queue_is_full(self):
+        publisher, _ = self._publisher(max_queued=2)
+
+        results = [publisher.add(_event(f"e{i}")) for i in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(publisher.queue_depth, 2)
+        self.assertEqual(publisher.dropped, 1)
+        publisher.close()
+
+
+class TestConfidenceEventPublisher(unittest.TestCase):
+    def test_tracked_events_are_published_together(self):
+        publisher = EventPublisher(flush_interval_ms=60000)
+        confidence = Confidence(client_secret="test", event_publisher=publisher)
+        user = confidence.with_context({"targeting_key": "user-1"})
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.return_value = MagicMock(status_code=200)
+            mock_post.return_value.json.return_value = {}
+            user.track("navigate", {"page": "home"})
+            user.track("click", {"button": "buy"})
+            publisher.close()
+
+        mock_post.assert_called_once()
+        args, kwargs = mock_post.call_args
+        self.assertEqual(args[0], EVENTS_URL)
+        events = kwargs["json"]["events"]
+        self.assertEqual(
+            [event["eventDefinition"] for event in events],
+            ["eventDefinitions/navigate", "eventDefinitions/click"],
+        )
+        self.assertEqual(
+            events[0]["payload"],
+            {"context": {"targeting_key": "user-1"}, "page": "home"},
+        )
+        self.assertEqual(publisher.events_sent, 2)
+
+    def test_failed_publish_is_counted(self):
+        publisher = EventPublisher(flush_interval_ms=60000)
+        confidence = Confidence(client_secret="test", event_publisher=publisher)
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = requests.exceptions.ConnectionError("down")
+            confidence.track("navigate", {})
+            publisher.close()
+
+        self.assertEqual(publisher.events_failed, 1)
+        self.assertEqual(publisher.events_sent, 0)
+
+
+class TestTrackAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_track_async_uses_the_async_client(self):
+        confidence = Confidence(client_secret="test")
+        user = confidence.with_context({"targeting_key": "user-1"})
+
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return httpx.Response(
+                status_code=200, json={}, request=httpx.Request("POST", EVENTS_URL)
+            )
+
+        mock_post = AsyncMock(side_effect=slow_post)
+        with patch("httpx.AsyncClient.post", mock_post), patch(
+            "requests.Session.post"
+        ) as mock_sync_post:
+            user.track_async("navigate", {"page": "home"})
+            user.track_async("click", {})
+            self.assertEqual(len(confidence._event_tasks), 2)
+            await confidence.flush()
+
+        mock_sync_post.assert_not_called()
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(len(confidence._event_tasks), 0)
+        _, kwargs = mock_post.call_args
+        self.assertEqual(
+            kwargs["json"]["events"][0]["eventDefinition"], "eventDefinitions/click"
+        )
+
+    async def test_track_async_logs_failures(self):
+        confidence = Confidence(client_secret="test")
+        mock_post = AsyncMock(side_effect=httpx.ConnectError("down"))
+
+        with patch("httpx.AsyncClient.post", mock_post), self.assertLogs(
+            "confidence_logger", level="WARNING"
+        ) as logs:
+            confidence.track_async("navigate", {})
+            await confidence.flush()
+
+        self.assertIn("Failed to track event navigate", logs.output[0])
+
+    async def test_flush_publishes_queued_events(self):
+        publisher = EventPublisher(flush_interval_ms=60000)
+        confidence = Confidence(client_secret="test", event_publisher=publisher)
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.return_value = MagicMock(status_code=200)
+            mock_post.return_value.json.return_value = {}
+            confidence.track_async("navigate", {})
+            await confidence.flush()
+
+        mock_post.assert_called_once()
+        self.assertEqual(publisher.queue_depth, 0)
+        publisher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
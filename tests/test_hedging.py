@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import requests
+
+from confidence.confidence import Confidence, Region
+from confidence.hedging import HedgePolicy, _ThreadPool
+from confidence.transport import (
+    InMemoryTransport,
+    TransportRequest,
+    TransportResponse,
+)
+from tests.test_confidence import SUCCESSFUL_FLAG_RESOLVE
+
+PRIMARY_URL = "https://resolver.confidence.dev/v1/flags:resolve"
+SECONDARY_URL = "https://resolver.eu.confidence.dev/v1/flags:resolve"
+
+
+FLAGS = {"f": {"variant": "flags/f/variants/on", "value": {"s": "x"}}}
+
+
+class SlowPrimaryTransport(InMemoryTransport):
+    def __init__(self, flags, primary_latency_ms):
+        super().__init__(flags)
+        self.primary_latency_ms = primary_latency_ms
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        if request.url == PRIMARY_URL:
+            time.sleep(self.primary_latency_ms / 1000.0)
+        return super().send(request)
+
+
+def _response(url, *args, **kwargs):
+    if url == PRIMARY_URL:
+        time.sleep(0.5)
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = SUCCESSFUL_FLAG_RESOLVE
+    return response
+
+
+class TestHedgePolicy(unittest.TestCase):
+    def test_delay_follows_the_latency_percentile(self):
+        policy = HedgePolicy(Region.EU, percentile=95, initial_delay_ms=500)
+        self.assertEqual(policy.hedge_delay_ms(), 500)
+
+        # the delay is recomputed at 20 samples and then every 50 samples
+        for latency in range(1, 121):
+            policy.record_latency(latency)
+
+        self.assertEqual(policy.hedge_delay_ms(), 115)
+
+    def test_fixed_delay_overrides_the_percentile(self):
+        policy = HedgePolicy("https://resolver.example", delay_ms=10)
+        for latency in range(100):
+            policy.record_latency(1000)
+
+        self.assertEqual(policy.hedge_delay_ms(), 10)
+        self.assertEqual(policy.secondary, "https://resolver.example")
+
+
+class TestThreadPool(unittest.TestCase):
+    def test_idle_workers_are_reused(self):
+        pool = _ThreadPool("test-pool")
+        names = [pool.submit(threading.current_thread).result(timeout=5) for _ in range(5)]
+
+        self.assertEqual(len(set(names)), 1)
+
+    def test_tasks_do_not_wait_for_busy_workers(self):
+        pool = _ThreadPool("test-pool")
+        release = threading.Event()
+        busy = [pool.submit(release.wait) for _ in range(20)]
+
+        self.assertEqual(pool.submit(lambda: "done").result(timeout=5), "done")
+        release.set()
+        self.assertTrue(all(future.result(timeout=5) for future in busy))
+
+
+class TestConfidenceHedging(unittest.TestCase):
+    def test_failing_primary_falls_back_to_the_hedge(self):
+        policy = HedgePolicy(Region.EU, delay_ms=20)
+        confidence = Confidence(client_secret="test", hedge_policy=policy)
+
+        def post(url, *args, **kwargs):
+            if url == PRIMARY_URL:
+                time.sleep(0.2)
+                raise requests.exceptions.ConnectionError("reset")
+            return _response(url)
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = post
+            details = confidence.resolve_string_details(
+                "python-flag-1.string-key", "yellow"
+            )
+
+        self.assertEqual(details.value, "outer-string")
+        self.assertEqual(
+            sorted(call.args[0] for call in mock_post.call_args_list),
+            [PRIMARY_URL, SECONDARY_URL],
+        )
+        self.assertEqual(policy.hedged, 1)
+        self.assertEqual(policy.hedge_wins, 1)
+
+    def test_slow_primary_loses_to_a_fast_hedge(self):
+        policy = HedgePolicy(Region.EU, delay_ms=20)
+        transport = SlowPrimaryTransport(FLAGS, primary_latency_ms=1000)
+        confidence = Confidence(
+            client_secret="test", hedge_policy=policy, transport=transport
+        )
+
+        start = time.perf_counter()
+        details = confidence.resolve_string_details("f.s", "")
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(details.value, "x")
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(policy.hedged, 1)
+        self.assertEqual(policy.hedge_wins, 1)
+
+    def test_concurrent_resolves_are_not_limited_by_the_hedge_workers(self):
+        policy = HedgePolicy(Region.EU, delay_ms=1000, max_workers=2)
+        confidence = Confidence(
+            client_secret="test",
+            hedge_policy=policy,
+            transport=InMemoryTransport(FLAGS, latency_ms=50),
+        )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            details = list(
+                pool.map(
+                    lambda _: confidence.resolve_string_details("f.s", ""), range(32)
+                )
+            )
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual({detail.value for detail in details}, {"x"})
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(policy.hedged, 0)
+
+    def test_fast_primary_is_not_hedged(self):
+        policy = HedgePolicy(Region.EU, delay_ms=1000)
+        confidence = Confidence(client_secret="test", hedge_policy=policy)
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.return_value = _response(SECONDARY_URL)
+            confidence.resolve_string_details("python-flag-1.string-key", "yellow")
+
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.args[0], PRIMARY_URL)
+        self.assertEqual(policy.hedged, 0)
+
+
+class TestConfidenceHedgingAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_loser_is_cancelled(self):
+        policy = HedgePolicy(Region.EU, delay_ms=20)
+        confidence = Confidence(client_secret="test", hedge_policy=policy)
+        cancelled = []
+
+        async def post(url, *args, **kwargs):
+            if url == PRIMARY_URL:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(url)
+                    raise
+            return httpx.Response(
+                status_code=200,
+                json=SUCCESSFUL_FLAG_RESOLVE,
+                request=httpx.Request("POST", url),
+            )
+
+        with patch("httpx.AsyncClient.post", AsyncMock(side_effect=post)):
+            details = await asyncio.wait_for(
+                confidence.resolve_string_details_async(
+                    "python-flag-1.string-key", "yellow"
+                ),
+                timeout=2,
+            )
+            await asyncio.sleep(0)
+
+        self.assertEqual(details.value, "outer-string")
+        self.assertEqual(cancelled, [PRIMARY_URL])
+        self.assertEqual(policy.hedge_wins, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
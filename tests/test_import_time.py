@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# generous enough for slow CI machines, the import took ~280ms before the
+# heavy dependencies were made lazy and ~60ms after
+IMPORT_BUDGET_MS = float(os.getenv("CONFIDENCE_IMPORT_BUDGET_MS", "150"))
+HEAVY_MODULES = [
+    "asyncio.base_events",
+    "httpx._client",
+    "requests.sessions",
+    "google.protobuf",
+    "confidence.telemetry_pb2",
+]
+
+
+def _run(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+class TestImportTime(unittest.TestCase):
+    def test_heavy_dependencies_are_imported_on_first_use(self):
+        result = _run(
+            "import json, sys\n"
+            "from confidence.confidence import Confidence\n"
+            "Confidence('secret').with_context({'user': 'alice'})\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+        )
+
+        self.assertEqual(json.loads(result.stdout), [])
+
+    def test_first_resolves_from_many_threads_at_once(self):
+        # requests is loaded by whichever thread resolves first, the others must
+        # not see a partially loaded module
+        result = _run(
+            "import json, threading\n"
+            "from confidence.confidence import Confidence\n"
+            "from confidence.testing import FakeResolver\n"
+            "flags = {'flag': {'variant': 'flags/flag/variants/on',\n"
+            "                  'value': {'enabled': True}}}\n"
+            "values = []\n"
+            "with FakeResolver(flags) as server:\n"
+            "    barrier = threading.Barrier(32)\n"
+            "    def resolve():\n"
+            "        confidence = Confidence(\n"
+            "            'secret', custom_resolve_base_url=server.base_url\n"
+            "        )\n"
+            "        barrier.wait()\n"
+            "        details = confidence.resolve_boolean_details('flag.enabled', False)\n"  # noqa: E501
+            "        values.append(details.value)\n"
+            "    threads = [threading.Thread(target=resolve) for _ in range(32)]\n"
+            "    for thread in threads:\n"
+            "        thread.start()\n"
+            "    for thread in threads:\n"
+            "        thread.join()\n"
+            "print(json.dumps(values))"
+        )
+
+        self.assertEqual(json.loads(result.stdout.splitlines()[-1]), [True] * 32)
+
+    def test_import_is_within_budget(self):
+        timings = []
+        for _ in range(3):
+            result = _run("import confidence.confidence", "-X", "importtime")
+            for line in result.stderr.splitlines():
+                if line.endswith("| confidence.confidence"):
+                    timings.append(int(line.split("|")[1]) / 1000)
+
+        self.assertLess(min(timings), IMPORT_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
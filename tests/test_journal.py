@@ -0,0 +1,180 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from confidence.events import EventPublisher
+from confidence.journal import EventJournal, FsyncPolicy
+
+
+def _event(name):
+    return {"eventDefinition": f"eventDefinitions/{name}", "payload": {}}
+
+
+def _names(events):
+    return [event["eventDefinition"].split("/")[1] for event in events]
+
+
+class TestEventJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _segments(self):
+        return sorted(name for name in os.listdir(self.directory))
+
+    def test_unacked_events_are_replayed_after_restart(self):
+        journal = EventJournal(self.directory, fsync=FsyncPolicy.ALWAYS)
+        first = journal.append(_event("a"))
+        journal.append(_event("b"))
+        journal.ack([first])
+        journal.close()
+
+        reopened = EventJournal(self.directory)
+
+        self.assertEqual(reopened.pending, 1)
+        self.assertEqual(_names(e for _, e in reopened.read_pending()), ["b"])
+
+    def test_event_ids_are_unique_and_replayed_once(self):
+        journal = EventJournal(self.directory)
+        ids = [journal.append(_event("a")) for _ in range(3)]
+        journal.close()
+
+        self.assertEqual(len(set(ids)), 3)
+        replayed = EventJournal(self.directory).read_pending()
+        self.assertEqual([event_id for event_id, _ in replayed], ids)
+
+    def test_fully_acked_segments_are_deleted(self):
+        journal = EventJournal(self.directory, max_segment_bytes=100)
+        ids = [journal.append(_event(f"event-{i}")) for i in range(4)]
+        self.assertGreater(len(self._segments()), 1)
+
+        journal.ack(ids)
+        journal.close()
+
+        self.assertLessEqual(len(self._segments()), 1)
+        self.assertEqual(EventJournal(self.directory).pending, 0)
+
+    def test_oldest_segments_are_dropped_over_the_size_cap(self):
+        journal = EventJournal(
+            self.directory, max_segment_bytes=100, max_total_bytes=250
+        )
+        for i in range(10):
+            journal.append(_event(f"event-{i}"))
+
+        self.assertLessEqual(journal.size_bytes, 250)
+        self.assertGreater(journal.dropped, 0)
+        self.assertEqual(journal.pending + journal.dropped, 10)
+        self.assertEqual(_names(e for _, e in journal.read_pending())[-1], "event-9")
+
+    def test_torn_records_are_skipped(self):
+        journal = EventJournal(self.directory)
+        journal.append(_event("a"))
+        journal.close()
+        with open(os.path.join(self.directory, self._segments()[0]), "a") as f:
+            f.write('{"id": "broken", "ev')
+
+        with self.assertLogs("confidence_logger", level="WARNING"):
+            reopened = EventJournal(self.directory)
+        self.assertEqual(reopened.pending, 1)
+
+
+class TestEventPublisherJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_events_over_the_queue_limit_are_spilled_to_disk(self):
+        batches = []
+        publisher = EventPublisher(
+            flush_interval_ms=60000,
+            max_queued=2,
+            journal=EventJournal(self.directory),
+        )
+        publisher.bind(lambda events: batches.append(events) or True)
+
+        for i in range(5):
+            self.assertTrue(publisher.add(_event(f"e{i}")))
+
+        self.assertEqual(publisher.queue_depth, 2)
+        self.assertEqual(publisher.spilled, 3)
+        self.assertEqual(publisher.dropped, 0)
+        publisher.close()
+        self.assertEqual(
+            _names(e for batch in batches for e in batch),
+            ["e0", "e1", "e2", "e3", "e4"],
+        )
+        self.assertEqual(EventJournal(self.directory).pending, 0)
+
+    def test_failed_events_are_published_by_the_next_process(self):
+        publisher = EventPublisher(
+            flush_interval_ms=60000, journal=EventJournal(self.directory)
+        )
+        publisher.bind(lambda events: False)
+        publisher.add(_event("a"))
+        publisher.add(_event("b"))
+        publisher.close()
+        self.assertEqual(publisher.events_failed, 2)
+
+        batches = []
+        restarted = EventPublisher(
+            flush_interval_ms=60000, journal=EventJournal(self.directory)
+        )
+        restarted.bind(lambda events: batches.append(events) or True)
+        restarted.close()
+
+        self.assertEqual(_names(batches[0]), ["a", "b"])
+        self.assertEqual(EventJournal(self.directory).pending, 0)
+
+    def test_journal_writes_do_not_hold_the_publisher_lock(self):
+        journal = EventJournal(self.directory, fsync=FsyncPolicy.ALWAYS)
+        publisher = EventPublisher(flush_interval_ms=60000, journal=journal)
+        publisher.bind(lambda events: True)
+        lock_free_during_write = []
+        append = journal.append
+
+        def probing_append(event, event_id=None):
+            def probe():
+                acquired = publisher._condition.acquire(timeout=1)
+                if acquired:
+                    publisher._condition.release()
+                lock_free_during_write.append(acquired)
+
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            return append(event, event_id)
+
+        with patch.object(journal, "append", probing_append):
+            publisher.add(_event("a"))
+
+        self.assertEqual(lock_free_during_write, [True])
+        self.assertEqual(publisher.queue_depth, 1)
+        publisher.close()
+
+    def test_event_reloaded_while_it_is_written_is_queued_once(self):
+        journal = EventJournal(self.directory)
+        publisher = EventPublisher(flush_interval_ms=60000, journal=journal)
+        batches = []
+        publisher.bind(lambda events: batches.append(events) or True)
+        append = journal.append
+
+        def append_then_reload(event, event_id=None):
+            event_id = append(event, event_id)
+            # the flusher drains the spilled events while the event is written
+            with publisher._condition:
+                publisher._spilling = True
+                publisher._reload()
+            return event_id
+
+        with patch.object(journal, "append", append_then_reload):
+            publisher.add(_event("a"))
+        publisher.close()
+
+        self.assertEqual(_names(e for batch in batches for e in batch), ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
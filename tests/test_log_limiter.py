@@ -0,0 +1,99 @@
+import logging
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from confidence.confidence import Confidence
+from confidence.log_limiter import LogLimiter
+from tests.test_circuit import FakeClock
+
+LOGGER = logging.getLogger("confidence_logger")
+
+
+class TestLogLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = LogLimiter(
+            summary_interval_seconds=10, max_lines_per_second=5, clock=self.clock
+        )
+
+    def tearDown(self):
+        self.limiter.close()
+
+    def _log(self, flag, error_code="GENERAL", message="down"):
+        self.limiter.log(LOGGER, logging.ERROR, (flag, error_code), message)
+
+    def test_repeats_are_summarized_when_the_interval_ends(self):
+        with self.assertLogs("confidence_logger", level="ERROR") as logs:
+            for i in range(100):
+                self._log("flag-a", message=f"down {i}")
+            self.clock.now += 10
+            self._log("flag-a", message="down again")
+
+        self.assertEqual(
+            logs.output,
+            [
+                "ERROR:confidence_logger:down 0",
+                "ERROR:confidence_logger:99 GENERAL errors for flag-a were not"
+                " logged in the last 10s, last: down 99",
+                "ERROR:confidence_logger:down again",
+            ],
+        )
+        self.assertEqual(self.limiter.suppressed, 99)
+
+    def test_keys_are_limited_separately(self):
+        with self.assertLogs("confidence_logger", level="ERROR") as logs:
+            self._log("flag-a", "GENERAL")
+            self._log("flag-a", "TIMEOUT")
+            self._log("flag-b", "GENERAL")
+            self._log("flag-a", "GENERAL")
+
+        self.assertEqual(len(logs.output), 3)
+
+    def test_lines_are_capped_per_second(self):
+        with self.assertLogs("confidence_logger", level="ERROR") as logs:
+            for i in range(20):
+                self._log(f"flag-{i}")
+            self.clock.now += 1
+            self._log("flag-new")
+
+        self.assertEqual(len(logs.output), 6)
+        self.assertEqual(self.limiter.suppressed, 15)
+
+        with self.assertLogs("confidence_logger", level="ERROR") as logs:
+            self.limiter.flush()
+
+        self.assertEqual(len(logs.output), 15)
+        self.assertIn("1 GENERAL errors for flag-19", logs.output[-1])
+
+    def test_disabled_levels_are_ignored(self):
+        self.limiter.log(LOGGER, logging.DEBUG, ("flag-a", "GENERAL"), "down")
+
+        self.assertEqual(self.limiter.suppressed, 0)
+        self.assertIsNone(self.limiter._thread)
+
+
+class TestConfidenceLogLimiter(unittest.TestCase):
+    def test_outage_logs_are_summarized(self):
+        limiter = LogLimiter(summary_interval_seconds=60)
+        confidence = Confidence(client_secret="test", log_limiter=limiter)
+
+        with patch("requests.Session.post") as mock_post, self.assertLogs(
+            "confidence_logger", level="WARNING"
+        ) as logs:
+            mock_post.side_effect = requests.exceptions.ConnectionError("refused")
+            for _ in range(50):
+                confidence.resolve_string_details("python-flag-1.string-key", "a")
+            limiter.close()
+
+        self.assertEqual(mock_post.call_count, 50)
+        # one line for the failed resolve and one for the evaluation, then a
+        # summary of each
+        self.assertEqual(len(logs.output), 4)
+        self.assertIn("49 GENERAL errors for flag flags/python-flag-1", logs.output[2])
+        self.assertIn("49 GENERAL errors for python-flag-1.string-key", logs.output[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,11 @@
 import unittest
 import logging
 import io
+from unittest.mock import patch
 import requests_mock
 from requests.exceptions import ConnectTimeout
 
-from confidence.confidence import Confidence
+from confidence.confidence import Confidence, _ResolveTesterPayload
 from confidence.errors import ErrorCode
 from confidence.flag_types import Reason
 from tests.test_confidence import SUCCESSFUL_FLAG_RESOLVE
@@ -58,8 +59,9 @@ class TestConfidenceLogging(unittest.TestCase):
 
         confidence = Confidence(client_secret="test", logger=fresh_logger)
 
-        # Verify logger level is set to DEBUG
-        self.assertEqual(fresh_logger.level, logging.DEBUG)
+        # Verify the logger level is left to its parents
+        self.assertEqual(fresh_logger.level, logging.NOTSET)
+        fresh_logger.setLevel(logging.DEBUG)
 
         # The logger might not have handlers added by _setup_logger if there are
         # parent logger handlers, so let's test what we can verify
@@ -181,6 +183,60 @@ class TestConfidenceLogging(unittest.TestCase):
             self.assertIn("Check your flag evaluation", log_output)
             self.assertIn("DEBUG", log_output)
 
+    def test_resolve_tester_payload_is_sampled(self):
+        """Test that resolve_tester_sampling logs one in N payloads."""
+        confidence = Confidence(
+            client_secret="test_secret",
+            logger=self.test_logger,
+            resolve_tester_sampling=3,
+        )
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=SUCCESSFUL_FLAG_RESOLVE,
+            )
+            for _ in range(6):
+                confidence.resolve_string_details(
+                    flag_key="python-flag-1.string-key", default_value="yellow"
+                )
+
+        self.assertEqual(self.get_log_output().count("Check your flag evaluation"), 2)
+
+    def test_resolve_tester_payload_is_not_built_for_a_logger_without_level(self):
+        """Test that the payload is not encoded unless DEBUG is enabled."""
+        self.test_logger.setLevel(logging.NOTSET)
+        confidence = Confidence(client_secret="test_secret", logger=self.test_logger)
+        with requests_mock.Mocker() as mock, patch.object(
+            _ResolveTesterPayload, "__str__"
+        ) as mock_encode:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=SUCCESSFUL_FLAG_RESOLVE,
+            )
+            confidence.resolve_string_details(
+                flag_key="python-flag-1.string-key", default_value="yellow"
+            )
+
+        mock_encode.assert_not_called()
+        self.assertNotIn("Check your flag evaluation", self.get_log_output())
+
+    def test_resolve_tester_payload_is_not_built_without_debug(self):
+        """Test that the payload is not encoded when DEBUG is disabled."""
+        self.test_logger.setLevel(logging.INFO)
+        with requests_mock.Mocker() as mock, patch.object(
+            _ResolveTesterPayload, "__str__"
+        ) as mock_encode:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=SUCCESSFUL_FLAG_RESOLVE,
+            )
+            self.confidence.resolve_string_details(
+                flag_key="python-flag-1.string-key", default_value="yellow"
+            )
+
+        mock_encode.assert_not_called()
+        self.assertNotIn("Check your flag evaluation", self.get_log_output())
+
     def test_custom_logger_injection(self):
         """Test that custom logger can be injected and used."""
         custom_logger = logging.getLogger("custom_logger")
@@ -262,8 +318,8 @@ class TestConfidenceLogging(unittest.TestCase):
         # Verify the logger name is the default
         self.assertEqual(confidence.logger.name, "confidence_logger")
 
-        # Verify logger is configured correctly
-        self.assertEqual(confidence.logger.level, logging.DEBUG)
+        # Verify the level is left to the application
+        self.assertEqual(confidence.logger.level, logging.NOTSET)
 
     def test_warning_error_only_logger_filters_debug(self):
         """Test that a logger set to WARNING level filters out DEBUG messages."""
@@ -341,7 +397,7 @@ class TestConfidenceLogging(unittest.TestCase):
         """Test that _setup_logger respects pre-configured logger levels."""
         import uuid
 
-        # Test 1: Logger with NOTSET should be set to DEBUG
+        # Test 1: Logger with NOTSET should keep following its parents
         notset_logger_name = f"notset_logger_{uuid.uuid4().hex[:8]}"
         notset_logger = logging.getLogger(notset_logger_name)
         notset_logger.handlers.clear()
@@ -349,8 +405,8 @@ class TestConfidenceLogging(unittest.TestCase):
 
         _ = Confidence(client_secret="test", logger=notset_logger)
 
-        # Should be set to DEBUG
-        self.assertEqual(notset_logger.level, logging.DEBUG)
+        # Should not be forced to DEBUG
+        self.assertEqual(notset_logger.level, logging.NOTSET)
 
         # Test 2: Logger with pre-configured WARNING level should be preserved
         warning_logger_name = f"warning_logger_{uuid.uuid4().hex[:8]}"
@@ -1,7 +1,10 @@
 import requests_mock
 import unittest
+from unittest.mock import patch
 import json
+import httpx
 
+from openfeature.exception import ErrorCode as OpenFeatureErrorCode
 from openfeature.flag_evaluation import Reason
 
 import confidence.confidence
@@ -276,6 +279,58 @@ class TestMyProvider(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(result.value, "brown")
             self.assertEqual(result.reason, Reason.DEFAULT)
 
+    async def test_resolve_string_details_async(self):
+        ctx = EvaluationContext(targeting_key="boop")
+        mock_response = httpx.Response(
+            status_code=200,
+            json=SUCCESSFUL_FLAG_RESOLVE,
+            request=httpx.Request(
+                "POST", "https://resolver.confidence.dev/v1/flags:resolve"
+            ),
+        )
+
+        with patch("httpx.AsyncClient.post", return_value=mock_response) as mock_post:
+            result = await self.provider.resolve_string_details_async(
+                flag_key="python-flag-1.string-key",
+                default_value="yellow",
+                evaluation_context=ctx,
+            )
+
+        self.assertEqual(result.value, "outer-string")
+        self.assertEqual(result.variant, "enabled")
+        self.assertEqual(result.reason, Reason.TARGETING_MATCH)
+        _, kwargs = mock_post.call_args
+        self.assertEqual(kwargs["json"]["evaluationContext"]["targeting_key"], "boop")
+
+    async def test_resolve_async_maps_error_codes(self):
+        mock_response = httpx.Response(
+            status_code=404,
+            json={},
+            request=httpx.Request(
+                "POST", "https://resolver.confidence.dev/v1/flags:resolve"
+            ),
+        )
+
+        with patch("httpx.AsyncClient.post", return_value=mock_response):
+            result = await self.provider.resolve_integer_details_async(
+                flag_key="missing-flag.value", default_value=-1
+            )
+
+        self.assertEqual(result.value, -1)
+        self.assertEqual(result.error_code, OpenFeatureErrorCode.FLAG_NOT_FOUND)
+
+    def test_empty_evaluation_context_uses_the_sdk_directly(self):
+        sdk = self.provider.confidence_sdk
+
+        self.assertIs(self.provider._confidence_with_context(None), sdk)
+        self.assertIs(self.provider._confidence_with_context(EvaluationContext()), sdk)
+        self.assertIsNot(
+            self.provider._confidence_with_context(
+                EvaluationContext(targeting_key="boop")
+            ),
+            sdk,
+        )
+
     if __name__ == "__main__":
         unittest.main()
 
@@ -0,0 +1,187 @@
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import requests
+
+from confidence.confidence import Confidence
+from confidence.errors import (
+    ErrorCode,
+    FlagNotFoundError,
+    GeneralError,
+    TimeoutError,
+)
+from confidence.flag_types import Reason
+from confidence.retry import RetryBudget, RetryPolicy, is_retryable
+from confidence.transport import HttpStatusError, TransportError, TransportResponse
+from tests.test_confidence import SUCCESSFUL_FLAG_RESOLVE
+
+RESOLVE_URL = "https://resolver.confidence.dev/v1/flags:resolve"
+
+
+def _response(status_code, body=None):
+    if body is not None:
+        response = MagicMock()
+        response.status_code = status_code
+        response.json.return_value = body
+        return response
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "reason"
+    response._content = b"{}"
+    return response
+
+
+def _policy(**kwargs):
+    return RetryPolicy(initial_backoff_ms=1, max_backoff_ms=5, **kwargs)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_is_capped_and_jittered(self):
+        policy = RetryPolicy(initial_backoff_ms=100, max_backoff_ms=300)
+        for retry in range(6):
+            self.assertLessEqual(policy.backoff_ms(retry), min(300, 100 * 2**retry))
+            self.assertGreaterEqual(policy.backoff_ms(retry), 0)
+
+    def test_only_transient_errors_are_retryable(self):
+        def error_from(cause):
+            try:
+                raise GeneralError(str(cause)) from cause
+            except GeneralError as e:
+                return e
+
+        server_error = HttpStatusError(TransportResponse(503))
+        client_error = HttpStatusError(TransportResponse(400))
+
+        self.assertTrue(is_retryable(error_from(server_error)))
+        self.assertTrue(is_retryable(error_from(TransportError("reset"))))
+        self.assertFalse(is_retryable(error_from(client_error)))
+        self.assertFalse(is_retryable(FlagNotFoundError()))
+
+    def test_budget_limits_retries_to_a_percentage_of_requests(self):
+        budget = RetryBudget(percent=50, max_tokens=1)
+
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.try_spend())
+        self.assertEqual(budget.exhausted, 1)
+
+    def test_retries_stop_at_the_deadline(self):
+        policy = RetryPolicy(max_attempts=100, initial_backoff_ms=40)
+        policy.backoff_ms = lambda retry: 40
+        calls = []
+
+        def attempt(timeout):
+            calls.append(timeout)
+            raise GeneralError("down") from TransportError("down")
+
+        with self.assertRaises(GeneralError):
+            policy.call(attempt, 0.1)
+
+        self.assertLess(len(calls), 4)
+        self.assertTrue(all(timeout <= 0.1 for timeout in calls))
+
+
+    def test_retries_are_counted_from_many_threads(self):
+        budget = RetryBudget(max_tokens=100000)
+        policy = RetryPolicy(max_attempts=2, budget=budget)
+        policy.backoff_ms = lambda retry: 0
+        error = TimeoutError()
+
+        def retry_many(_):
+            for _ in range(2000):
+                policy._next_delay(error, 0, None)
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(retry_many, range(8)))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        self.assertEqual(policy.retries, 16000)
+        self.assertEqual(budget.max_tokens - budget._tokens, 16000)
+
+
+class TestConfidenceRetries(unittest.TestCase):
+    def test_transient_errors_are_retried(self):
+        policy = _policy(budget=RetryBudget())
+        confidence = Confidence(client_secret="test", retry_policy=policy)
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = [
+                requests.ConnectionError("connection reset"),
+                _response(503),
+                _response(200, SUCCESSFUL_FLAG_RESOLVE),
+            ]
+            with patch.object(confidence._telemetry, "add_trace") as add_trace:
+                details = confidence.resolve_string_details(
+                    "python-flag-1.string-key", "yellow"
+                )
+
+        self.assertEqual(details.value, "outer-string")
+        self.assertEqual(details.reason, Reason.TARGETING_MATCH)
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(policy.retries, 2)
+        self.assertEqual(add_trace.call_count, 3)
+
+    def test_client_errors_are_not_retried(self):
+        confidence = Confidence(client_secret="test", retry_policy=_policy())
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.return_value = _response(400)
+            details = confidence.resolve_string_details(
+                "python-flag-1.string-key", "yellow"
+            )
+
+        self.assertEqual(details.value, "yellow")
+        self.assertEqual(details.error_code, ErrorCode.GENERAL)
+        mock_post.assert_called_once()
+
+    def test_exhausted_budget_prevents_retries(self):
+        budget = RetryBudget(percent=0, max_tokens=1)
+        confidence = Confidence(
+            client_secret="test", retry_policy=_policy(budget=budget)
+        )
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = requests.ConnectionError("down")
+            for _ in range(3):
+                confidence.resolve_string_details("python-flag-1.string-key", "")
+
+        # one retry from the saved token, then no more
+        self.assertEqual(mock_post.call_count, 4)
+        self.assertEqual(budget.exhausted, 3)
+
+
+class TestConfidenceRetriesAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_transient_errors_are_retried(self):
+        confidence = Confidence(
+            client_secret="test", retry_policy=_policy(budget=RetryBudget())
+        )
+        request = httpx.Request("POST", RESOLVE_URL)
+        mock_post = AsyncMock(
+            side_effect=[
+                httpx.Response(status_code=502, request=request),
+                httpx.Response(
+                    status_code=200, json=SUCCESSFUL_FLAG_RESOLVE, request=request
+                ),
+            ]
+        )
+
+        with patch("httpx.AsyncClient.post", mock_post):
+            details = await confidence.resolve_string_details_async(
+                "python-flag-1.string-key", "yellow"
+            )
+
+        self.assertEqual(details.value, "outer-string")
+        self.assertEqual(mock_post.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests_mock
+
+from confidence.confidence import Confidence
+from confidence.session import HttpSession, PoolConfig, build_async_client
+from tests.test_confidence import SUCCESSFUL_FLAG_RESOLVE
+
+
+class TestHttpSession(unittest.TestCase):
+    def test_adapter_uses_configured_pool_size(self):
+        session = HttpSession(PoolConfig(max_connections_per_host=32))
+
+        adapter = session._session.get_adapter("https://resolver.confidence.dev")
+
+        self.assertEqual(adapter._pool_maxsize, 32)
+
+    def test_idle_connections_are_dropped_after_keepalive_expiry(self):
+        session = HttpSession(PoolConfig(keepalive_expiry=0.0))
+
+        with patch("requests.Session.post"), patch(
+            "requests.Session.close"
+        ) as mock_close:
+            session.post("https://resolver.confidence.dev/v1/flags:resolve")
+            session.post("https://resolver.confidence.dev/v1/flags:resolve")
+
+        self.assertGreaterEqual(mock_close.call_count, 1)
+
+    def test_idle_session_is_closed_after_its_requests_in_flight(self):
+        session = HttpSession(PoolConfig(keepalive_expiry=0.05))
+        url = "https://resolver.confidence.dev/v1/flags:resolve"
+        started = threading.Event()
+        release = threading.Event()
+        used = []
+        closed = []
+
+        def post(requests_session, url, **kwargs):
+            used.append(requests_session)
+            if len(used) == 1:
+                started.set()
+                release.wait(5)
+            return MagicMock(status_code=200)
+
+        with patch("requests.Session.post", post), patch(
+            "requests.Session.close",
+            lambda requests_session: closed.append(requests_session),
+        ):
+            slow = threading.Thread(target=session.post, args=(url,))
+            slow.start()
+            self.assertTrue(started.wait(5))
+            time.sleep(0.1)
+            session.post(url)
+
+            self.assertIsNot(used[0], used[1])
+            self.assertEqual(closed, [])
+            release.set()
+            slow.join()
+
+        self.assertEqual(closed, [used[0]])
+
+    def test_connections_are_kept_without_keepalive_expiry(self):
+        session = HttpSession(PoolConfig(keepalive_expiry=None))
+
+        with patch("requests.Session.post"), patch(
+            "requests.Session.close"
+        ) as mock_close:
+            session.post("https://resolver.confidence.dev/v1/flags:resolve")
+            session.post("https://resolver.confidence.dev/v1/flags:resolve")
+
+        mock_close.assert_not_called()
+
+    def test_session_is_shared_with_child_instances(self):
+        confidence = Confidence(client_secret="test")
+        child = confidence.with_context({"user": "alice"})
+
+        self.assertIs(confidence._http_session, child._http_session)
+        self.assertIs(confidence.async_client, child.async_client)
+
+    def test_resolve_and_track_use_the_pooled_session(self):
+        confidence = Confidence(client_secret="test", disable_telemetry=True)
+
+        with requests_mock.Mocker() as mock, patch.object(
+            confidence._http_session, "post", wraps=confidence._http_session.post
+        ) as session_post:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=SUCCESSFUL_FLAG_RESOLVE,
+            )
+            mock.post("https://events.confidence.dev/v1/events:publish", json={})
+
+            confidence.resolve_string_details("python-flag-1.string-key", "yellow")
+            confidence.track("event", {})
+
+        self.assertEqual(session_post.call_count, 2)
+
+    def test_async_client_uses_pool_config(self):
+        confidence = Confidence(
+            client_secret="test",
+            pool_config=PoolConfig(max_connections=7, max_keepalive_connections=3),
+        )
+
+        pool = confidence.async_client._transport._pool
+        self.assertEqual(pool._max_connections, 7)
+        self.assertEqual(pool._max_keepalive_connections, 3)
+
+
+class TestHttp2(unittest.TestCase):
+    def test_http2_client_when_h2_is_installed(self):
+        with patch("confidence.session.HTTP2_AVAILABLE", True), patch(
+            "httpx.AsyncClient"
+        ) as mock_client:
+            build_async_client(PoolConfig.multiplexed())
+
+        kwargs = mock_client.call_args.kwargs
+        self.assertTrue(kwargs["http2"])
+        self.assertEqual(kwargs["limits"].max_connections, 10)
+        self.assertEqual(kwargs["limits"].keepalive_expiry, 60.0)
+
+    def test_falls_back_to_http1_without_h2(self):
+        with patch("confidence.session.HTTP2_AVAILABLE", False), self.assertLogs(
+            "confidence_logger", level="WARNING"
+        ) as logs:
+            client = build_async_client(PoolConfig(http2=True))
+
+        self.assertFalse(client._transport._pool._http2)
+        self.assertIn("h2 package is not installed", logs.output[0])
+
+    def test_http1_by_default(self):
+        client = build_async_client()
+
+        self.assertFalse(client._transport._pool._http2)
+
+
+if __name__ == "__main__":
+    unittest.main()
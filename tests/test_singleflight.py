@@ -0,0 +1,262 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from requests.exceptions import Timeout as RequestsTimeout
+
+from confidence.confidence import Confidence
+from confidence.errors import ErrorCode
+from confidence.flag_types import Reason
+from confidence.singleflight import AsyncSingleFlight, SingleFlight
+from confidence.telemetry import ProtoStatus, ProtoTraceId
+from tests.test_confidence import SUCCESSFUL_FLAG_RESOLVE
+
+
+def _slow_response(*args, **kwargs):
+    time.sleep(0.2)
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = SUCCESSFUL_FLAG_RESOLVE
+    return response
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def work():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            leader = pool.submit(single_flight.do, "key", work)
+            started.wait()
+            followers = [pool.submit(single_flight.do, "key", work) for _ in range(4)]
+            results = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results[0], ("result", False))
+        self.assertTrue(all(result == ("result", True) for result in results[1:]))
+        self.assertEqual(single_flight.coalesced, 4)
+
+    def test_error_is_shared_and_key_is_released(self):
+        single_flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            single_flight.do("key", fail)
+        self.assertEqual(single_flight.do("key", lambda: 1), (1, False))
+
+
+class TestConfidenceSingleFlight(unittest.TestCase):
+    def test_identical_concurrent_resolves_are_coalesced(self):
+        single_flight = SingleFlight()
+        confidence = Confidence(
+            client_secret="test", single_flight=single_flight
+        ).with_context({"targeting_key": "user-1"})
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = _slow_response
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = [
+                    pool.submit(
+                        confidence.resolve_string_details,
+                        "python-flag-1.string-key",
+                        "yellow",
+                    )
+                    for _ in range(8)
+                ]
+                details = [future.result() for future in futures]
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(single_flight.coalesced, 7)
+        for detail in details:
+            self.assertEqual(detail.value, "outer-string")
+            self.assertEqual(detail.reason, Reason.TARGETING_MATCH)
+
+    def test_only_the_sent_resolve_is_traced(self):
+        confidence = Confidence(
+            client_secret="test", single_flight=SingleFlight()
+        ).with_context({"targeting_key": "user-1"})
+
+        with patch("requests.Session.post") as mock_post, patch.object(
+            confidence._telemetry, "add_trace"
+        ) as mock_add_trace:
+            mock_post.side_effect = _slow_response
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [
+                    pool.submit(
+                        confidence.resolve_string_details,
+                        "python-flag-1.string-key",
+                        "yellow",
+                    )
+                    for _ in range(4)
+                ]
+                [future.result() for future in futures]
+
+        traces = [
+            call.args
+            for call in mock_add_trace.call_args_list
+            if call.args[0] == ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY
+        ]
+        self.assertEqual(len(traces), 1)
+        self.assertEqual(traces[0][2], ProtoStatus.PROTO_STATUS_SUCCESS)
+
+    def test_different_contexts_are_not_coalesced(self):
+        confidence = Confidence(client_secret="test", single_flight=SingleFlight())
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = _slow_response
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [
+                    pool.submit(
+                        confidence.with_context(
+                            {"targeting_key": user}
+                        ).resolve_string_details,
+                        "python-flag-1.string-key",
+                        "yellow",
+                    )
+                    for user in ["user-1", "user-2"]
+                ]
+                [future.result() for future in futures]
+
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_coalesced_callers_share_errors(self):
+        confidence = Confidence(client_secret="test", single_flight=SingleFlight())
+
+        def slow_timeout(*args, **kwargs):
+            time.sleep(0.2)
+            raise RequestsTimeout("timed out")
+
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = slow_timeout
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [
+                    pool.submit(
+                        confidence.resolve_string_details,
+                        "python-flag-1.string-key",
+                        "yellow",
+                    )
+                    for _ in range(4)
+                ]
+                details = [future.result() for future in futures]
+
+        self.assertEqual(mock_post.call_count, 1)
+        for detail in details:
+            self.assertEqual(detail.value, "yellow")
+            self.assertEqual(detail.error_code, ErrorCode.TIMEOUT)
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_coroutines_share_one_task(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(
+            *[single_flight.do("key", work) for _ in range(10)]
+        )
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results[0], ("result", False))
+        self.assertTrue(all(result == ("result", True) for result in results[1:]))
+        self.assertEqual(single_flight.coalesced, 9)
+
+    async def test_cancelled_caller_does_not_cancel_shared_work(self):
+        single_flight = AsyncSingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.ensure_future(single_flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        self.assertEqual(await follower, ("result", True))
+
+    async def test_identical_async_resolves_are_coalesced(self):
+        single_flight = AsyncSingleFlight()
+        confidence = Confidence(
+            client_secret="test", async_single_flight=single_flight
+        ).with_context({"targeting_key": "user-1"})
+
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return httpx.Response(
+                status_code=200,
+                json=SUCCESSFUL_FLAG_RESOLVE,
+                request=httpx.Request(
+                    "POST", "https://resolver.confidence.dev/v1/flags:resolve"
+                ),
+            )
+
+        mock_post = AsyncMock(side_effect=slow_post)
+        with patch("httpx.AsyncClient.post", mock_post):
+            details = await asyncio.gather(
+                *[
+                    confidence.resolve_string_details_async(
+                        "python-flag-1.string-key", "yellow"
+                    )
+                    for _ in range(20)
+                ]
+            )
+
+        mock_post.assert_called_once()
+        self.assertEqual(single_flight.coalesced, 19)
+        self.assertTrue(all(detail.value == "outer-string" for detail in details))
+
+    async def test_only_the_sent_async_resolve_is_traced(self):
+        confidence = Confidence(
+            client_secret="test", async_single_flight=AsyncSingleFlight()
+        ).with_context({"targeting_key": "user-1"})
+
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return httpx.Response(
+                status_code=200,
+                json=SUCCESSFUL_FLAG_RESOLVE,
+                request=httpx.Request(
+                    "POST", "https://resolver.confidence.dev/v1/flags:resolve"
+                ),
+            )
+
+        with patch(
+            "httpx.AsyncClient.post", AsyncMock(side_effect=slow_post)
+        ), patch.object(confidence._telemetry, "add_trace") as mock_add_trace:
+            await asyncio.gather(
+                *[
+                    confidence.resolve_string_details_async(
+                        "python-flag-1.string-key", "yellow"
+                    )
+                    for _ in range(5)
+                ]
+            )
+
+        statuses = [
+            call.args[2]
+            for call in mock_add_trace.call_args_list
+            if call.args[0] == ProtoTraceId.PROTO_TRACE_ID_RESOLVE_LATENCY
+        ]
+        self.assertEqual(statuses, [ProtoStatus.PROTO_STATUS_SUCCESS])
+
+
+if __name__ == "__main__":
+    unittest.main()
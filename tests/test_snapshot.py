@@ -0,0 +1,179 @@
+import unittest
+from unittest.mock import patch, AsyncMock
+
+import httpx
+import requests_mock
+
+from confidence.confidence import Confidence
+from confidence.errors import ErrorCode, TimeoutError
+from confidence.flag_types import Reason
+from confidence.transport import TransportRequest, TransportResponse, TransportTimeout
+from tests.test_confidence import MULTI_FLAG_RESOLVE
+
+
+class TimingOutTransport:
+    def send(self, request: TransportRequest) -> TransportResponse:
+        raise TransportTimeout("timed out")
+
+    async def send_async(self, request: TransportRequest) -> TransportResponse:
+        raise TransportTimeout("timed out")
+
+
+class TestFlagSnapshot(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.confidence = Confidence(client_secret="test").with_context(
+            {"targeting_key": "user-1"}
+        )
+
+    def tearDown(self):
+        # sends the applies of the flags read from snapshots
+        with requests_mock.Mocker() as mock:
+            mock.post("https://resolver.confidence.dev/v1/flags:apply", json={})
+            self.confidence._snapshot_applier.close()
+
+    def test_snapshot_resolves_all_flags_in_one_request(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=MULTI_FLAG_RESOLVE,
+            )
+            snapshot = self.confidence.snapshot()
+
+            self.assertEqual(mock.call_count, 1)
+            request = mock.request_history[0].json()
+            self.assertEqual(request["flags"], [])
+            self.assertEqual(request["evaluationContext"], {"targeting_key": "user-1"})
+            self.assertEqual(snapshot.flags, ["python-flag-1", "test-flag"])
+
+    def test_snapshot_reads_are_local(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=MULTI_FLAG_RESOLVE,
+            )
+            snapshot = self.confidence.snapshot()
+
+            string_details = snapshot.resolve_string_details(
+                "python-flag-1.string-key", "yellow"
+            )
+            bool_details = snapshot.resolve_boolean_details(
+                "python-flag-1.enabled", False
+            )
+            float_details = snapshot.resolve_float_details(
+                "python-flag-1.double-key", 0.0
+            )
+            int_details = snapshot.resolve_integer_details("test-flag.myinteger", -1)
+            object_details = snapshot.resolve_object_details(
+                "python-flag-1.struct-key", {}
+            )
+
+            self.assertEqual(mock.call_count, 1)
+            self.assertEqual(string_details.value, "outer-string")
+            self.assertEqual(string_details.variant, "enabled")
+            self.assertEqual(string_details.reason, Reason.TARGETING_MATCH)
+            self.assertEqual(bool_details.value, True)
+            self.assertEqual(float_details.value, 42.42)
+            self.assertEqual(int_details.value, 400)
+            self.assertEqual(object_details.value, {"string-key": "inner-string"})
+
+    def test_snapshot_missing_flag_and_type_mismatch(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=MULTI_FLAG_RESOLVE,
+            )
+            snapshot = self.confidence.snapshot()
+
+        missing = snapshot.resolve_string_details("unknown-flag", "yellow")
+        mismatch = snapshot.resolve_integer_details("python-flag-1.string-key", -1)
+
+        self.assertEqual(missing.value, "yellow")
+        self.assertEqual(missing.error_code, ErrorCode.FLAG_NOT_FOUND)
+        self.assertEqual(mismatch.value, -1)
+        self.assertEqual(mismatch.error_code, ErrorCode.GENERAL)
+
+    def test_snapshot_applies_only_the_flags_that_are_read(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=MULTI_FLAG_RESOLVE,
+            )
+            mock.post("https://resolver.confidence.dev/v1/flags:apply", json={})
+            snapshot = self.confidence.snapshot()
+            snapshot.resolve_string_details("python-flag-1.string-key", "yellow")
+            snapshot.resolve_boolean_details("python-flag-1.enabled", False)
+            self.confidence._snapshot_applier.close()
+
+            resolve, apply = [request.json() for request in mock.request_history]
+            self.assertFalse(resolve["apply"])
+            self.assertEqual(apply["resolveToken"], "token1")
+            self.assertEqual(
+                [flag["flag"] for flag in apply["flags"]], ["flags/python-flag-1"]
+            )
+
+    def test_failed_snapshot_reads_return_defaults(self):
+        confidence = Confidence(
+            client_secret="test",
+            transport=TimingOutTransport(),
+            async_transport=TimingOutTransport(),
+            disable_telemetry=True,
+        )
+
+        snapshot = confidence.snapshot()
+        details = snapshot.resolve_string_details("python-flag-1.string-key", "yellow")
+
+        self.assertIsInstance(snapshot.error, TimeoutError)
+        self.assertEqual(snapshot.flags, [])
+        self.assertEqual(details.value, "yellow")
+        self.assertEqual(details.error_code, ErrorCode.TIMEOUT)
+
+    async def test_failed_async_snapshot_reads_return_defaults(self):
+        confidence = Confidence(
+            client_secret="test",
+            transport=TimingOutTransport(),
+            async_transport=TimingOutTransport(),
+            disable_telemetry=True,
+        )
+
+        snapshot = await confidence.snapshot_async()
+        details = snapshot.resolve_integer_details("test-flag.myinteger", -1)
+
+        self.assertEqual(details.value, -1)
+        self.assertEqual(details.error_code, ErrorCode.TIMEOUT)
+
+    def test_snapshot_is_isolated_from_later_context_changes(self):
+        with requests_mock.Mocker() as mock:
+            mock.post(
+                "https://resolver.confidence.dev/v1/flags:resolve",
+                json=MULTI_FLAG_RESOLVE,
+            )
+            snapshot = self.confidence.snapshot()
+
+        self.confidence.put_context("country", "SE")
+
+        self.assertEqual(dict(snapshot.context), {"targeting_key": "user-1"})
+        with self.assertRaises(TypeError):
+            snapshot.context["country"] = "SE"  # type: ignore[index]
+
+    async def test_snapshot_async(self):
+        mock_post = AsyncMock()
+        mock_post.return_value = httpx.Response(
+            status_code=200,
+            json=MULTI_FLAG_RESOLVE,
+            request=httpx.Request(
+                "POST", "https://resolver.confidence.dev/v1/flags:resolve"
+            ),
+        )
+
+        with patch("httpx.AsyncClient.post", mock_post):
+            snapshot = await self.confidence.snapshot_async()
+
+        mock_post.assert_called_once()
+        _, kwargs = mock_post.call_args
+        self.assertEqual(kwargs["json"]["flags"], [])
+        details = snapshot.resolve_integer_details("python-flag-1.int-key", -1)
+        self.assertEqual(details.value, 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -137,7 +137,7 @@ class TestTelemetry(unittest.TestCase):
 
         self.assertEqual(monitoring.library_traces[0].library_version, "1.0.0")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_telemetry_during_resolve(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -167,7 +167,7 @@ class TestTelemetry(unittest.TestCase):
         self.assertEqual(trace.request_trace.status, ProtoStatus.PROTO_STATUS_SUCCESS)
         self.assertGreaterEqual(trace.request_trace.millisecond_duration, 10)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_telemetry_during_resolve_error(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 500
@@ -198,7 +198,7 @@ class TestTelemetry(unittest.TestCase):
         self.assertEqual(trace.request_trace.status, ProtoStatus.PROTO_STATUS_ERROR)
         self.assertGreaterEqual(trace.request_trace.millisecond_duration, 10)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_disabled_telemetry(self, mock_post):
         # Create a confidence instance with telemetry disabled
         mock_response = MagicMock()
@@ -230,7 +230,7 @@ class TestTelemetry(unittest.TestCase):
         headers = mock_post.call_args[1]["headers"]
         self.assertNotIn("X-CONFIDENCE-TELEMETRY", headers)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_telemetry_shared_across_confidence_instances(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -0,0 +1,121 @@
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from confidence.confidence import Confidence
+from confidence.errors import ErrorCode
+from confidence.testing import FakeResolver, LatencyDistribution
+
+FLAGS = {
+    "python-flag-1": {
+        "variant": "flags/python-flag-1/variants/enabled",
+        "value": {"string-key": "outer-string", "enabled": True},
+    }
+}
+
+
+def _confidence(server, **kwargs):
+    return Confidence(
+        client_secret="test",
+        custom_resolve_base_url=server.base_url,
+        custom_events_base_url=server.base_url,
+        disable_telemetry=True,
+        **kwargs,
+    )
+
+
+class TestFakeResolver(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeResolver(FLAGS, seed=1).start()
+        self.addCleanup(self.server.stop)
+
+    def test_resolves_flags(self):
+        details = _confidence(self.server).resolve_string_details(
+            "python-flag-1.string-key", "yellow"
+        )
+
+        self.assertEqual(details.value, "outer-string")
+        self.assertEqual(self.server.calls["/v1/flags:resolve"], 1)
+
+    def test_unknown_flags_are_not_found(self):
+        details = _confidence(self.server).resolve_string_details(
+            "unknown-flag.key", "yellow"
+        )
+
+        self.assertEqual(details.value, "yellow")
+        self.assertEqual(details.error_code, ErrorCode.FLAG_NOT_FOUND)
+
+    def test_injected_errors_return_the_default(self):
+        self.server.error_rate = 1.0
+
+        details = _confidence(self.server).resolve_string_details(
+            "python-flag-1.string-key", "yellow"
+        )
+
+        self.assertEqual(details.value, "yellow")
+        self.assertEqual(details.error_code, ErrorCode.GENERAL)
+
+    def test_injected_timeouts_hit_the_client_timeout(self):
+        self.server.timeout_rate = 1.0
+        confidence = _confidence(self.server, timeout_ms=100)
+
+        start = time.perf_counter()
+        details = confidence.resolve_string_details(
+            "python-flag-1.string-key", "yellow"
+        )
+
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(details.error_code, ErrorCode.TIMEOUT)
+
+    def test_latency_is_added_to_every_request(self):
+        self.server.latency = LatencyDistribution.fixed(50)
+
+        start = time.perf_counter()
+        _confidence(self.server).resolve_boolean_details("python-flag-1.enabled", False)
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+    def test_tracked_events_are_received(self):
+        _confidence(self.server).track("navigate", {"page": "home"})
+
+        self.assertEqual(self.server.events_received, 1)
+
+    def test_flags_can_be_loaded_from_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "flags.json")
+            with open(path, "w") as file:
+                json.dump(FLAGS, file)
+            with FakeResolver.from_json(path) as server:
+                details = _confidence(server).resolve_boolean_details(
+                    "python-flag-1.enabled", False
+                )
+
+        self.assertTrue(details.value)
+
+
+class TestLatencyDistribution(unittest.TestCase):
+    def test_samples_are_within_bounds(self):
+        rng = random.Random(1)
+        uniform = LatencyDistribution.uniform(10, 20)
+        lognormal = LatencyDistribution.lognormal(10, 0.5)
+
+        for _ in range(100):
+            self.assertTrue(10 <= uniform.sample(rng) <= 20)
+            self.assertGreater(lognormal.sample(rng), 0)
+
+
+class TestFakeResolverAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_resolves_flags_async(self):
+        with FakeResolver(FLAGS) as server:
+            details = await _confidence(server).resolve_string_details_async(
+                "python-flag-1.string-key", "yellow"
+            )
+
+        self.assertEqual(details.value, "outer-string")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from confidence.confidence import Confidence
+from confidence.errors import ErrorCode
+from confidence.flag_types import Reason
+from confidence.transport import (
+    InMemoryTransport,
+    TransportRequest,
+    TransportResponse,
+    TransportTimeout,
+)
+
+FLAGS = {
+    "python-flag-1": {
+        "variant": "flags/python-flag-1/variants/enabled",
+        "value": {"string-key": "outer-string", "enabled": True},
+    }
+}
+
+
+def _confidence(transport):
+    return Confidence(
+        client_secret="test",
+        transport=transport,
+        async_transport=transport,
+        disable_telemetry=True,
+    )
+
+
+class TimingOutTransport:
+    def send(self, request: TransportRequest) -> TransportResponse:
+        raise TransportTimeout("timed out")
+
+
+class TestInMemoryTransport(unittest.TestCase):
+    def test_resolves_from_the_flag_table(self):
+        transport = InMemoryTransport(FLAGS)
+        confidence = _confidence(transport)
+
+        details = confidence.resolve_string_details(
+            "python-flag-1.string-key", "yellow"
+        )
+
+        self.assertEqual(details.value, "outer-string")
+        self.assertEqual(details.variant, "enabled")
+        self.assertEqual(transport.calls["/v1/flags:resolve"], 1)
+
+    def test_unknown_flag_is_not_found(self):
+        confidence = _confidence(InMemoryTransport(FLAGS))
+
+        details = confidence.resolve_string_details("unknown-flag.key", "yellow")
+
+        self.assertEqual(details.value, "yellow")
+        self.assertEqual(details.error_code, ErrorCode.FLAG_NOT_FOUND)
+
+    def test_events_are_published_through_the_transport(self):
+        transport = InMemoryTransport(FLAGS)
+        confidence = _confidence(transport)
+
+        confidence.track("navigate", {"page": "home"})
+
+        self.assertEqual(transport.calls["/v1/events:publish"], 1)
+
+    def test_transport_is_shared_with_child_instances(self):
+        transport = InMemoryTransport(FLAGS)
+        child = _confidence(transport).with_context({"user": "alice"})
+
+        child.resolve_boolean_details("python-flag-1.enabled", False)
+
+        self.assertEqual(transport.calls["/v1/flags:resolve"], 1)
+
+    def test_transport_timeouts_are_resolve_timeouts(self):
+        confidence = Confidence(client_secret="test", transport=TimingOutTransport())
+
+        details = confidence.resolve_string_details(
+            "python-flag-1.string-key", "yellow"
+        )
+
+        self.assertEqual(details.value, "yellow")
+        self.assertEqual(details.reason, Reason.DEFAULT)
+        self.assertEqual(details.error_code, ErrorCode.TIMEOUT)
+
+
+class TestInMemoryTransportAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_resolves_with_latency(self):
+        transport = InMemoryTransport(FLAGS, latency_ms=1)
+        confidence = _confidence(transport)
+
+        details = await confidence.resolve_boolean_details_async(
+            "python-flag-1.enabled", False
+        )
+
+        self.assertTrue(details.value)
+        self.assertEqual(transport.calls["/v1/flags:resolve"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()